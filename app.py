@@ -50,6 +50,7 @@ from blueprints.parent import parent_bp
 from blueprints.faculty import faculty_bp
 from blueprints.admin import admin_bp
 from blueprints.attender import attender_bp
+from blueprints.hooks import hooks_bp
 from telegram_bot import telegram_bp
 
 app.register_blueprint(home_bp)
@@ -58,10 +59,18 @@ app.register_blueprint(parent_bp)
 app.register_blueprint(faculty_bp)
 app.register_blueprint(admin_bp)
 app.register_blueprint(attender_bp)
+app.register_blueprint(hooks_bp)
 app.register_blueprint(telegram_bp)
 
 logger.info("All blueprints registered successfully")
 
+# Request latency histograms and the protected /metrics endpoint
+from utils import metrics, resilience
+metrics.init_app(app)
+
+# Per-request upstream latency budget (circuit breakers live in utils.resilience)
+resilience.init_app(app)
+
 # Legacy route redirects for backward compatibility
 from flask import redirect, url_for
 
@@ -0,0 +1 @@
+"""Benchmarks for the portal's start-up time and hot paths (run from the project root)."""
@@ -0,0 +1,135 @@
+"""Time the portal's hot paths against synthetic sheets of growing size.
+
+Covers bills processing (build_months_structure, filter_and_assign_sl, DOCX
+rendering), student login (validate_student_credentials) and the admission
+statistics. Results are printed and written as JSON so runs can be compared
+across commits.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [--sizes 500,5000] [--repeat 5] [--output FILE]
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import tempfile
+import argparse
+import statistics
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Keep the benchmark's cache entries away from a real deployment's cache
+os.environ['DATA_CACHE_DIR'] = tempfile.mkdtemp(prefix='bca_bench_')
+
+import pandas as pd  # noqa: E402
+from benchmarks import synthetic  # noqa: E402
+from utils import cache, data_fetcher  # noqa: E402
+from utils.admission_helpers import compute_admission_stats  # noqa: E402
+from utils.auth_helpers import validate_student_credentials  # noqa: E402
+from utils.bills_docx import build_bills_docx  # noqa: E402
+from utils.faculty_bills_helpers import build_months_structure, filter_and_assign_sl  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Run fn repeat times (after one warm-up) and return timing stats in ms."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def bills_frame(payload: List) -> 'pd.DataFrame':
+    """Build the bills DataFrame the same way get_faculty_bills_data does."""
+    if payload and isinstance(payload[0], list):
+        return pd.DataFrame(payload[1:], columns=payload[0])
+    return pd.DataFrame(payload)
+
+
+def seed_dataset(name: str, df: 'pd.DataFrame') -> None:
+    """Place df in the dataset cache so fetchers return it without network."""
+    cache.get_dataset(name, lambda: df, data_fetcher.CACHE_TTL)
+
+
+def bench_bills(size: int, fmt: str, repeat: int) -> Dict[str, Dict]:
+    df = bills_frame(synthetic.bills_rows(size, fmt=fmt))
+    months, faculty = build_months_structure(df.copy())
+    month = max(months, key=lambda m: sum(len(w['entries']) for w in months[m]))
+    results = {
+        'build_months_structure': measure(lambda: build_months_structure(df.copy()), repeat),
+        'filter_and_assign_sl[All]': measure(lambda: filter_and_assign_sl(months, month, 'All'), repeat),
+        'filter_and_assign_sl[one faculty]': measure(lambda: filter_and_assign_sl(months, month, faculty[0]), repeat),
+    }
+    weeks = filter_and_assign_sl(months, month, faculty[0])
+    results['build_bills_docx[one faculty month]'] = measure(lambda: build_bills_docx(weeks), max(1, repeat // 2))
+    return results
+
+
+def bench_login(size: int, repeat: int) -> Dict[str, Dict]:
+    seed_dataset('students', pd.DataFrame(synthetic.students(size)))
+    last = size - 1
+    return {
+        'validate_student_credentials[valid]': measure(
+            lambda: validate_student_credentials(synthetic.usn(last), synthetic.dob(last)), repeat),
+        'validate_student_credentials[unknown usn]': measure(
+            lambda: validate_student_credentials('U03XX00X9999', '01/01/2000'), repeat),
+    }
+
+
+def bench_admissions(size: int, repeat: int) -> Dict[str, Dict]:
+    df = pd.DataFrame(synthetic.admissions(size))
+    return {'compute_admission_stats': measure(lambda: compute_admission_stats(df.copy()), repeat)}
+
+
+def run(sizes: List[int], repeat: int) -> Dict:
+    results = {}
+    for size in sizes:
+        print(f"size={size}")
+        per_size = {}
+        per_size.update({f"{k} (lists)": v for k, v in bench_bills(size, 'lists', repeat).items()})
+        per_size.update({f"{k} (dicts)": v for k, v in bench_bills(size, 'dicts', repeat).items()
+                         if k == 'build_months_structure'})
+        per_size.update(bench_login(size, repeat))
+        per_size.update(bench_admissions(size, repeat))
+        for name, stats in per_size.items():
+            print(f"  {stats['median_ms']:>10.2f} ms  {name}")
+        results[str(size)] = per_size
+    return {
+        'benchmark': 'hot_paths',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='500,5000', help='Comma-separated row counts per dataset')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions per benchmark')
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/hot_paths.json)')
+    args = parser.parse_args()
+
+    result = run([int(s) for s in args.sizes.split(',') if s.strip()], args.repeat)
+
+    output = args.output or os.path.join(RESULTS_DIR, 'hot_paths.json')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
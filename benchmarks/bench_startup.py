@@ -0,0 +1,97 @@
+"""Measure cold start (import) time of the application, per module.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters and
+reports the cumulative import time of the target and of the slowest modules,
+so heavy dependencies creeping back onto the start-up path are easy to spot.
+
+Usage:
+    python -m benchmarks.bench_startup [--module app] [--runs 5] [--output FILE]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'results')
+
+# Modules that must not be imported when the app starts
+LAZY_MODULES = ['pandas', 'numpy', 'docx', 'lxml', 'requests']
+
+
+def import_times(module: str) -> Dict[str, Dict[str, int]]:
+    """Import module in a fresh interpreter and parse -X importtime output.
+
+    Args:
+        module: Dotted module name to import
+
+    Returns:
+        Dict of module name -> {'self_us': ..., 'cumulative_us': ...}
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        times[name] = {'self_us': int(parts[0]), 'cumulative_us': int(parts[1])}
+    return times
+
+
+def run(module: str, runs: int, top: int) -> Dict:
+    """Import module runs times and aggregate the per-module timings (median)."""
+    samples: Dict[str, List[int]] = {}
+    for _ in range(runs):
+        for name, t in import_times(module).items():
+            samples.setdefault(name, []).append(t['cumulative_us'])
+
+    medians = {name: statistics.median(v) for name, v in samples.items()}
+    slowest = sorted(medians.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        'benchmark': 'startup',
+        'module': module,
+        'runs': runs,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'total_ms': round(medians.get(module, 0) / 1000, 1),
+        'eager_heavy_imports': [m for m in LAZY_MODULES if m in medians],
+        'slowest_modules_ms': {name: round(us / 1000, 1) for name, us in slowest},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app', help='Module to import (default: app)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to average over')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest modules to report')
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/startup.json)')
+    args = parser.parse_args()
+
+    result = run(args.module, args.runs, args.top)
+
+    output = args.output or os.path.join(RESULTS_DIR, 'startup.json')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"import {args.module}: {result['total_ms']} ms (median of {args.runs})")
+    for name, ms in result['slowest_modules_ms'].items():
+        print(f"  {ms:>8.1f} ms  {name}")
+    if result['eager_heavy_imports']:
+        print(f"WARNING: heavy modules imported at start-up: {', '.join(result['eager_heavy_imports'])}")
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
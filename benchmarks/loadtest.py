@@ -0,0 +1,217 @@
+"""Replay a realistic traffic mix against a running portal and report latency.
+
+Intended to run against the portal wired to benchmarks.stub_server, e.g.:
+
+    python -m benchmarks.stub_server --latency-ms 800 &
+    (export the printed variables) gunicorn wsgi:app &
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:5000 --duration 60 --users 32
+
+Each virtual user loops over scenarios picked by weight (--mix). Admin and
+faculty scenarios log in once per user with LOGIN_USERNAME/LOGIN_PASSWORD and
+TEACHER_USERNAME/TEACHER_PASSWORD from the environment. The report gives
+throughput, error count and p50/p95/p99 latency per request type.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import requests
+
+from benchmarks import synthetic
+
+SCENARIOS = ('student_login', 'student_marks', 'admin_admissions', 'admin_documents', 'bills_report', 'bills_docx', 'telegram')
+DEFAULT_MIX = 'student_login=35,admin_admissions=15,admin_documents=10,bills_report=10,bills_docx=5,telegram=25'
+
+Sample = Tuple[str, float, bool]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class VirtualUser:
+    """One simulated client with its own cookies and login state."""
+
+    def __init__(self, args: argparse.Namespace, index: int, attendance_names: List[str]):
+        self.args = args
+        self.attendance_names = attendance_names
+        self.base = args.base_url.rstrip('/')
+        self.rng = random.Random(args.seed + index)
+        self.index = index
+        self.sessions: Dict[str, requests.Session] = {}
+
+    def _timed(self, name: str, method: str, path: str, session: requests.Session = None,
+               ok_status=(200,), **kwargs) -> Sample:
+        http = session or requests.Session()
+        start = time.perf_counter()
+        try:
+            resp = http.request(method, self.base + path, timeout=self.args.timeout,
+                                allow_redirects=False, **kwargs)
+            ok = resp.status_code in ok_status
+        except requests.RequestException:
+            ok = False
+        return name, time.perf_counter() - start, ok
+
+    def _role_session(self, role: str) -> requests.Session:
+        """Logged-in session for 'admin' or 'faculty' (created on first use)."""
+        if role not in self.sessions:
+            http = requests.Session()
+            user_env, pass_env = {'admin': ('LOGIN_USERNAME', 'LOGIN_PASSWORD'),
+                                  'faculty': ('TEACHER_USERNAME', 'TEACHER_PASSWORD')}[role]
+            http.post(f"{self.base}/{role}/login", timeout=self.args.timeout, allow_redirects=False,
+                      data={'username': os.getenv(user_env, ''), 'password': os.getenv(pass_env, '')})
+            self.sessions[role] = http
+        return self.sessions[role]
+
+    def student_login(self) -> List[Sample]:
+        i = self.rng.randrange(self.args.students)
+        # One in five attempts is a typo, as on results day
+        dob = synthetic.dob(i) if self.rng.random() > 0.2 else '01/01/1990'
+        return [self._timed('student_login', 'POST', '/student/login', ok_status=(200, 302),
+                            data={'usn': synthetic.usn(i), 'dob': dob})]
+
+    def student_marks(self) -> List[Sample]:
+        """Results day: a student logs in and opens the marks page."""
+        i = self.rng.randrange(self.args.students)
+        http = requests.Session()
+        return [self._timed('student_login', 'POST', '/student/login', http, ok_status=(200, 302),
+                            data={'usn': synthetic.usn(i), 'dob': synthetic.dob(i)}),
+                self._timed('student_marks', 'GET', '/student/marks', http)]
+
+    def admin_admissions(self) -> List[Sample]:
+        return [self._timed('admin_admissions', 'GET', '/admin/admission-applications',
+                            self._role_session('admin'))]
+
+    def admin_documents(self) -> List[Sample]:
+        return [self._timed('admin_documents', 'GET', '/admin/documents-tracking',
+                            self._role_session('admin'))]
+
+    def bills_report(self) -> List[Sample]:
+        return [self._timed('bills_report', 'GET', '/faculty/bills-report',
+                            self._role_session('faculty'), params={'month': self.args.bills_month})]
+
+    def bills_docx(self) -> List[Sample]:
+        return [self._timed('bills_docx', 'GET', '/faculty/bills-report/docx',
+                            self._role_session('faculty'), params={'month': self.args.bills_month, 'faculty': 'All'})]
+
+    def telegram(self) -> List[Sample]:
+        """Walk the bot's attendance flow, one webhook delivery per step."""
+        chat_id = 10_000_000 + self.index * 1000 + self.rng.randrange(1000)
+        i = self.rng.randrange(len(self.attendance_names))
+        name = self.attendance_names[i]
+
+        def message(text):
+            return {'update_id': self.rng.randrange(1 << 30), 'message': {'chat': {'id': chat_id}, 'text': text}}
+
+        def callback(data):
+            return {'update_id': self.rng.randrange(1 << 30),
+                    'callback_query': {'message': {'chat': {'id': chat_id}}, 'data': data}}
+
+        steps = [message('/start'), callback('batch:24-27'), callback('semester:3'), callback('section:A'),
+                 callback('subject:DBMS'), message(name), message(synthetic.usn(i))]
+        return [self._timed('telegram_webhook', 'POST', '/telegram', json=step) for step in steps]
+
+    def run(self, mix: List[Tuple[Callable[[], List[Sample]], int]], deadline: float, out: List[Sample],
+            lock: threading.Lock) -> None:
+        scenarios = [fn for fn, _ in mix]
+        weights = [w for _, w in mix]
+        while time.time() < deadline:
+            samples = self.rng.choices(scenarios, weights)[0]()
+            with lock:
+                out.extend(samples)
+
+
+def report(samples: List[Sample], elapsed: float) -> Dict:
+    by_name: Dict[str, List[Sample]] = {}
+    for s in samples:
+        by_name.setdefault(s[0], []).append(s)
+    result = {}
+    for name, items in sorted(by_name.items()):
+        latencies = sorted(s[1] * 1000 for s in items)
+        result[name] = {
+            'requests': len(items),
+            'errors': sum(1 for s in items if not s[2]),
+            'rps': round(len(items) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+        }
+    all_latencies = sorted(s[1] * 1000 for s in samples)
+    result['TOTAL'] = {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if not s[2]),
+        'rps': round(len(samples) / elapsed, 2),
+        'p50_ms': round(percentile(all_latencies, 50), 1),
+        'p95_ms': round(percentile(all_latencies, 95), 1),
+        'p99_ms': round(percentile(all_latencies, 99), 1),
+    }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--users', type=int, default=16, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Test duration in seconds')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Scenario weights, e.g. student_login=50,telegram=50')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request client timeout')
+    parser.add_argument('--bills-month', default='July 2025', help='Month used by bills scenarios')
+    parser.add_argument('--students', type=int, default=1500, help='Must match the stub --students')
+    parser.add_argument('--attendance-students', type=int, default=60, help='Must match the stub')
+    parser.add_argument('--attendance-days', type=int, default=80, help='Must match the stub')
+    parser.add_argument('--seed', type=int, default=11)
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    weights = []
+    for part in args.mix.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in SCENARIOS:
+            sys.exit(f"Unknown scenario '{name}', expected one of: {', '.join(SCENARIOS)}")
+        weights.append((name.strip(), int(weight or 1)))
+
+    # Same generator and sizes as the stub, so names match its attendance sheet
+    matrix = synthetic.attendance_matrix(args.attendance_students, args.attendance_days)
+    attendance_names = [row[1] for row in matrix[1:]]
+
+    users = [VirtualUser(args, i, attendance_names) for i in range(args.users)]
+    mixes = [[(getattr(user, name), weight) for name, weight in weights] for user in users]
+
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    start = time.time()
+    deadline = start + args.duration
+    threads = [threading.Thread(target=u.run, args=(m, deadline, samples, lock), daemon=True)
+               for u, m in zip(users, mixes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+
+    result = report(samples, elapsed)
+    print(f"{'request':<20} {'count':>7} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in result.items():
+        print(f"{name:<20} {r['requests']:>7} {r['errors']:>7} {r['rps']:>8} "
+              f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'benchmark': 'loadtest', 'timestamp': datetime.now().isoformat(timespec='seconds'),
+                       'base_url': args.base_url, 'users': args.users, 'duration_s': round(elapsed, 1),
+                       'mix': args.mix, 'results': result}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""Local stand-in for the Apps Script, GitHub and Telegram endpoints.
+
+Serves synthetic payloads (or recorded JSON files) with configurable latency
+and error injection, so the portal can be load tested offline. Start it, then
+point the portal at it with the environment variables it prints:
+
+    python -m benchmarks.stub_server --port 8765 --latency-ms 800 --tail-ms 8000 --tail-rate 0.05
+
+Routes:
+    GET  /students /admissions /gf /documents /bills /attendance /marks /updates.json
+    POST /bot<token>/sendMessage   (Telegram Bot API stand-in)
+
+/bills accepts ?since_row=N (rows after the first N data rows), like an Apps
+Script with delta sync, and grows by --bills-growth rows per minute.
+/updates.json gains --notices-growth notices per minute (broadcast tests).
+
+sendMessage answers 429 with retry_after beyond --telegram-rate messages per
+second, like the Bot API; GET /telegram/stats returns the messages accepted
+and throttled so far.
+
+A file named <route>.json in --fixtures (e.g. students.json) replaces the
+synthetic payload for that route.
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks import synthetic
+
+# Environment variable of the portal -> stub route
+ENV_ROUTES = {
+    'STUDENT_DATA_for_login': '/students',
+    'ADMISSION_SCRIPT_URL': '/admissions',
+    'GOOGLE_SCRIPT_URL': '/gf',
+    'STUDENTS_DOCUMENT_SCripts': '/documents',
+    'FACULTY_BILLS_SCRIPT': '/bills',
+    'ATTENDANCE_Script': '/attendance',
+    'UPDATES_JSON_URL': '/updates.json',
+    'MARKS_SCRIPT_URL': '/marks',
+}
+
+
+class StubConfig:
+    """Payload sizes, latency profile and error rate of the stub."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.tail = args.tail_ms / 1000
+        self.tail_rate = args.tail_rate
+        self.error_rate = args.error_rate
+        self.fixtures = args.fixtures
+        self.bills_growth = args.bills_growth
+        self.notices_growth = args.notices_growth
+        self.telegram_rate = args.telegram_rate
+        self.telegram = {'sent': 0, 'throttled': 0}
+        self._window = (0, 0)  # (second, messages accepted in it)
+        self.started = time.time()
+        self.sizes = {
+            'students': args.students,
+            'admissions': args.admissions,
+            'bills': args.bills,
+            'attendance_students': args.attendance_students,
+            'attendance_days': args.attendance_days,
+        }
+        self._payloads: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.rng = random.Random(args.seed)
+
+    def delay(self) -> float:
+        with self._lock:
+            if self.tail and self.rng.random() < self.tail_rate:
+                return self.tail
+            return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.rng.random() < self.error_rate
+
+    def payload(self, route: str) -> Optional[bytes]:
+        """Encoded JSON body for route (built once, then reused)."""
+        with self._lock:
+            if route in self._payloads:
+                return self._payloads[route]
+        body = self._build(route)
+        if body is None:
+            return None
+        encoded = json.dumps(body).encode()
+        with self._lock:
+            self._payloads[route] = encoded
+        return encoded
+
+    def send_message(self) -> bool:
+        """Count a sendMessage call; False if it exceeds the per-second limit."""
+        with self._lock:
+            second = int(time.time())
+            count = self._window[1] if self._window[0] == second else 0
+            if self.telegram_rate and count >= self.telegram_rate:
+                self.telegram['throttled'] += 1
+                return False
+            self._window = (second, count + 1)
+            self.telegram['sent'] += 1
+            return True
+
+    def updates(self) -> bytes:
+        grown = int((time.time() - self.started) / 60 * self.notices_growth)
+        body = json.loads(self.payload('/updates.json'))
+        body['updates'] = [{'title': f"New notice {i}", 'date': '2025-08-02', 'link': ''}
+                           for i in range(grown, 0, -1)] + body['updates']
+        return json.dumps(body).encode()
+
+    def bills_since(self, since_row: int) -> bytes:
+        """Bills payload with only the data rows after since_row (header kept for list payloads)."""
+        grown = int((time.time() - self.started) / 60 * self.bills_growth)
+        rows = self._build('/bills', extra_bills=grown)
+        if rows and isinstance(rows[0], list):
+            return json.dumps([rows[0]] + rows[1 + since_row:]).encode()
+        return json.dumps(rows[since_row:]).encode()
+
+    def _build(self, route: str, extra_bills: int = 0) -> Optional[Any]:
+        if self.fixtures:
+            path = os.path.join(self.fixtures, f"{route.strip('/').replace('.json', '')}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    return json.load(f)
+        n = self.sizes
+        builders = {
+            '/students': lambda: synthetic.students(n['students']),
+            '/admissions': lambda: synthetic.admissions(n['admissions']),
+            '/gf': lambda: [{'Name': f"Applicant {i}", 'Subject': 'Computer Science', 'Qualification': 'MCA'}
+                            for i in range(50)],
+            '/documents': lambda: synthetic.documents(n['admissions']),
+            '/bills': lambda: synthetic.bills_rows(n['bills'] + extra_bills),
+            '/attendance': lambda: synthetic.attendance_matrix(n['attendance_students'], n['attendance_days']),
+            '/marks': lambda: synthetic.marks(n['students']),
+            '/updates.json': lambda: {
+                'last_updated': '2025-08-01',
+                'updates': [{'title': f"Notice {i}", 'date': '2025-08-01', 'link': ''} for i in range(5)],
+            },
+        }
+        builder = builders.get(route)
+        return builder() if builder else None
+
+
+def make_handler(config: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = 'application/json') -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _simulate(self) -> bool:
+            """Sleep for the configured latency; return False if an error is injected."""
+            time.sleep(config.delay())
+            if config.should_fail():
+                self._send(500, b'{"error": "injected failure"}')
+                return False
+            return True
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if not self._simulate():
+                return
+            since = parse_qs(parsed.query).get('since_row')
+            if parsed.path == '/bills' and (since or config.bills_growth):
+                body = config.bills_since(int(since[0]) if since else 0)
+            elif parsed.path == '/updates.json' and config.notices_growth:
+                body = config.updates()
+            elif parsed.path == '/telegram/stats':
+                body = json.dumps(config.telegram).encode()
+            else:
+                body = config.payload(parsed.path)
+            if body is None:
+                self._send(404, b'{"error": "unknown route"}')
+                return
+            self._send(200, body)
+
+        def do_POST(self):
+            parsed = urlparse(self.path)
+            length = int(self.headers.get('Content-Length', 0))
+            self.rfile.read(length)
+            if not parsed.path.endswith('/sendMessage'):
+                self._send(404, b'{"ok": false}')
+                return
+            if not self._simulate():
+                return
+            if not config.send_message():
+                self._send(429, b'{"ok": false, "error_code": 429, "description": "Too Many Requests: retry after 1", '
+                                b'"parameters": {"retry_after": 1}}')
+                return
+            self._send(200, b'{"ok": true, "result": {}}')
+
+    return Handler
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Base response latency')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- jitter around the base latency')
+    parser.add_argument('--tail-ms', type=float, default=0, help='Latency of slow (cold-start) responses')
+    parser.add_argument('--tail-rate', type=float, default=0, help='Fraction of responses that are slow')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of responses that fail with HTTP 500')
+    parser.add_argument('--fixtures', help='Directory of recorded <route>.json payloads to serve')
+    parser.add_argument('--students', type=int, default=1500)
+    parser.add_argument('--admissions', type=int, default=600)
+    parser.add_argument('--bills', type=int, default=3000)
+    parser.add_argument('--bills-growth', type=float, default=0, help='New bills rows per minute (delta sync tests)')
+    parser.add_argument('--notices-growth', type=float, default=0, help='New notices per minute (broadcast tests)')
+    parser.add_argument('--telegram-rate', type=int, default=0, help='sendMessage calls per second before 429 (0: no limit)')
+    parser.add_argument('--attendance-students', type=int, default=60)
+    parser.add_argument('--attendance-days', type=int, default=80)
+    parser.add_argument('--seed', type=int, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StubConfig(args)))
+    server.daemon_threads = True
+    base = f"http://{args.host}:{args.port}"
+    print(f"Stub upstream listening on {base}. Point the portal at it with:")
+    for env, route in ENV_ROUTES.items():
+        print(f"  export {env}={base}{route}")
+    print(f"  export TELEGRAM_API_BASE={base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Synthetic Apps Script payloads shaped like the portal's Google Sheets.
+
+Every generator is deterministic for a given seed so benchmark runs are
+comparable, and returns plain JSON-compatible data exactly as the Apps Script
+endpoints would (list-of-dicts, or list-of-lists with a header row).
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+BATCHES = ['24-27', '25-28']
+SECTIONS = ['A', 'B', 'C']
+SEAT_CATEGORIES = ['GM', '2A', '2B', '3A', '3B', 'SC', 'ST', 'CAT-1', 'Management', '']
+SUBJECTS = [
+    ('Discrete Structures', 'DS'), ('Problem Solving Technique', 'PST'), ('Computer Architecture', 'CA'),
+    ('Probability & Statistics', 'PS'), ('Artificial Intelligence', 'AI'), ('Database Systems', 'DBMS'),
+    ('Machine Learning', 'ML'), ('Web Technologies', 'WT'), ('Python Lab ', 'PYL'), ('DBMS Lab ', 'DBL'),
+]
+CLASSES = ['I Sem A', 'I Sem B', 'III Sem A', 'III Sem B', 'III Sem C', 'V Sem A', 'V Sem B']
+FIRST_NAMES = ['ANANYA', 'RAHUL', 'PRIYA', 'KIRAN', 'SNEHA', 'ARJUN', 'DIVYA', 'MANOJ', 'KAVYA', 'ROHAN']
+LAST_NAMES = ['RAO', 'SHARMA', 'GOWDA', 'REDDY', 'NAIK', 'KUMAR', 'HEGDE', 'SHETTY', 'IYER', 'PATIL']
+
+# Apps Script serialises sheet dates as UTC ISO strings of local midnight
+_IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _sheet_date(d: date) -> str:
+    local_midnight = datetime(d.year, d.month, d.day, tzinfo=_IST)
+    return local_midnight.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def usn(i: int) -> str:
+    """USN of the i-th synthetic student (matches students() and attendance_matrix())."""
+    return f"U03BS24S{i:04d}"
+
+
+def dob(i: int) -> str:
+    """Date of birth (DD/MM/YYYY) of the i-th synthetic student."""
+    d = date(2004, 1, 1) + timedelta(days=(i * 37) % 1500)
+    return d.strftime('%d/%m/%Y')
+
+
+def students(n: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Student login sheet (STUDENT_DATA_for_login) as list-of-dicts."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            'USN': usn(i),
+            'Name': _name(rng),
+            'DOB': dob(i),
+            'Batch': rng.choice(BATCHES),
+            'Semester': rng.choice(['1', '3', '5']),
+            'Section': rng.choice(SECTIONS),
+            'Category': rng.choice(SEAT_CATEGORIES[:-1]),
+            'Email': f"student{i}@example.edu",
+            'Phone': f"9{rng.randrange(10**8, 10**9):09d}",
+            'Parent Phone': f"8{rng.randrange(10**8, 10**9):09d}",
+            'Parent Email': f"parent{i // 2}@example.com",
+        })
+    return rows
+
+
+def admissions(n: int, seed: int = 2) -> List[Dict[str, Any]]:
+    """Admission applications sheet (ADMISSION_SCRIPT_URL) as list-of-dicts."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            'Application': 250000 + i,
+            'Candidate Name': _name(rng),
+            'Rank': rng.randrange(1, 50000),
+            'Seat Category': rng.choice(SEAT_CATEGORIES),
+            'Joining': rng.choice(['Y', 'Y', 'Y', 'N', '']),
+            'Phone': f"9{rng.randrange(10**8, 10**9):09d}",
+            '1st Installment': rng.choice([0, 5000, 10000, 15000]),
+            '2nd Installment': rng.choice([0, 0, 5000, 10000]),
+            'Remarks': rng.choice(['', '', 'Documents pending', 'Fee waiver']),
+        })
+    return rows
+
+
+def documents(n: int, seed: int = 3) -> List[Dict[str, Any]]:
+    """Documents tracking sheet (STUDENTS_DOCUMENT_SCripts) as list-of-dicts."""
+    rng = random.Random(seed)
+    docs = ['SSLC Marks Card', 'PUC Marks Card', 'Transfer Certificate', 'Caste Certificate', 'Aadhaar']
+    rows = []
+    for i in range(n):
+        row = {'SL No.': i + 1, 'USN No': usn(i), 'Student Name': _name(rng)}
+        for d in docs:
+            row[d] = rng.choice(['Submitted', 'Submitted', 'Pending', ''])
+        rows.append(row)
+    return rows
+
+
+BILLS_HEADER = [
+    'Timestamp', 'Date', 'Diary Number', 'Select Class and Section', 'Choose Subject',
+    'Topics Covered', 'Duration', 'CLAMING HOURS', 'Faculty Name - Email',
+]
+
+
+def bills_rows(n: int, fmt: str = 'lists', faculty_count: int = 12,
+               start: date = date(2025, 6, 2), seed: int = 4) -> List[Any]:
+    """Faculty bills diary (FACULTY_BILLS_SCRIPT) as list-of-lists or list-of-dicts.
+
+    Args:
+        n: Number of diary entries
+        fmt: 'lists' (header row + rows) or 'dicts'
+        faculty_count: Number of distinct faculty
+        start: Date of the first entry; entries spread over following weekdays
+        seed: Random seed
+
+    Returns:
+        Payload as returned by the Apps Script endpoint
+    """
+    rng = random.Random(seed)
+    faculty = [f"{_name(rng).title()} - fac{i}@example.edu" for i in range(faculty_count)]
+    per_day = max(1, faculty_count // 2)
+    rows = []
+    for i in range(n):
+        d = start + timedelta(days=(i // per_day) * 7 // 6)
+        if d.weekday() == 6:
+            d += timedelta(days=1)
+        subject, code = rng.choice(SUBJECTS)
+        duration = rng.choice([1, 1, 1, 2, 3])
+        rows.append([
+            _sheet_date(d),
+            _sheet_date(d),
+            1000 + i,
+            rng.choice(CLASSES),
+            f"{subject} - {code}",
+            f"Unit {rng.randrange(1, 6)}: topic {rng.randrange(1, 30)}",
+            duration,
+            rng.choice(['', duration]),
+            rng.choice(faculty),
+        ])
+    if fmt == 'dicts':
+        return [dict(zip(BILLS_HEADER, r)) for r in rows]
+    return [list(BILLS_HEADER)] + rows
+
+
+def marks(n_students: int, seed: int = 6) -> List[Dict[str, Any]]:
+    """Internal assessment marks sheet (MARKS_SCRIPT_URL): one row per student and subject.
+
+    IA 3 is not conducted yet for the fifth semester, and a few students are
+    absent ('AB') for an assessment.
+    """
+    rng = random.Random(seed)
+    semesters = {'1': ['DS', 'PST', 'CA'], '3': ['PS', 'AI', 'DBMS'], '5': ['ML', 'WT']}
+    rows = []
+    for i in range(n_students):
+        semester = rng.choice(list(semesters))
+        name = _name(rng)
+        for subject in semesters[semester]:
+            def score(maximum: int) -> Any:
+                return 'AB' if rng.random() < 0.03 else rng.randint(maximum // 4, maximum)
+            rows.append({
+                'USN': usn(i), 'Name': name, 'Semester': semester, 'Subject Code': subject,
+                'IA 1': score(20), 'IA 2': score(20), 'IA 3': '' if semester == '5' else score(20),
+                'Assignment (10)': score(10),
+            })
+    return rows
+
+
+def attendance_matrix(n_students: int, n_days: int, start: date = date(2025, 7, 1),
+                      absent_rate: float = 0.15, seed: int = 5) -> List[List[Any]]:
+    """Attendance sheet (ATTENDANCE_Script) for one batch/semester/section/subject.
+
+    Row layout matches what the Telegram bot reads: USN, Name, percentage,
+    then one 'P'/'A' column per class date.
+    """
+    rng = random.Random(seed)
+    dates = []
+    d = start
+    while len(dates) < n_days:
+        if d.weekday() < 6:
+            dates.append(_sheet_date(d))
+        d += timedelta(days=1)
+
+    matrix = [['USN', 'Name', 'Percentage'] + dates]
+    for i in range(n_students):
+        # Some students are chronic absentees so defaulter lists are non-empty
+        rate = absent_rate * (3 if i % 7 == 0 else 1)
+        marks = ['A' if rng.random() < rate else 'P' for _ in dates]
+        pct = round(100 * marks.count('P') / len(marks), 2) if marks else 0
+        matrix.append([usn(i), _name(rng), f"{pct}%"] + marks)
+    return matrix
@@ -1,10 +1,13 @@
 """Admin-related routes: dashboard, applications, data management."""
 
 import logging
+from datetime import datetime
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
 from utils.auth_helpers import validate_admin_credentials
 from utils.data_fetcher import get_admission_data, get_gf_applications, get_documents_tracking_data
-import pandas as pd
+from utils.admission_helpers import compute_admission_stats
+from utils import exports, live_feed, login_throttle
+from utils.attendance_analytics import get_attendance_summary
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +18,16 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 def login():
     """Admin login page."""
     error = None
+    status = 200
     
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
         password = request.form.get('password', '').strip()
         
-        if validate_admin_credentials(username, password):
+        if not login_throttle.allow('admin', username):
+            status = 429
+            error = login_throttle.THROTTLED_MESSAGE
+        elif validate_admin_credentials(username, password):
             session['logged_in'] = True
             session['role'] = 'Admin'
             session['username'] = username
@@ -32,7 +39,7 @@ def login():
             error = 'Invalid credentials'
             logger.warning(f"Failed admin login attempt: {username}")
     
-    return render_template('login.html', role='Admin', error=error)
+    return render_template('login.html', role='Admin', error=error), status
 
 
 @admin_bp.route('/dashboard')
@@ -72,57 +79,53 @@ def admission_applications():
         return redirect(url_for('admin.login'))
     
     try:
+        live_version = live_feed.current_version('admissions')
         data_df = get_admission_data()
         
         if data_df is None or data_df.empty:
             logger.error('Admission data not available')
             return render_template('error.html', message='Admission data currently unavailable.')
         
-        # Defensive column selection
-        for col in ['Application', 'Candidate Name', 'Rank', 'Seat Category', 'Joining']:
-            if col not in data_df.columns:
-                data_df[col] = ''
-        
+        stats = compute_admission_stats(data_df)
         student_preview = data_df[['Application', 'Candidate Name', 'Rank']].fillna('')
-        
-        # Seat statistics
-        total_seats = 180
-        filled_seats = data_df['Seat Category'].fillna('').astype(str).str.strip().replace('', pd.NA).dropna().shape[0]
-        vacant_seats = total_seats - filled_seats
-        
-        # Sum up all installment columns
-        installment_cols = [col for col in data_df.columns if 'Installment' in col]
-        if installment_cols:
-            total_collected = data_df[installment_cols].apply(pd.to_numeric, errors='coerce').fillna(0).sum().sum()
-        else:
-            total_collected = 0
-        
-        # Withdrawals and actual strength
-        withdrawing_students = 0
-        try:
-            withdrawing_students = data_df[data_df['Joining'].astype(str).str.upper().str.strip() == 'N'].shape[0]
-        except Exception:
-            withdrawing_students = 0
-        actual_strength = filled_seats - withdrawing_students
-        
         student_full = data_df.fillna('').to_dict('records')
         
         return render_template(
             'admissionApp.html',
             student_full=student_full,
             students=student_preview.to_dict('records'),
-            total_seats=total_seats,
-            filled_seats=filled_seats,
-            vacant_seats=vacant_seats,
-            withdrawing_students=withdrawing_students,
-            actual_strength=actual_strength,
-            total_collected=int(total_collected)
+            live_url=url_for('admin.live_admissions', since=live_version),
+            export_url=url_for('admin.export_admissions'),
+            **stats
         )
     except Exception as err:
         logger.exception("Admission application error")
         return render_template('error.html', message="Error loading admission data.")
 
 
+@admin_bp.route('/admission-applications/export')
+def export_admissions():
+    """CSV/XLSX export of admissions (?search=...&status=joined|withdrawn|refund|all&format=csv|xlsx)."""
+    if not session.get('logged_in') or session.get('role') != 'Admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('admin.login'))
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in exports.FORMATS:
+        return "Unsupported export format", 400
+
+    try:
+        data_df = get_admission_data()
+        if data_df is None:
+            return "Admission data currently unavailable", 503
+
+        rows = exports.filter_admissions(data_df, request.args.get('search', ''), request.args.get('status', 'all'))
+        return exports.export_response(rows, fmt, f"admissions_{datetime.now():%Y%m%d}", 'Admissions')
+    except Exception:
+        logger.exception("Admission export error")
+        return "Error generating export", 500
+
+
 @admin_bp.route('/api/student/<app_id>')
 def api_view_student(app_id):
     """API endpoint to get student details by application ID."""
@@ -160,6 +163,7 @@ def documents_tracking():
         return redirect(url_for('admin.login'))
     
     try:
+        live_version = live_feed.current_version('documents_tracking')
         data_df = get_documents_tracking_data()
         
         if data_df is None or data_df.empty:
@@ -175,13 +179,63 @@ def documents_tracking():
         return render_template(
             'documents_tracking.html',
             students=student_preview.to_dict('records'),
-            student_full=student_full
+            student_full=student_full,
+            live_url=url_for('admin.live_documents_tracking', since=live_version),
+            export_url=url_for('admin.export_documents_tracking')
         )
     except Exception as err:
         logger.exception("Documents tracking error")
         return render_template('error.html', message="Error loading documents tracking data.")
 
 
+@admin_bp.route('/documents-tracking/export')
+def export_documents_tracking():
+    """CSV/XLSX export of documents tracking (?search=&status=&section=&quota=&format=)."""
+    if not session.get('logged_in') or session.get('role') != 'Admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('admin.login'))
+    return exports.documents_export()
+
+
+@admin_bp.route('/attendance-analytics')
+def attendance_analytics():
+    """Department-wide attendance: defaulters, section averages and subject trends."""
+    if not session.get('logged_in') or session.get('role') != 'Admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('admin.login'))
+
+    try:
+        summary = get_attendance_summary()
+        if summary is None:
+            return render_template('error.html', message='Attendance data currently unavailable.')
+
+        return render_template(
+            'attendance_analytics.html',
+            summary=summary,
+            generated=datetime.fromtimestamp(summary['generated_at']).strftime('%d %b %Y, %I:%M %p'),
+            back_url=url_for('admin.dashboard')
+        )
+    except Exception:
+        logger.exception("Attendance analytics error")
+        return render_template('error.html', message="Error loading attendance analytics.")
+
+
+@admin_bp.route('/live/admissions')
+def live_admissions():
+    """Server-Sent Events stream of admission changes (new applicants, seat categories, stats)."""
+    if not session.get('logged_in') or session.get('role') != 'Admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return live_feed.sse_response('admissions')
+
+
+@admin_bp.route('/live/documents-tracking')
+def live_documents_tracking():
+    """Server-Sent Events stream of documents tracking changes (new submissions)."""
+    if not session.get('logged_in') or session.get('role') != 'Admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return live_feed.sse_response('documents_tracking')
+
+
 @admin_bp.route('/logout')
 def logout():
     """Log out admin."""
@@ -4,6 +4,7 @@ import logging
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
 from utils.auth_helpers import validate_attender_credentials
 from utils.data_fetcher import get_documents_tracking_data
+from utils import exports, live_feed, login_throttle
 
 logger = logging.getLogger(__name__)
 
@@ -14,12 +15,16 @@ attender_bp = Blueprint('attender', __name__, url_prefix='/attender')
 def login():
     """Attender login page."""
     error = None
+    status = 200
 
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
         password = request.form.get('password', '').strip()
 
-        if validate_attender_credentials(username, password):
+        if not login_throttle.allow('attender', username):
+            status = 429
+            error = login_throttle.THROTTLED_MESSAGE
+        elif validate_attender_credentials(username, password):
             session['logged_in'] = True
             session['role'] = 'Attender'
             session['username'] = username
@@ -31,7 +36,7 @@ def login():
             error = 'Invalid credentials'
             logger.warning(f"Failed attender login attempt: {username}")
 
-    return render_template('login.html', role='Attender', error=error)
+    return render_template('login.html', role='Attender', error=error), status
 
 
 @attender_bp.route('/dashboard')
@@ -52,6 +57,7 @@ def documents_tracking():
         return redirect(url_for('attender.login'))
 
     try:
+        live_version = live_feed.current_version('documents_tracking')
         data_df = get_documents_tracking_data()
 
         if data_df is None or data_df.empty:
@@ -67,13 +73,32 @@ def documents_tracking():
         return render_template(
             'documents_tracking.html',
             students=student_preview.to_dict('records'),
-            student_full=student_full
+            student_full=student_full,
+            live_url=url_for('attender.live_documents_tracking', since=live_version),
+            export_url=url_for('attender.export_documents_tracking')
         )
     except Exception as err:
         logger.exception("Documents tracking error")
         return render_template('error.html', message="Error loading documents tracking data.")
 
 
+@attender_bp.route('/documents-tracking/export')
+def export_documents_tracking():
+    """CSV/XLSX export of documents tracking (?search=&status=&section=&quota=&format=)."""
+    if not session.get('logged_in') or session.get('role') != 'Attender':
+        flash('Access denied', 'danger')
+        return redirect(url_for('attender.login'))
+    return exports.documents_export()
+
+
+@attender_bp.route('/live/documents-tracking')
+def live_documents_tracking():
+    """Server-Sent Events stream of documents tracking changes (new submissions)."""
+    if not session.get('logged_in') or session.get('role') != 'Attender':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return live_feed.sse_response('documents_tracking')
+
+
 @attender_bp.route('/logout')
 def logout():
     """Log out attender."""
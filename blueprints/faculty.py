@@ -1,35 +1,43 @@
 """Faculty-related routes: login, dashboard, view applications, bills report."""
 
 import logging
-from datetime import datetime
-from io import BytesIO
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, send_file
+from datetime import date, datetime
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, send_file, jsonify
 from utils.auth_helpers import validate_faculty_credentials
 from utils.data_fetcher import get_gf_applications, get_admission_data, get_faculty_bills_data
 from utils.faculty_bills_helpers import (
-    build_months_structure, 
+    get_months_structure, 
+    get_bills_index,
     filter_and_assign_sl, 
+    period_presets,
+    query_bills_range,
     COMBINED_HEADER
 )
-from docx import Document
-from docx.shared import Pt, RGBColor
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from utils.bills_docx import build_bills_docx
+from utils import exports, jobs, login_throttle
+from utils.attendance_analytics import get_attendance_summary
 
 logger = logging.getLogger(__name__)
 
 faculty_bp = Blueprint('faculty', __name__, url_prefix='/faculty')
 
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
 
 @faculty_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """Faculty login page."""
     error = None
+    status = 200
     
     if request.method == 'POST':
         username = request.form.get('username', '').strip()
         password = request.form.get('password', '').strip()
         
-        if validate_faculty_credentials(username, password):
+        if not login_throttle.allow('faculty', username):
+            status = 429
+            error = login_throttle.THROTTLED_MESSAGE
+        elif validate_faculty_credentials(username, password):
             session['logged_in'] = True
             session['role'] = 'Faculty'
             session['username'] = username
@@ -41,7 +49,7 @@ def login():
             error = 'Invalid username or password. Please try again.'
             logger.warning(f"Failed faculty login attempt: {username}")
     
-    return render_template('faculty_login.html', role='Faculty', error=error)
+    return render_template('faculty_login.html', role='Faculty', error=error), status
 
 
 @faculty_bp.route('/dashboard')
@@ -102,7 +110,7 @@ def bills_report():
             flash('Unable to fetch faculty bills data', 'warning')
             return render_template('error.html', message='Bills data temporarily unavailable')
         
-        months, faculty_list = build_months_structure(df)
+        months, faculty_list = get_months_structure(df)
         
         # months available sorted newest first
         month_keys = sorted(months.keys(), key=lambda s: datetime.strptime(s, "%B %Y"), reverse=True) if months else []
@@ -145,6 +153,9 @@ def generate_bills_docx():
     """
     Generate DOCX report for faculty bills (?month=...&faculty=...).
     Uses the same filtering & SL assignment logic as bills_report.
+
+    Fallback for browsers without JavaScript: the page runs the report as a
+    job (submit_report), this route renders it on the request thread.
     """
     if session.get('role') != 'Faculty':
         flash('Access denied', 'danger')
@@ -161,7 +172,7 @@ def generate_bills_docx():
         if df is None or df.empty:
             return "Bills data not available", 503
         
-        months, faculty_list = build_months_structure(df)
+        months, faculty_list = get_months_structure(df)
         if month not in months:
             return f"No data for {month}", 404
         
@@ -170,237 +181,283 @@ def generate_bills_docx():
         if not rendered_weeks:
             return f"No data for {month} and faculty {faculty}", 404
         
-        # create DOCX with A4 portrait orientation
-        doc = Document()
-        
-        # Set A4 portrait with narrow margins
-        sections = doc.sections
-        for section in sections:
-            section.page_height = Pt(842)       # A4 height (297mm) 
-            section.page_width = Pt(595)        # A4 width (210mm)
-            section.left_margin = Pt(36)        # 0.5 inch
-            section.right_margin = Pt(36)       # 0.5 inch
-            section.top_margin = Pt(36)         # 0.5 inch
-            section.bottom_margin = Pt(36)      # 0.5 inch
-        
-        # Configure default style - Times New Roman 11pt
-        style = doc.styles['Normal']
-        style.font.name = 'Times New Roman'
-        style.font.size = Pt(11)
-        
-        # Header section matching the image format
-        h = doc.add_paragraph()
-        run = h.add_run("BANGALORE UNIVERSITY")
-        run.bold = True
-        run.font.size = Pt(14)
-        run.font.name = 'Times New Roman'
-        run.underline = True
-        h.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        h.space_after = Pt(6)
-        
-        # Department and Annexure line
-        dept_line = doc.add_paragraph()
-        dept_run = dept_line.add_run("Department:     BCA")
-        dept_run.bold = True
-        dept_run.font.size = Pt(11)
-        dept_run.font.name = 'Times New Roman'
-        dept_run.underline = True
-        
-        # Add tabs/spaces for annexure
-        dept_line.add_run("                    ")
-        annex_run = dept_line.add_run("ANNEXURE (time table need to be attached)")
-        annex_run.bold = True
-        annex_run.font.size = Pt(11)
-        annex_run.font.name = 'Times New Roman'
-        annex_run.underline = True
-        dept_line.space_after = Pt(3)
-        
-        # Workload line
-        workload = doc.add_paragraph()
-        workload.add_run("                                                                         ")
-        workload_run = workload.add_run("Workload allotted per Week . . . . . .16 hours . . . . . .")
-        workload_run.bold = True
-        workload_run.font.size = Pt(11)
-        workload_run.font.name = 'Times New Roman'
-        workload.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
-        workload.space_after = Pt(8)
-        
-        # Create tables for each week
-        cols = [
-            "Sl.\nNo", "Dair\ny No.", "Date", "Particulars / chapter / lectures (as per\nTime Table) I / II / III / IV / V / VI Sem",
-            "Actual\nhours", "Claiming hours\n(Lab period\nreduced by 3/4)", "Subject\ncode"
-        ]
-        
-        # Optimized column widths for A4 portrait (595pt width - 72pt margins = ~523pt usable)
-        # Squeeze intelligently: minimize fixed columns, maximize content column
-        col_widths_pt = [28, 35, 55, 250, 40, 70, 45]  # Total: ~523pt
-        
-        for w in rendered_weeks:
-            week_label = f"Week {w['week_number']}: {w['display_start'].strftime('%d %b %Y')} — {w['display_end'].strftime('%d %b %Y')}"
-            week_para = doc.add_paragraph(week_label)
-            week_para.space_before = Pt(8)
-            week_para.space_after = Pt(4)
-            for run in week_para.runs:
-                run.bold = True
-                run.font.size = Pt(11)
-                run.font.name = 'Times New Roman'
-            
-            rows = []
-            for e in w["entries"]:
-                rows.append([
-                    str(e.get("SL No", "")),
-                    str(e.get("Dairy No.", "")),
-                    e.get("Date"),
-                    e.get(COMBINED_HEADER, ""),
-                    f"{e.get('Actual hours', 0):.1f}",
-                    f"{e.get('Claiming hours', 0):.1f}",
-                    e.get("Subject code", "")
-                ])
-            
-            if not rows:
-                continue
-            
-            table = doc.add_table(rows=1 + len(rows) + 1, cols=len(cols))
-            table.style = 'Table Grid'
-            table.autofit = False
-            table.allow_autofit = False
-            
-            # Set column widths in points
-            for i, width in enumerate(col_widths_pt):
-                for row in table.rows:
-                    row.cells[i].width = Pt(width)
-            
-            # Header row styling - Times New Roman 9pt (smaller for portrait fit)
-            hdr_cells = table.rows[0].cells
-            for i, c in enumerate(cols):
-                p = hdr_cells[i].paragraphs[0]
-                p.clear()
-                run = p.add_run(c)
-                run.bold = True
-                run.font.size = Pt(9)
-                run.font.name = 'Times New Roman'
-                p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                p.space_before = Pt(2)
-                p.space_after = Pt(2)
-            
-            # Data rows - Times New Roman 9pt with text wrapping (compact for portrait)
-            for r_idx, row_data in enumerate(rows, start=1):
-                row_cells = table.rows[r_idx].cells
-                for c_idx, val in enumerate(row_data):
-                    p = row_cells[c_idx].paragraphs[0]
-                    p.clear()
-                    run = p.add_run(str(val))
-                    run.font.size = Pt(9)
-                    run.font.name = 'Times New Roman'
-                    p.space_before = Pt(1)
-                    p.space_after = Pt(1)
-                    # Center align numeric columns
-                    if c_idx in [0, 1, 4, 5]:
-                        p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                    # Enable text wrapping for long content
-                    row_cells[c_idx].width = Pt(col_widths_pt[c_idx])
-            
-            # Totals row - Times New Roman 9pt bold (compact for portrait)
-            total_row_cells = table.rows[1 + len(rows)].cells
-            for i in range(len(cols)):
-                p = total_row_cells[i].paragraphs[0]
-                p.clear()
-                p.space_before = Pt(2)
-                p.space_after = Pt(2)
-                
-                if i == 0:
-                    run = p.add_run("Weekly Total")
-                    run.bold = True
-                    run.font.size = Pt(9)
-                    run.font.name = 'Times New Roman'
-                elif i == 4:
-                    run = p.add_run(f"{w['week_total_actual']:.1f}")
-                    run.bold = True
-                    run.font.size = Pt(9)
-                    run.font.name = 'Times New Roman'
-                    p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                elif i == 5:
-                    run = p.add_run(f"{w['week_total_claiming']:.1f}")
-                    run.bold = True
-                    run.font.size = Pt(9)
-                    run.font.name = 'Times New Roman'
-                    p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        
-        # Calculate total claiming hours for all weeks
-        total_claiming = sum(w['week_total_claiming'] for w in rendered_weeks)
-        
-        # Add footer section
-        doc.add_paragraph("")
-        doc.add_paragraph("")
-        
-        # Total monthly working hours and remuneration
-        total_line = doc.add_paragraph()
-        total_hours_run = total_line.add_run(f"Total monthly working hours: {total_claiming:.1f}")
-        total_hours_run.bold = True
-        total_hours_run.font.size = Pt(11)
-        total_hours_run.font.name = 'Times New Roman'
-        
-        total_line.add_run("                    ")
-        
-        total_renum_run = total_line.add_run(f"Total remuneration claiming - {total_claiming * 1000:.0f}/-")
-        total_renum_run.bold = True
-        total_renum_run.font.size = Pt(11)
-        total_renum_run.font.name = 'Times New Roman'
-        total_line.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        total_line.space_after = Pt(24)
-        
-        doc.add_paragraph("")
-        doc.add_paragraph("")
-        
-        # Date and Signature line
-        date_sig = doc.add_paragraph()
-        date_run = date_sig.add_run(f"Date: {datetime.now().strftime('%d / %m / %Y')}")
-        date_run.font.size = Pt(11)
-        date_run.font.name = 'Times New Roman'
-        
-        date_sig.add_run("                                                                              ")
-        sig_run = date_sig.add_run("Signature of the Guest Faculty")
-        sig_run.font.size = Pt(11)
-        sig_run.font.name = 'Times New Roman'
-        date_sig.space_after = Pt(36)
-        
-        doc.add_paragraph("")
-        doc.add_paragraph("")
-        
-        # Certification text
-        cert = doc.add_paragraph()
-        cert.add_run("       ")
-        cert_run = cert.add_run(
-            "Certified that, the above Guest Faculty has been handled the Classes allotted to him/her as per the Time "
-            "Table and as per the Attendance Record maintained in the department. The said dates and hours are is in order."
-        )
-        cert_run.font.size = Pt(11)
-        cert_run.font.name = 'Times New Roman'
-        cert.space_after = Pt(48)
-        
-        doc.add_paragraph("")
-        doc.add_paragraph("")
-        doc.add_paragraph("")
-        
-        # Chairman signature line
-        chairman = doc.add_paragraph()
-        chairman.add_run("                                                                                                                          ")
-        chairman_run = chairman.add_run("Chairman / Chairperson")
-        chairman_run.bold = True
-        chairman_run.font.size = Pt(11)
-        chairman_run.font.name = 'Times New Roman'
-        
-        bio = BytesIO()
-        doc.save(bio)
-        bio.seek(0)
+        bio = build_bills_docx(rendered_weeks)
         filename = f"report_{month.replace(' ', '_')}_{faculty.replace(' ', '_')}.docx"
         return send_file(bio, as_attachment=True, download_name=filename,
-                         mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+                         mimetype=DOCX_MIMETYPE)
     except Exception as e:
         logger.exception("Error generating DOCX report")
         return "Error generating report", 500
 
 
+@faculty_bp.route('/bills-report/export')
+def export_bills():
+    """CSV/XLSX export of the monthly report (?month=...&faculty=...&format=csv|xlsx)."""
+    if session.get('role') != 'Faculty':
+        flash('Access denied', 'danger')
+        return redirect(url_for('faculty.login'))
+
+    fmt = request.args.get("format", "csv")
+    month = request.args.get("month")
+    faculty = request.args.get("faculty", "All")
+    if fmt not in exports.FORMATS:
+        return "Unsupported export format", 400
+
+    try:
+        df = get_faculty_bills_data()
+        if df is None or df.empty:
+            return "Bills data not available", 503
+
+        months, _ = get_months_structure(df)
+        if month not in months:
+            return "Invalid month", 400
+
+        weeks = filter_and_assign_sl(months, month, faculty)
+        return exports.export_response(exports.bills_frame(weeks), fmt,
+                                       f"bills_{month.replace(' ', '_')}_{faculty.replace(' ', '_')}", month)
+    except Exception:
+        logger.exception("Error exporting bills")
+        return "Error generating export", 500
+
+
+def _selected_range(presets):
+    """(start, end, label) from ?start=&end= (ISO dates) or ?period=<preset label>.
+
+    Defaults to the newest preset (the current academic year); None if nothing applies.
+    """
+    start_arg, end_arg = request.args.get('start'), request.args.get('end')
+    if start_arg and end_arg:
+        try:
+            start, end = date.fromisoformat(start_arg), date.fromisoformat(end_arg)
+        except ValueError:
+            return None
+        if start > end:
+            start, end = end, start
+        return start, end, f"{start.strftime('%d %b %Y')} – {end.strftime('%d %b %Y')}"
+
+    period = request.args.get('period')
+    for p in presets:
+        if p['label'] == period:
+            return p['start'], p['end'], p['label']
+    return (presets[0]['start'], presets[0]['end'], presets[0]['label']) if presets else None
+
+
+@faculty_bp.route('/bills-range')
+def bills_range_report():
+    """
+    Faculty bills over a date range (semester, academic year or custom dates).
+    Shows monthly, semester and per-faculty totals and the numbered weekly records.
+    """
+    if session.get('role') != 'Faculty':
+        flash('Access denied', 'danger')
+        return redirect(url_for('faculty.login'))
+
+    try:
+        df = get_faculty_bills_data()
+        if df is None or df.empty:
+            flash('Unable to fetch faculty bills data', 'warning')
+            return render_template('error.html', message='Bills data temporarily unavailable')
+
+        _, faculty_list = get_months_structure(df)
+        index = get_bills_index(df)
+        presets = period_presets(index)
+
+        faculty_list = ["All"] + [f for f in faculty_list if f != "All"]
+        selected_faculty = request.args.get("faculty", "All")
+        if selected_faculty not in faculty_list:
+            selected_faculty = "All"
+
+        selected = _selected_range(presets)
+        if selected is None:
+            flash('Invalid date range', 'warning')
+        report = query_bills_range(index, selected[0], selected[1], selected_faculty) if selected else None
+
+        return render_template("faculty_bills_range.html",
+                               presets=presets,
+                               faculty_list=faculty_list,
+                               selected_faculty=selected_faculty,
+                               selected_label=selected[2] if selected else None,
+                               report=report,
+                               combined_header=COMBINED_HEADER)
+    except Exception:
+        logger.exception("Error loading faculty bills range report")
+        return render_template('error.html', message='Error loading bills data')
+
+
+@faculty_bp.route('/bills-range/docx')
+def generate_bills_range_docx():
+    """Generate the DOCX report for a date range (same parameters as bills_range_report).
+
+    Fallback for browsers without JavaScript, rendered on the request thread;
+    the page runs the report as a job (submit_report).
+    """
+    if session.get('role') != 'Faculty':
+        flash('Access denied', 'danger')
+        return redirect(url_for('faculty.login'))
+
+    faculty = request.args.get("faculty", "All")
+    try:
+        df = get_faculty_bills_data()
+        if df is None or df.empty:
+            return "Bills data not available", 503
+
+        index = get_bills_index(df)
+        selected = _selected_range(period_presets(index))
+        if selected is None:
+            return "Invalid date range", 400
+
+        report = query_bills_range(index, selected[0], selected[1], faculty)
+        if not report["weeks"]:
+            return f"No data for {selected[2]} and faculty {faculty}", 404
+
+        bio = build_bills_docx(report["weeks"])
+        filename = f"report_{selected[0]:%Y%m%d}-{selected[1]:%Y%m%d}_{faculty.replace(' ', '_')}.docx"
+        return send_file(bio, as_attachment=True, download_name=filename,
+                         mimetype=DOCX_MIMETYPE)
+    except Exception:
+        logger.exception("Error generating range DOCX report")
+        return "Error generating report", 500
+
+
+@faculty_bp.route('/bills-range/export')
+def export_bills_range():
+    """CSV/XLSX export of the range report (same parameters as bills_range_report, plus format)."""
+    if session.get('role') != 'Faculty':
+        flash('Access denied', 'danger')
+        return redirect(url_for('faculty.login'))
+
+    fmt = request.args.get("format", "csv")
+    faculty = request.args.get("faculty", "All")
+    if fmt not in exports.FORMATS:
+        return "Unsupported export format", 400
+
+    try:
+        df = get_faculty_bills_data()
+        if df is None or df.empty:
+            return "Bills data not available", 503
+
+        index = get_bills_index(df)
+        selected = _selected_range(period_presets(index))
+        if selected is None:
+            return "Invalid date range", 400
+
+        report = query_bills_range(index, selected[0], selected[1], faculty)
+        return exports.export_response(exports.bills_frame(report["weeks"]), fmt,
+                                       f"bills_{selected[0]:%Y%m%d}-{selected[1]:%Y%m%d}_{faculty.replace(' ', '_')}",
+                                       f"{selected[0]:%d %b %Y} - {selected[1]:%d %b %Y}")
+    except Exception:
+        logger.exception("Error exporting bills range")
+        return "Error generating export", 500
+
+
+@jobs.handler('bills_docx')
+def _bills_docx_job(params, progress):
+    """Report job: bills DOCX for {'month'} or {'start', 'end'} (ISO dates), and 'faculty'."""
+    faculty = params.get("faculty", "All")
+    progress(0.05, 'Loading teaching records')
+    df = get_faculty_bills_data()
+    if df is None or df.empty:
+        raise jobs.JobError('Bills data not available, please try again later')
+
+    progress(0.3, 'Selecting entries')
+    if params.get("month"):
+        months, _ = get_months_structure(df)
+        if params["month"] not in months:
+            raise jobs.JobError(f"No data for {params['month']}")
+        weeks = filter_and_assign_sl(months, params["month"], faculty)
+        label = params["month"].replace(' ', '_')
+    else:
+        start, end = date.fromisoformat(params["start"]), date.fromisoformat(params["end"])
+        weeks = query_bills_range(get_bills_index(df), start, end, faculty)["weeks"]
+        label = f"{start:%Y%m%d}-{end:%Y%m%d}"
+    if not weeks:
+        raise jobs.JobError(f"No data for {label.replace('_', ' ')} and faculty {faculty}")
+
+    bio = build_bills_docx(weeks, lambda done: progress(0.35 + 0.6 * done, 'Writing DOCX'))
+    return jobs.Artifact(f"report_{label}_{faculty.replace(' ', '_')}.docx", DOCX_MIMETYPE, bio)
+
+
+def _job_owner():
+    return f"Faculty:{session.get('username', '')}"
+
+
+@faculty_bp.route('/reports', methods=['POST'])
+def submit_report():
+    """
+    Start a DOCX report in the background (form fields as for the DOCX routes:
+    month, or start and end, plus faculty). Returns the job id and status URL.
+    """
+    if session.get('role') != 'Faculty':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    params = {'faculty': request.form.get('faculty', 'All')}
+    if request.form.get('month'):
+        params['month'] = request.form['month']
+    else:
+        try:
+            params['start'] = date.fromisoformat(request.form.get('start', '')).isoformat()
+            params['end'] = date.fromisoformat(request.form.get('end', '')).isoformat()
+        except ValueError:
+            return jsonify({'error': 'Give a month or a start and end date'}), 400
+
+    try:
+        job_id = jobs.submit('bills_docx', params, _job_owner())
+    except jobs.JobRejected:
+        return jsonify({'error': 'The server is busy preparing other reports, please try again shortly'}), 429
+    return jsonify({'id': job_id, 'status_url': url_for('faculty.report_status', job_id=job_id)}), 202
+
+
+@faculty_bp.route('/reports/<job_id>')
+def report_status(job_id):
+    """Progress of a report job; includes download_url once it is ready."""
+    if session.get('role') != 'Faculty':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    job = jobs.get(job_id, _job_owner())
+    if job is None:
+        return jsonify({'error': 'Report not found'}), 404
+    if job['status'] == 'done':
+        job['download_url'] = url_for('faculty.download_report', job_id=job_id)
+    return jsonify(job)
+
+
+@faculty_bp.route('/reports/<job_id>/download')
+def download_report(job_id):
+    """Download the file of a finished report job."""
+    if session.get('role') != 'Faculty':
+        flash('Access denied', 'danger')
+        return redirect(url_for('faculty.login'))
+
+    job = jobs.get(job_id, _job_owner())
+    path = jobs.artifact_path(job) if job else None
+    if path is None:
+        return "Report not found or expired", 404
+    return send_file(path, as_attachment=True, download_name=job['filename'], mimetype=job['mimetype'])
+
+
+@faculty_bp.route('/attendance-analytics')
+def attendance_analytics():
+    """Department-wide attendance: defaulters, section averages and subject trends."""
+    if session.get('role') != 'Faculty':
+        flash('Access denied', 'danger')
+        return redirect(url_for('faculty.login'))
+
+    try:
+        summary = get_attendance_summary()
+        if summary is None:
+            return render_template('error.html', message='Attendance data currently unavailable.')
+
+        return render_template(
+            'attendance_analytics.html',
+            summary=summary,
+            generated=datetime.fromtimestamp(summary['generated_at']).strftime('%d %b %Y, %I:%M %p'),
+            back_url=url_for('faculty.dashboard')
+        )
+    except Exception:
+        logger.exception("Attendance analytics error")
+        return render_template('error.html', message="Error loading attendance analytics.")
+
+
 @faculty_bp.route('/logout')
 def logout():
     """Log out faculty."""
@@ -0,0 +1,44 @@
+"""Webhooks called by the Google Apps Scripts (no user session)."""
+
+import os
+import hmac
+import logging
+from flask import Blueprint, request, jsonify
+from utils.data_fetcher import DATASETS, invalidate_dataset
+
+logger = logging.getLogger(__name__)
+
+hooks_bp = Blueprint('hooks', __name__, url_prefix='/hooks')
+
+
+def _authorized() -> bool:
+    """Check the shared secret sent in the X-Webhook-Token header."""
+    secret = os.getenv('CACHE_WEBHOOK_SECRET')
+    token = request.headers.get('X-Webhook-Token', '')
+    return bool(secret) and hmac.compare_digest(token, secret)
+
+
+@hooks_bp.route('/cache-invalidate', methods=['POST'])
+def cache_invalidate():
+    """
+    Invalidate a cached dataset after its sheet changed, and refresh it in the background.
+
+    Called from an Apps Script onEdit/onFormSubmit trigger with JSON such as
+    {"dataset": "admissions"} or, for one attendance sheet,
+    {"dataset": "attendance", "batch": "24-27", "semester": "3", "section": "A", "subject": "DBMS"}.
+    """
+    if not _authorized():
+        logger.warning(f"Rejected cache invalidation from {request.remote_addr}")
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    payload = request.get_json(silent=True) or {}
+    dataset = str(payload.get('dataset', '')).strip()
+    attendance_key = None
+    if dataset == 'attendance' and payload.get('subject'):
+        attendance_key = {k: payload.get(k, '') for k in ('batch', 'semester', 'section', 'subject')}
+
+    if not invalidate_dataset(dataset, attendance_key):
+        return jsonify({'error': f"Unknown dataset '{dataset}'",
+                        'datasets': sorted(DATASETS) + ['attendance']}), 400
+
+    return jsonify({'status': 'accepted', 'dataset': dataset}), 202
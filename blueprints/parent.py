@@ -3,6 +3,9 @@
 import logging
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from utils.auth_helpers import validate_parent_credentials
+from utils.attendance_analytics import get_attendance_summary, student_attendance
+from utils import login_throttle
+from utils.marks import student_marks
 
 logger = logging.getLogger(__name__)
 
@@ -13,27 +16,31 @@ parent_bp = Blueprint('parent', __name__, url_prefix='/parent')
 def login():
     """Parent login page."""
     error = None
+    status = 200
     
     if request.method == 'POST':
         identifier = request.form.get('username', '').strip()
         password = request.form.get('password', '').strip()
         
-        # TODO: Implement actual parent authentication
-        parent_info = validate_parent_credentials(identifier, password)
-        
-        if parent_info:
-            session['role'] = 'Parent'
-            session['parent_id'] = identifier
-            session['parent_info'] = parent_info
-            
-            logger.info(f"Parent logged in: {identifier}")
-            flash('Welcome, Parent!', 'success')
-            return redirect(url_for('parent.dashboard'))
+        if not login_throttle.allow('parent', identifier):
+            status = 429
+            error = login_throttle.THROTTLED_MESSAGE
         else:
-            error = 'Invalid credentials. Parent authentication is not yet fully implemented.'
-            logger.warning(f"Failed parent login attempt: {identifier}")
+            parent_info = validate_parent_credentials(identifier, password)
+            
+            if parent_info:
+                session['role'] = 'Parent'
+                session['parent_id'] = parent_info['contact']
+                session['parent_info'] = parent_info
+                
+                logger.info(f"Parent logged in: {identifier} ({len(parent_info['children'])} linked students)")
+                flash('Welcome, Parent!', 'success')
+                return redirect(url_for('parent.dashboard'))
+            else:
+                error = "Invalid credentials. Use the phone number or email registered with the department and your child's date of birth."
+                logger.warning(f"Failed parent login attempt: {identifier}")
     
-    return render_template('parent_login.html', role='Parent', error=error)
+    return render_template('parent_login.html', role='Parent', error=error), status
 
 
 @parent_bp.route('/dashboard')
@@ -43,8 +50,29 @@ def dashboard():
         flash('Please log in as parent', 'warning')
         return redirect(url_for('parent.login'))
     
-    # TODO: Fetch linked student data
-    return render_template('parent_dashboard.html')
+    children = session.get('parent_info', {}).get('children', [])
+    
+    # One cached summary and marks store for all parents; no sheet is read per request
+    summary = None
+    try:
+        summary = get_attendance_summary()
+    except Exception:
+        logger.exception("Error loading attendance summary for parent dashboard")
+    
+    students, components = [], []
+    for child in children:
+        marks_data = None
+        try:
+            marks_data, components = student_marks(child['usn'])
+        except Exception:
+            logger.exception("Error loading marks for parent dashboard")
+        students.append(dict(child, attendance=student_attendance(summary, child['usn']), marks=marks_data))
+    
+    return render_template('parent_dashboard.html',
+                          students=students,
+                          components=components,
+                          attendance_available=summary is not None,
+                          threshold=summary['threshold'] if summary else None)
 
 
 @parent_bp.route('/logout')
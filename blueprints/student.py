@@ -3,6 +3,8 @@
 import logging
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from utils.auth_helpers import validate_student_credentials
+from utils import login_throttle
+from utils.marks import student_marks
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,7 @@ student_bp = Blueprint('student', __name__, url_prefix='/student')
 def login():
     """Student login using USN and Date of Birth."""
     error = None
+    status = 200
     
     if request.method == 'POST':
         usn = request.form.get('usn', '').strip()
@@ -20,6 +23,9 @@ def login():
         
         if not usn or not dob:
             error = 'Please provide both USN and Date of Birth'
+        elif not login_throttle.allow('student', usn):
+            status = 429
+            error = login_throttle.THROTTLED_MESSAGE
         else:
             student_info = validate_student_credentials(usn, dob)
             
@@ -37,7 +43,7 @@ def login():
                 error = 'Invalid USN or Date of Birth. Please check and try again.'
                 logger.warning(f"Failed login attempt for USN: {usn}")
     
-    return render_template('student_login.html', error=error)
+    return render_template('student_login.html', error=error), status
 
 
 @student_bp.route('/dashboard')
@@ -86,21 +92,21 @@ def marks():
         flash('Please log in to view marks', 'warning')
         return redirect(url_for('student.login'))
     
-    # TODO: Fetch actual marks data from Google Sheets
     usn = session.get('usn', '')
     student_name = session.get('student_name', 'Student')
     
-    # Placeholder data structure
-    marks_data = {
-        'subjects': [],
-        'total_marks': 0,
-        'percentage': 0
-    }
+    # Served from the per-USN store of the cached marks sheet
+    marks_data, components = None, []
+    try:
+        marks_data, components = student_marks(usn)
+    except Exception:
+        logger.exception("Error loading marks")
     
     return render_template('student_marks.html',
                           usn=usn,
                           student_name=student_name,
-                          marks=marks_data)
+                          marks=marks_data,
+                          components=components)
 
 
 @student_bp.route('/profile')
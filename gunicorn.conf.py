@@ -0,0 +1,55 @@
+"""Gunicorn configuration for production serving (see DOCUMENTATION.md, Deployment).
+
+All settings can be tuned through environment variables so the same file
+works on a small VM and on the department server.
+"""
+
+import os
+import multiprocessing
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Worker model: processes x threads. With more than one thread per worker the
+# threaded worker is used, which suits the I/O-bound Apps Script calls.
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Load the app once in the master so imported modules and warmed caches are
+# shared copy-on-write with the forked workers.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+# Recycle workers gracefully after a number of requests to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """Warm the shared caches in the master before workers are forked."""
+    if preload_app and os.getenv('PRELOAD_WARM_CACHES', 'true').lower() in ('1', 'true', 'yes'):
+        from utils.data_fetcher import warm_caches
+        server.log.info("Warming dataset caches before forking workers")
+        warm_caches()
+
+
+def post_fork(server, worker):
+    """Start per-worker background threads (threads do not survive fork).
+
+    HTTP pools, SQLite connections and cache locks are already reset in the
+    child by utils.data_fetcher, utils.storage and utils.cache.
+    """
+    from utils.data_fetcher import start_background_refresh
+    from utils.notice_broadcast import start_broadcaster
+    from utils import live_feed
+    start_background_refresh()
+    start_broadcaster()
+    # A sync worker has a single thread: live dashboards poll instead of holding it
+    live_feed.use_short_polls(worker_class == 'sync')
@@ -1,48 +1,59 @@
 from flask import Blueprint, request
-import requests
 import os
 from dotenv import load_dotenv
+from utils.data_fetcher import get_attendance_data, upstream_request
+from utils.academics import BATCHES, SUBJECTS, SECTIONS
+from utils import notice_broadcast, telegram_updates
 
 load_dotenv()
 
 telegram_bp = Blueprint('telegram_bp', __name__)
 TOKEN = os.getenv("TELEGRAM_token")
-API_URL = f'https://api.telegram.org/bot{TOKEN}/sendMessage'
-SESSION = {}
+API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")  # overridable for local stubs
+API_URL = f'{API_BASE}/bot{TOKEN}/sendMessage'
 
-SUBJECTS = {
-    "1": [("DS", "Discrete Structures"), ("PST", "Problem Solving Technique"), ("CA", "Computer Architecture")],
-    "3": [("PS", "Probability & Statistics"), ("AI", "Artificial Intelligence"), ("DBMS", "Database Systems")],
-    "5": [("ML", "Machine Learning"), ("WT", "Web Technologies")],
-}
-
-SECTIONS = {
-    "24-27": ["A", "B"],
-    "25-28": ["A", "B", "C"]
-}
 
 @telegram_bp.route('/telegram', methods=['POST'])
 def webhook():
-    data = request.get_json()
+    # Answer at once: Telegram re-sends updates to a slow webhook, and every
+    # update is handled only once (see utils.telegram_updates)
+    data = request.get_json(silent=True) or {}
+    update_id = data.get('update_id')
+    if update_id is not None and not telegram_updates.first_delivery(update_id):
+        return 'ok'
+
+    chat_id = chat_of(data)
+    if chat_id is None:
+        return 'ok'
+    telegram_updates.submit(chat_id, handle_update, data)
+    return 'ok'
+
+
+def chat_of(data):
+    if 'callback_query' in data:
+        return data['callback_query'].get('message', {}).get('chat', {}).get('id')
+    return data.get('message', {}).get('chat', {}).get('id')
+
 
+def handle_update(data):
     if 'callback_query' in data:
         callback = data['callback_query']
         chat_id = callback['message']['chat']['id']
         query_data = callback['data']
-        user_session = SESSION.get(chat_id, {})
+        user_session = telegram_updates.load_session(chat_id)
 
         if query_data.startswith("batch:"):
             batch = query_data.split(":")[1]
             user_session['batch'] = batch
             user_session['step'] = 'semester'
-            SESSION[chat_id] = user_session
+            telegram_updates.save_session(chat_id, user_session)
             return send_keyboard(chat_id, "📘 Select Semester:", [str(i) for i in range(1, 7)], prefix="semester")
 
         elif query_data.startswith("semester:"):
             semester = query_data.split(":")[1]
             user_session['semester'] = semester
             user_session['step'] = 'section'
-            SESSION[chat_id] = user_session
+            telegram_updates.save_session(chat_id, user_session)
             sections = SECTIONS.get(user_session['batch'], [])
             return send_keyboard(chat_id, "🏷️ Select Section:", sections, prefix="section")
 
@@ -50,7 +61,7 @@ def webhook():
             section = query_data.split(":")[1]
             user_session['section'] = section
             user_session['step'] = 'subject'
-            SESSION[chat_id] = user_session
+            telegram_updates.save_session(chat_id, user_session)
             subjects = SUBJECTS.get(user_session['semester'])
             if not subjects:
                 return send_message(chat_id, "Coming Soon 😎 Please stay cool.")
@@ -61,16 +72,16 @@ def webhook():
             subject_code = query_data.split(":")[1]
             user_session['subject'] = subject_code
             user_session['step'] = 'name'
-            SESSION[chat_id] = user_session
+            telegram_updates.save_session(chat_id, user_session)
             return send_message(chat_id, "👤 Enter Your Name:")
 
         elif query_data == "new_student":
-            SESSION[chat_id] = {'step': 'batch'}
-            return send_keyboard(chat_id, "🔰 Select Batch:", ["24-27", "25-28"], prefix="batch")
+            telegram_updates.save_session(chat_id, {'step': 'batch'})
+            return send_keyboard(chat_id, "🔰 Select Batch:", BATCHES, prefix="batch")
 
         elif query_data == "other_subject":
             user_session['step'] = 'subject'
-            SESSION[chat_id] = user_session
+            telegram_updates.save_session(chat_id, user_session)
             semester = user_session.get('semester')
             subjects = SUBJECTS.get(semester)
             if not subjects:
@@ -79,7 +90,7 @@ def webhook():
                                  [f"{code} - {label}" for code, label in subjects], prefix="subject")
 
         elif query_data == "exit":
-            SESSION.pop(chat_id, None)
+            telegram_updates.clear_session(chat_id)
             return send_message(chat_id, "👋 Session ended. Type /start to begin again.")
 
         return 'ok'
@@ -87,31 +98,42 @@ def webhook():
     message = data['message']
     chat_id = message['chat']['id']
     user_input = message.get('text', '').strip()
-    user_session = SESSION.get(chat_id, {})
+    user_session = telegram_updates.load_session(chat_id)
+
+    if user_input.lower() == "/subscribe":
+        notice_broadcast.subscribe(chat_id)
+        return send_message(chat_id, "🔔 Subscribed. New department notices will be sent to this chat. Type /unsubscribe to stop.")
+
+    if user_input.lower() == "/unsubscribe":
+        notice_broadcast.unsubscribe(chat_id)
+        return send_message(chat_id, "🔕 Unsubscribed from department notices. Type /subscribe to get them again.")
 
     if user_input.lower() in ["/start", "/stop"]:
-        SESSION[chat_id] = {'step': 'batch'}
-        return send_keyboard(chat_id, "🔰 Select Batch:", ["24-27", "25-28"], prefix="batch")
+        telegram_updates.save_session(chat_id, {'step': 'batch'})
+        return send_keyboard(chat_id, "🔰 Select Batch:", BATCHES, prefix="batch")
 
     step = user_session.get('step')
 
     if step == 'name':
         user_session['name'] = user_input.upper()
         user_session['step'] = 'usn'
+        telegram_updates.save_session(chat_id, user_session)
         return send_message(chat_id, "🔑 Enter Your USN:")
 
     elif step == 'usn':
         user_session['usn'] = user_input.upper()
-        return fetch_and_show_attendance(chat_id, user_session)
+        result = fetch_and_show_attendance(chat_id, user_session)
+        telegram_updates.save_session(chat_id, user_session)
+        return result
 
     else:
-        SESSION[chat_id] = {'step': 'batch'}
-        return send_keyboard(chat_id, "🔰 Let's start fresh. Select Batch:", ["24-27", "25-28"], prefix="batch")
+        telegram_updates.save_session(chat_id, {'step': 'batch'})
+        return send_keyboard(chat_id, "🔰 Let's start fresh. Select Batch:", BATCHES, prefix="batch")
 
 # --- Helper Functions ---
 
 def send_message(chat_id, text):
-    requests.post(API_URL, json={'chat_id': chat_id, 'text': text})
+    upstream_request('telegram', 'POST', API_URL, json={'chat_id': chat_id, 'text': text}, timeout=10)
     return 'ok'
 
 def send_keyboard(chat_id, text, options, prefix=""):
@@ -133,28 +155,15 @@ def send_keyboard(chat_id, text, options, prefix=""):
         'text': text,
         'reply_markup': {'inline_keyboard': inline_buttons}
     }
-    requests.post(API_URL, json=payload)
+    upstream_request('telegram', 'POST', API_URL, json=payload, timeout=10)
     return 'ok'
 
 def fetch_and_show_attendance(chat_id, session):
-    sheet_url = os.getenv("ATTENDANCE_Script")
-    params = {
-        "batch": session['batch'],
-        "semester": session['semester'],
-        "section": session['section'],
-        "subject": session['subject']
-    }
-
-    response = requests.get(sheet_url, params=params)
-    if response.status_code != 200:
+    data = get_attendance_data(session['batch'], session['semester'], session['section'], session['subject'])
+    if data is None:
         return send_message(chat_id, "⚠️ Unable to fetch data. Try again later.")
 
     try:
-        data = response.json()
-        if not isinstance(data, list):
-            raise ValueError("Invalid format")
-
-        session['attendance_data'] = data  # Keep session active
         usn = session['usn']
         name_input = session['name']
         headers = data[0]
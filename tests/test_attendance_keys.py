@@ -0,0 +1,19 @@
+from utils import academics, cache, data_fetcher
+
+
+def test_unknown_sheet_is_not_fetched_or_cached(monkeypatch):
+    def fail(*args):
+        raise AssertionError("unknown sheet must not be fetched")
+
+    monkeypatch.setattr(data_fetcher, '_load_attendance_data', fail)
+    before = set(cache._memory)
+
+    assert data_fetcher.get_attendance_data('24-27', '1', 'A', 'x' * 40) is None
+    assert data_fetcher.get_attendance_data('99-99', '1', 'A', 'DS') is None
+    assert set(cache._memory) == before
+
+
+def test_known_sheets():
+    for key in academics.attendance_sheets():
+        assert academics.is_attendance_sheet(*key)
+    assert not academics.is_attendance_sheet('24-27', '1', 'C', 'DS')
@@ -0,0 +1,17 @@
+import pandas as pd
+
+from utils.compaction import MIN_ROWS, compact
+
+
+def test_duplicate_and_blank_headers():
+    rows = [['Paid' if i % 2 else 'Due', i, '', 'x'] for i in range(MIN_ROWS * 2)]
+    df = pd.DataFrame(rows, columns=['Status', 'Hours', '', ''])
+
+    out = compact(df, 'test')
+
+    assert list(out.columns) == ['Status', 'Hours', '', '']
+    assert isinstance(out.iloc[:, 0].dtype, pd.CategoricalDtype)
+    assert out.iloc[:, 1].dtype.itemsize < 8
+    assert isinstance(out.iloc[:, 2].dtype, pd.CategoricalDtype)
+    assert out.iloc[:, 3].astype(str).eq('x').all()
+    assert out['Status'].tolist()[:2] == ['Due', 'Paid']
@@ -0,0 +1,39 @@
+import io
+
+import pandas as pd
+import pytest
+
+from utils import exports
+
+
+def _frame():
+    names = pd.Series(['=HYPERLINK("http://x","y")', 'Asha', '@SUM(A1)', None, 'Ravi'] * 10).astype('category')
+    return pd.DataFrame({
+        'Candidate Name': names,
+        'Remarks': ['+91 call', '-', '-5', 'ok', '\tcmd'] * 10,
+        'Rank': [1, -2, 3, 4, 5] * 10,
+    })
+
+
+def test_csv_neutralizes_formulas():
+    df = _frame()
+    text = ''.join(exports.csv_chunks(df))
+    rows = pd.read_csv(io.StringIO(text.lstrip('﻿')), keep_default_na=False, dtype=str)
+
+    assert rows['Candidate Name'].iloc[0] == '\'=HYPERLINK("http://x","y")'
+    assert rows['Candidate Name'].iloc[2] == "'@SUM(A1)"
+    assert rows['Candidate Name'].iloc[1] == 'Asha'
+    assert rows['Remarks'].tolist()[:4] == ["'+91 call", "'-", '-5', 'ok']
+    assert rows['Rank'].iloc[1] == '-2'
+    # The cached frame itself is left alone
+    assert df['Candidate Name'].iloc[0].startswith('=')
+
+
+def test_xlsx_neutralizes_formulas():
+    openpyxl = pytest.importorskip('openpyxl')
+    pytest.importorskip('xlsxwriter')
+    with exports.write_xlsx(_frame(), 'Admissions') as out:
+        sheet = openpyxl.load_workbook(io.BytesIO(out.read())).active
+    assert sheet['A2'].value == '\'=HYPERLINK("http://x","y")'
+    assert sheet['B3'].value == "'-"
+    assert sheet['C3'].value == -2
@@ -0,0 +1,81 @@
+import json
+
+import pandas as pd
+
+from utils import live_feed
+
+
+def _frame(joining):
+    return pd.DataFrame({'Application': ['A1', 'A2'], 'Candidate Name': ['Asha', 'Ravi'],
+                         'Joining': joining})
+
+
+def test_unchanged_refresh_then_delta(monkeypatch):
+    versions = iter([
+        (1, _frame(['', ''])),
+        (2, _frame(['', ''])),            # TTL refresh, same data
+        (3, _frame(['', ''])),            # and another
+        (4, _frame(['Joined', ''])),      # a real change
+    ])
+    current = {}
+    monkeypatch.setattr(live_feed.cache, 'snapshot', lambda name: current['snap'])
+    spec = live_feed._FeedSpec(lambda: None, 'admissions', 'application', lambda old, new, delta: {})
+    feed = live_feed._Feed('admissions')
+
+    def refresh():
+        current['snap'] = next(versions)
+        feed.update(spec)
+
+    refresh()
+    refresh()
+    assert feed.version == 2
+    pending = feed.after(1)
+    assert pending is not None and all(not d.data for d in pending)
+
+    refresh()
+    assert len(feed.deltas) == 1  # consecutive no-op refreshes share one entry
+    refresh()
+
+    pending = feed.after(1)
+    assert pending is not None
+    real = [d for d in pending if d.data]
+    assert [d.version for d in real] == [4]
+    assert json.loads(real[0].data)['changed']
+    assert feed.after(4) == []
+
+
+def test_stream_skips_unchanged_refreshes(monkeypatch):
+    feed = live_feed._Feed('admissions')
+    feed.frame = _frame(['', ''])
+    feed.version = 3
+    feed.deltas.append(live_feed._Delta(1, 2, ''))
+    feed.deltas.append(live_feed._Delta(2, 3, '{"changed": []}'))
+    monkeypatch.setitem(live_feed._feeds, 'admissions', feed)
+    monkeypatch.setattr(live_feed, '_ensure_poller', lambda: None)
+
+    events = live_feed.event_stream('admissions', 1)
+    messages = [next(events), next(events)]
+    events.close()
+
+    assert 'reload' not in ''.join(messages)
+    assert messages[1].startswith('id: 3\nevent: delta')
+
+
+def test_short_polls_answer_at_once(monkeypatch):
+    feed = live_feed._Feed('admissions')
+    feed.frame = _frame(['', ''])
+    feed.version = 3
+    feed.deltas.append(live_feed._Delta(1, 2, ''))
+    feed.deltas.append(live_feed._Delta(2, 3, '{"changed": []}'))
+    monkeypatch.setitem(live_feed._feeds, 'admissions', feed)
+    monkeypatch.setattr(live_feed, '_ensure_poller', lambda: None)
+    monkeypatch.setattr(live_feed, '_short_polls', True)
+    # No stream slot is needed (a sync worker has a single thread)
+    monkeypatch.setattr(live_feed, '_streams', live_feed.threading.BoundedSemaphore(1))
+    live_feed._streams.acquire()
+
+    messages = list(live_feed.event_stream('admissions', 1))
+
+    assert messages[0].startswith('retry: ')
+    assert [m.split('\n')[0] for m in messages[1:]] == ['id: 3']
+    assert list(live_feed.event_stream('admissions', 3)) == messages[:1]
@@ -0,0 +1,41 @@
+import multiprocessing
+
+import pytest
+from flask import Flask
+
+from utils import login_throttle, storage
+
+
+@pytest.fixture(autouse=True)
+def private_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(storage, '_local', type(storage._local)())
+
+
+def test_client_ip_ignores_entries_sent_by_the_client(monkeypatch):
+    monkeypatch.setattr(login_throttle, 'CLIENT_IP_HEADER', 'X-Forwarded-For')
+    app = Flask(__name__)
+    headers = {'X-Forwarded-For': '6.6.6.6, 203.0.113.7'}
+    with app.test_request_context('/', headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.2'}):
+        assert login_throttle.client_ip() == '203.0.113.7'
+        monkeypatch.setattr(login_throttle, 'PROXY_HOPS', 2)
+        assert login_throttle.client_ip() == '6.6.6.6'
+        monkeypatch.setattr(login_throttle, 'PROXY_HOPS', 3)
+        assert login_throttle.client_ip() == '10.0.0.2'
+
+
+def _attempts(results, n):
+    results.put(sum(login_throttle._take_account_token('student:U1') for _ in range(n)))
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_account_limit_is_shared_by_workers():
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_attempts, args=(results, 4)) for _ in range(3)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    allowed = sum(results.get() for _ in workers)
+    assert allowed == int(login_throttle.ACCOUNT_BURST)
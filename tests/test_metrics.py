@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from utils import metrics, storage
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(storage, '_local', type(storage._local)())
+    metrics._reset_after_fork()
+    yield
+    metrics._reset_after_fork()
+
+
+def _total(name):
+    counters, _, histograms = metrics._collect()
+    return sum(v for (n, _), v in counters.items() if n == name)
+
+
+def _add_worker(worker, value, updated):
+    snap = {'counters': [['bca_exports_total', [['format', 'csv']], value]], 'gauges': [],
+            'histograms': [['bca_job_run_seconds', [], [0] * len(metrics.DEFAULT_BUCKETS), 1.5, value]]}
+    metrics._db().execute('INSERT INTO worker_snapshots (worker, updated, payload) VALUES (?, ?, ?)',
+                          (worker, updated, json.dumps(snap)))
+
+
+def test_counters_survive_recycled_workers():
+    _add_worker('101-old', 5, 0)       # recycled long ago
+    _add_worker('102-old', 3, 0)
+    metrics.inc('bca_exports_total', format='csv')
+
+    assert _total('bca_exports_total') == 9
+    assert metrics._db().execute('SELECT COUNT(*) FROM worker_snapshots').fetchone()[0] == 1
+    _add_worker('103-old', 2, 0)
+    assert _total('bca_exports_total') == 11
+    _, _, histograms = metrics._collect()
+    assert histograms[('bca_job_run_seconds', ())][2] == 10
+
+
+def test_idle_worker_is_not_counted_twice():
+    metrics.inc('bca_exports_total', 4, format='csv')
+    metrics.publish(force=True)
+    metrics._db().execute('UPDATE worker_snapshots SET updated = 0')
+    metrics._retire_stale(metrics._db())
+
+    metrics.inc('bca_exports_total', 2, format='csv')
+    assert _total('bca_exports_total') == 6
+    metrics.inc('bca_exports_total', format='csv')
+    assert _total('bca_exports_total') == 7
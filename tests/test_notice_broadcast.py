@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from utils import notice_broadcast, storage
+
+
+class _Ok:
+    status_code = 200
+
+
+@pytest.fixture(autouse=True)
+def private_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(storage, '_local', type(storage._local)())
+
+
+def _pending_round(chats):
+    for chat_id in range(chats):
+        notice_broadcast._db().execute('INSERT INTO subscribers (chat_id, since) VALUES (?, 0)', (chat_id,))
+    notice_broadcast._db().execute("INSERT INTO notices (key, title, seen) VALUES ('n1', 'Exam dates', 1)")
+
+
+def test_round_stops_when_the_lease_is_taken_over(monkeypatch):
+    monkeypatch.setattr(notice_broadcast, 'LEASE_TTL', 0.4)
+    monkeypatch.setattr(notice_broadcast, 'WORKERS', 2)
+    monkeypatch.setattr(notice_broadcast, 'RATE', 1000)
+    sent = []
+
+    def fake_request(service, method, url, json=None, timeout=None):
+        time.sleep(0.02)
+        sent.append(json['chat_id'])
+        return _Ok()
+
+    monkeypatch.setattr(notice_broadcast, 'upstream_request', fake_request)
+    _pending_round(50)
+    assert notice_broadcast._hold_lease()
+    # Another worker takes the lease after ours expired
+    notice_broadcast._db().execute("UPDATE broadcast_lease SET owner = 'other', expires = ?",
+                                   (time.time() + 60,))
+
+    assert notice_broadcast.broadcast_pending() == len(sent)
+    assert 0 < len(sent) < 50
+    conn = notice_broadcast._db()
+    delivered = [chat for (chat,) in conn.execute('SELECT chat_id FROM notice_deliveries ORDER BY chat_id')]
+    assert sorted(sent) == delivered
+    # The round's bookkeeping is left to the new lease holder
+    assert conn.execute("SELECT sent, rounds FROM notices WHERE key = 'n1'").fetchone() == (None, 0)
+
+
+def test_round_renews_the_lease_while_it_runs(monkeypatch):
+    monkeypatch.setattr(notice_broadcast, 'LEASE_TTL', 0.4)
+    monkeypatch.setattr(notice_broadcast, 'RATE', 1000)
+
+    def fake_request(service, method, url, json=None, timeout=None):
+        time.sleep(0.05)
+        return _Ok()
+
+    monkeypatch.setattr(notice_broadcast, 'upstream_request', fake_request)
+    monkeypatch.setattr(notice_broadcast, 'WORKERS', 1)
+    _pending_round(15)
+    assert notice_broadcast._hold_lease()
+
+    assert notice_broadcast.broadcast_pending() == 15
+    assert notice_broadcast._db().execute("SELECT sent FROM notices WHERE key = 'n1'").fetchone()[0] is not None
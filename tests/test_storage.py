@@ -0,0 +1,39 @@
+import os
+import sqlite3
+import stat
+
+import pytest
+
+from utils import storage
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    path = tmp_path / 'cache'
+    monkeypatch.setattr(storage, 'DATA_DIR', str(path))
+    monkeypatch.setattr(storage, '_local', type(storage._local)())
+    return path
+
+
+def test_creates_private_directory(data_dir):
+    storage.connect('test.sqlite3').execute('SELECT 1')
+    assert stat.S_IMODE(os.stat(data_dir).st_mode) & 0o077 == 0
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX permissions')
+def test_refuses_shared_writable_directory(data_dir):
+    data_dir.mkdir()
+    os.chmod(data_dir, 0o777)
+    with pytest.raises(sqlite3.OperationalError):
+        storage.connect('test.sqlite3')
+    assert not (data_dir / 'test.sqlite3').exists()
+
+
+def test_schemas_of_modules_sharing_a_file(data_dir):
+    first = ('CREATE TABLE IF NOT EXISTS a (x INTEGER)',)
+    second = ('CREATE TABLE IF NOT EXISTS b (y INTEGER)',)
+    conn = storage.connect('shared.sqlite3', first)
+    assert storage.connect('shared.sqlite3', second) is conn
+    assert storage.connect('shared.sqlite3', first) is conn
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {'a', 'b'}
@@ -0,0 +1,42 @@
+"""Batches, sections and subjects of the BCA programme.
+
+Shared by the Telegram attendance bot (its keyboards) and the attendance
+analytics (which sheets exist). Update here when a new batch is admitted
+or the syllabus changes.
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+# Semester -> (subject code, subject name)
+SUBJECTS: Dict[str, List[Tuple[str, str]]] = {
+    "1": [("DS", "Discrete Structures"), ("PST", "Problem Solving Technique"), ("CA", "Computer Architecture")],
+    "3": [("PS", "Probability & Statistics"), ("AI", "Artificial Intelligence"), ("DBMS", "Database Systems")],
+    "5": [("ML", "Machine Learning"), ("WT", "Web Technologies")],
+}
+
+# Batch -> sections
+SECTIONS: Dict[str, List[str]] = {
+    "24-27": ["A", "B"],
+    "25-28": ["A", "B", "C"]
+}
+
+BATCHES: List[str] = list(SECTIONS)
+
+
+def subject_name(semester: str, code: str) -> str:
+    """Full name of a subject code (the code itself if unknown)."""
+    return dict(SUBJECTS.get(semester, [])).get(code, code)
+
+
+def is_attendance_sheet(batch: str, semester: str, section: str, subject: str) -> bool:
+    """True if (batch, semester, section, subject) is one of attendance_sheets()."""
+    return section in SECTIONS.get(batch, ()) and subject in dict(SUBJECTS.get(semester, ()))
+
+
+def attendance_sheets() -> Iterator[Tuple[str, str, str, str]]:
+    """Every (batch, semester, section, subject) an attendance sheet may exist for."""
+    for batch, sections in SECTIONS.items():
+        for semester, subjects in SUBJECTS.items():
+            for section in sections:
+                for code, _ in subjects:
+                    yield batch, semester, section, code
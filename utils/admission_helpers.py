@@ -0,0 +1,60 @@
+"""Helper functions for admission applications processing."""
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict
+from utils import schema
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Sanctioned intake for the BCA programme
+TOTAL_SEATS = 180
+
+
+def compute_admission_stats(data_df: 'pd.DataFrame') -> Dict[str, Any]:
+    """Compute seat and fee statistics shown on the admission applications page.
+    
+    Missing expected columns are added (empty) to data_df in place so the
+    caller can render previews from them.
+    
+    Args:
+        data_df: DataFrame with admission data
+        
+    Returns:
+        Dict with total_seats, filled_seats, vacant_seats, withdrawing_students,
+        actual_strength and total_collected
+    """
+    import pandas as pd
+
+    # Defensive column selection (a no-op for frames from get_admission_data)
+    columns = schema.apply(data_df, 'admissions')
+    
+    # Seat statistics
+    filled_seats = data_df[columns['seat_category']].fillna('').astype(str).str.strip().replace('', pd.NA).dropna().shape[0]
+    vacant_seats = TOTAL_SEATS - filled_seats
+    
+    # Sum up all installment columns
+    installment_cols = [col for col in data_df.columns if 'Installment' in col]
+    if installment_cols:
+        total_collected = data_df[installment_cols].apply(pd.to_numeric, errors='coerce').fillna(0).sum().sum()
+    else:
+        total_collected = 0
+    
+    # Withdrawals and actual strength
+    withdrawing_students = 0
+    try:
+        withdrawing_students = data_df[data_df[columns['joining']].astype(str).str.upper().str.strip() == 'N'].shape[0]
+    except Exception:
+        withdrawing_students = 0
+    actual_strength = filled_seats - withdrawing_students
+    
+    return {
+        'total_seats': TOTAL_SEATS,
+        'filled_seats': filled_seats,
+        'vacant_seats': vacant_seats,
+        'withdrawing_students': withdrawing_students,
+        'actual_strength': actual_strength,
+        'total_collected': int(total_collected),
+    }
@@ -0,0 +1,273 @@
+"""Department-wide attendance analytics.
+
+Attendance lives in one Apps Script sheet per (batch, semester, section,
+subject). The summary fetches every sheet known from utils.academics with
+bounded parallelism (each sheet is cached on its own, so only expired ones
+hit the upstream), turns each into a students x class-dates matrix and
+derives, in one pass, the defaulter list, section averages, the section x
+subject matrix, weekly subject trends and each student's per-subject
+attendance (shown on the parent dashboard). The result is cached as one
+dataset and rebuilt once per refresh for all viewers.
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from utils import academics, dates
+from utils.cache import get_dataset
+from utils.data_fetcher import ATTENDANCE_SUMMARY_KEY, CACHE_TTL, get_attendance_data
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Students below this percentage in a subject are defaulters
+ATTENDANCE_THRESHOLD = float(os.getenv('ATTENDANCE_THRESHOLD', '75'))
+
+# Attendance sheets fetched at the same time (Apps Script quota is per account)
+FETCH_PARALLELISM = int(os.getenv('ATTENDANCE_FETCH_PARALLELISM', '4'))
+
+SheetKey = Tuple[str, str, str, str]  # batch, semester, section, subject
+
+# Sheet layout: USN, Name, percentage, then one 'P'/'A' column per class date
+_FIRST_DATE_COL = 3
+
+
+def get_attendance_summary() -> Optional[Dict[str, Any]]:
+    """Return the department attendance summary (cached, shared by all workers).
+
+    Returns:
+        Dict with 'threshold', 'generated_at', 'sheets', 'unavailable',
+        'defaulters', 'sections', 'matrix', 'subjects' and 'students' (USN ->
+        attendance, see student_attendance), or None if no attendance sheet
+        could be fetched
+    """
+    return get_dataset(ATTENDANCE_SUMMARY_KEY, _load_summary, CACHE_TTL)
+
+
+def _load_summary() -> Optional[Dict[str, Any]]:
+    started = time.perf_counter()
+    sheets, unavailable = fetch_all_sheets()
+    if not sheets:
+        logger.error("No attendance sheet available for the analytics summary")
+        return None
+    summary = summarize(sheets)
+    summary['unavailable'] = [':'.join(key) for key in unavailable]
+    logger.info(f"Attendance summary: {len(sheets)} sheets, {len(summary['defaulters'])} defaulters "
+                f"in {time.perf_counter() - started:.2f}s")
+    return summary
+
+
+def fetch_all_sheets() -> Tuple[Dict[SheetKey, List[List[Any]]], List[SheetKey]]:
+    """Fetch every known attendance sheet, at most FETCH_PARALLELISM at a time.
+
+    Returns:
+        (sheets by key, keys that could not be fetched)
+    """
+    keys = list(academics.attendance_sheets())
+    with ThreadPoolExecutor(max_workers=max(1, min(FETCH_PARALLELISM, len(keys))),
+                            thread_name_prefix='attendance-fetch') as pool:
+        results = list(pool.map(lambda key: get_attendance_data(*key), keys))
+
+    sheets, unavailable = {}, []
+    for key, rows in zip(keys, results):
+        if rows and len(rows) > 1:
+            sheets[key] = rows
+        else:
+            unavailable.append(key)
+    return sheets, unavailable
+
+
+def _sheet_matrix(rows: List[List[Any]]) -> Optional[Tuple['np.ndarray', 'np.ndarray', List[Any], 'np.ndarray', 'np.ndarray']]:
+    """USNs, names, class-date headers and present/held boolean matrices of one sheet."""
+    import numpy as np
+    import pandas as pd
+
+    header = rows[0]
+    width = len(header)
+    body = [r for r in rows[1:] if isinstance(r, list) and r and str(r[0]).strip()]
+    if not body or width <= _FIRST_DATE_COL:
+        return None
+
+    n_dates = width - _FIRST_DATE_COL
+    marks = np.array([(r[_FIRST_DATE_COL:width] + [''] * n_dates)[:n_dates] for r in body], dtype=object)
+    # A sheet holds only a few distinct marks ('P', 'A', 'p ', ''): classify each once
+    codes, uniques = pd.factorize(marks.ravel())
+    kinds = np.array([str(u).strip().upper() for u in uniques] + [''], dtype=object)  # code -1 -> ''
+    kinds = kinds[codes].reshape(marks.shape)
+    present = kinds == 'P'
+    held = present | (kinds == 'A')
+
+    usns = np.array([str(r[0]).strip().upper() for r in body], dtype=object)
+    names = np.array([str(r[1]).strip() if len(r) > 1 else '' for r in body], dtype=object)
+    return usns, names, header[_FIRST_DATE_COL:], present, held
+
+
+def summarize(sheets: Dict[SheetKey, List[List[Any]]], threshold: float = ATTENDANCE_THRESHOLD) -> Dict[str, Any]:
+    """Aggregate attendance sheets into the department summary.
+
+    Per-student percentages are computed from the P/A marks (classes held
+    are the dates marked either way), not from the sheet's percentage column.
+
+    Args:
+        sheets: Raw sheets (rows, first row is the header) by (batch, semester, section, subject)
+        threshold: Defaulter cut-off in percent
+
+    Returns:
+        Summary dict (see get_attendance_summary)
+    """
+    import numpy as np
+    import pandas as pd
+
+    students, classes = [], []
+    for (batch, semester, section, subject), rows in sheets.items():
+        matrix = _sheet_matrix(rows)
+        if matrix is None:
+            continue
+        usns, names, date_headers, present, held = matrix
+        n = len(usns)
+        students.append(pd.DataFrame({
+            'batch': batch, 'semester': semester, 'section': section, 'subject': subject,
+            'usn': usns, 'name': names,
+            'attended': present.sum(axis=1), 'held': held.sum(axis=1),
+        }, index=pd.RangeIndex(n)))
+        classes.append(pd.DataFrame({
+            'batch': batch, 'semester': semester, 'subject': subject,
+            'date': pd.Series(date_headers, dtype=object),
+            'present': present.sum(axis=0), 'marked': held.sum(axis=0),
+        }))
+
+    if not students:
+        return _empty_summary(threshold, len(sheets))
+
+    per_student = pd.concat(students, ignore_index=True)
+    held = per_student['held'].to_numpy()
+    per_student['pct'] = np.where(held > 0, 100.0 * per_student['attended'].to_numpy() / np.maximum(held, 1), np.nan)
+    below = per_student['pct'] < threshold
+    section_keys = ['batch', 'semester', 'section']
+
+    # Section averages: mean of the student x subject percentages
+    sections = per_student.groupby(section_keys, sort=True).agg(
+        students=('usn', 'nunique'), average=('pct', 'mean'),
+        attended=('attended', 'sum'), held=('held', 'sum'))
+    sections['defaulters'] = per_student[below].groupby(section_keys)['usn'].nunique()
+    sections = sections.fillna({'defaulters': 0}).reset_index()
+
+    # Section x subject matrix of average percentages
+    grid = per_student.pivot_table(index=section_keys, columns='subject', values='pct', aggfunc='mean', sort=True)
+
+    # Defaulters: one entry per student and semester, worst subject first
+    flagged = per_student[below].sort_values(['batch', 'semester', 'usn', 'pct'])
+    defaulters = []
+    for (batch, semester, usn), group in flagged.groupby(['batch', 'semester', 'usn'], sort=False):
+        first = group.iloc[0]
+        defaulters.append({
+            'usn': usn, 'name': first['name'], 'batch': batch,
+            'semester': semester, 'section': first['section'],
+            'worst': round(float(first['pct']), 1),
+            'subjects': [{'subject': s, 'name': academics.subject_name(semester, s), 'pct': round(float(p), 1),
+                          'attended': int(a), 'held': int(h)}
+                         for s, p, a, h in zip(group['subject'], group['pct'], group['attended'], group['held'])],
+        })
+    defaulters.sort(key=lambda d: (d['worst'], d['usn']))
+
+    return {
+        'threshold': threshold,
+        'generated_at': time.time(),
+        'sheets': len(sheets),
+        'defaulters': defaulters,
+        'sections': [_plain(r) for r in sections.to_dict('records')],
+        'matrix': {
+            'subjects': list(grid.columns),
+            'rows': [{'batch': b, 'semester': sem, 'section': sec,
+                      'values': [None if pd.isna(v) else round(float(v), 1) for v in values]}
+                     for (b, sem, sec), values in zip(grid.index, grid.to_numpy())],
+        },
+        'subjects': _subject_trends(pd.concat(classes, ignore_index=True)),
+        'students': _by_student(per_student),
+    }
+
+
+def _subject_trends(classes: 'pd.DataFrame') -> List[Dict[str, Any]]:
+    """Overall and weekly attendance rate per subject, all sections combined."""
+    import pandas as pd
+
+    classes['day'] = pd.to_datetime(dates.parse_date_series(classes['date']), errors='coerce')
+    classes = classes[classes['marked'] > 0]
+    keys = ['batch', 'semester', 'subject']
+
+    totals = classes.groupby(keys, sort=True)[['present', 'marked']].sum()
+    dated = classes.dropna(subset=['day'])
+    dated = dated.assign(week=dated['day'] - pd.to_timedelta(dated['day'].dt.weekday, unit='D'))
+    weekly = dated.groupby(keys + ['week'], sort=True)[['present', 'marked']].sum()
+
+    by_subject = {key: group.droplevel(keys) for key, group in weekly.groupby(level=keys, sort=False)}
+
+    trends = []
+    for key, total in totals.iterrows():
+        batch, semester, subject = key
+        weeks = by_subject.get(key, weekly.iloc[0:0])
+        trends.append({
+            'batch': batch, 'semester': semester, 'subject': subject,
+            'name': academics.subject_name(semester, subject),
+            'average': round(float(100.0 * total['present'] / total['marked']), 1),
+            'weeks': [{'week': week.strftime('%d %b'), 'pct': round(float(100.0 * row['present'] / row['marked']), 1)}
+                      for week, row in weeks.iterrows()],
+        })
+    return trends
+
+
+def _by_student(per_student: 'pd.DataFrame') -> Dict[str, Dict[str, Any]]:
+    """USN -> class, overall percentage and per-subject attendance (all semesters' sheets of the student)."""
+    ordered = per_student.sort_values(['usn', 'semester', 'subject'])
+    students: Dict[str, Dict[str, Any]] = {}
+    for r in ordered[['usn', 'batch', 'semester', 'section', 'subject', 'attended', 'held', 'pct']].itertuples(index=False):
+        entry = students.get(r.usn)
+        if entry is None:
+            entry = students[r.usn] = {'batch': r.batch, 'semester': r.semester, 'section': r.section,
+                                       'attended': 0, 'held': 0, 'subjects': []}
+        entry['attended'] += int(r.attended)
+        entry['held'] += int(r.held)
+        entry['subjects'].append({'subject': r.subject, 'semester': r.semester,
+                                  'name': academics.subject_name(r.semester, r.subject),
+                                  'pct': None if r.pct != r.pct else round(float(r.pct), 1),
+                                  'attended': int(r.attended), 'held': int(r.held)})
+    for entry in students.values():
+        entry['overall'] = round(100.0 * entry['attended'] / entry['held'], 1) if entry['held'] else None
+    return students
+
+
+def student_attendance(summary: Optional[Dict[str, Any]], usn: str) -> Optional[Dict[str, Any]]:
+    """One student's attendance from the summary.
+
+    Returns:
+        Dict with 'batch', 'semester', 'section', 'attended', 'held',
+        'overall' (percent, None if no class was held) and 'subjects', or None
+        if the student is in no attendance sheet
+    """
+    if not summary:
+        return None
+    return summary.get('students', {}).get(usn.strip().upper())
+
+
+def _plain(record: Dict[str, Any]) -> Dict[str, Any]:
+    """numpy scalars -> Python numbers (the summary is pickled and rendered)."""
+    out = {}
+    for k, v in record.items():
+        if hasattr(v, 'item'):
+            v = v.item()
+        if isinstance(v, float):
+            v = round(v, 1)
+        out[k] = v
+    return out
+
+
+def _empty_summary(threshold: float, sheets: int) -> Dict[str, Any]:
+    return {'threshold': threshold, 'generated_at': time.time(), 'sheets': sheets,
+            'defaulters': [], 'sections': [], 'matrix': {'subjects': [], 'rows': []}, 'subjects': [],
+            'students': {}}
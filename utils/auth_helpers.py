@@ -2,10 +2,9 @@
 
 import os
 import logging
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, Dict, Any
-import pandas as pd
-from utils.data_fetcher import get_student_data
+from utils import dates, student_directory
 
 logger = logging.getLogger(__name__)
 
@@ -61,8 +60,9 @@ def validate_attender_credentials(username: str, password: str) -> bool:
 def validate_student_credentials(usn: str, dob: str) -> Optional[Dict[str, Any]]:
     """Validate student credentials using USN and Date of Birth.
     
-    The function fetches student data from Google Sheets and validates
-    the USN and DOB combination. DOB can be in various formats.
+    The USN is looked up in the student directory (built once per version of
+    the cached student sheet, see utils.student_directory) and the DOB
+    compared. DOB can be in various formats.
     
     Args:
         usn: University Seat Number (case-insensitive)
@@ -71,54 +71,23 @@ def validate_student_credentials(usn: str, dob: str) -> Optional[Dict[str, Any]]
     Returns:
         Dict with student information if valid, None otherwise
     """
+    import pandas as pd
     try:
-        # Fetch student data
-        df = get_student_data()
+        usn_normalized = student_directory.normalize_usn(usn)
+        student, dob_col = student_directory.find_student(usn_normalized)
         
-        if df is None or df.empty:
-            logger.error("Student data not available for authentication")
-            return None
-        
-        # Normalize USN (uppercase, strip whitespace)
-        usn_normalized = str(usn).strip().upper()
-        
-        # Try to find the USN column (common variations)
-        usn_col = None
-        for col in df.columns:
-            col_lower = str(col).lower()
-            if 'usn' in col_lower or 'seat' in col_lower or 'id' in col_lower:
-                usn_col = col
-                break
-        
-        if usn_col is None:
-            logger.error("USN column not found in student data")
+        if student is None:
+            logger.warning(f"USN not found: {usn_normalized}")
             return None
         
-        # Find DOB column (common variations)
-        dob_col = None
-        for col in df.columns:
-            col_lower = str(col).lower()
-            if 'dob' in col_lower or 'birth' in col_lower or 'date of birth' in col_lower:
-                dob_col = col
-                break
-        
         if dob_col is None:
             logger.error("DOB column not found in student data")
             return None
         
-        # Filter by USN
-        student_rows = df[df[usn_col].astype(str).str.strip().str.upper() == usn_normalized]
-        
-        if student_rows.empty:
-            logger.warning(f"USN not found: {usn_normalized}")
-            return None
-        
-        student = student_rows.iloc[0]
-        
         # Validate DOB
-        student_dob = student[dob_col]
+        student_dob = student.get(dob_col)
         
-        if pd.isna(student_dob):
+        if student_dob is None or pd.isna(student_dob):
             logger.warning(f"DOB not set for USN: {usn_normalized}")
             return None
         
@@ -127,11 +96,9 @@ def validate_student_credentials(usn: str, dob: str) -> Optional[Dict[str, Any]]
             logger.warning(f"DOB mismatch for USN: {usn_normalized}")
             return None
         
-        # Return student info as dict
-        student_info = student.to_dict()
-        student_info['USN'] = usn_normalized  # Ensure normalized USN is stored
+        student['USN'] = usn_normalized  # Ensure normalized USN is stored
         
-        return student_info
+        return student
         
     except Exception as e:
         logger.exception("Error validating student credentials")
@@ -148,6 +115,7 @@ def validate_dob_match(stored_dob: Any, input_dob: str) -> bool:
     Returns:
         True if dates match, False otherwise
     """
+    import pandas as pd
     try:
         # Parse stored DOB
         if isinstance(stored_dob, (datetime, pd.Timestamp)):
@@ -173,8 +141,8 @@ def validate_dob_match(stored_dob: Any, input_dob: str) -> bool:
         return False
 
 
-def parse_date_string(date_str: str) -> Optional[datetime.date]:
-    """Parse date string in common formats.
+def parse_date_string(date_str: str) -> Optional[date]:
+    """Parse date string in common formats (memoized, see utils.dates).
     
     Supported formats:
     - YYYY-MM-DD
@@ -188,41 +156,52 @@ def parse_date_string(date_str: str) -> Optional[datetime.date]:
     Returns:
         datetime.date object or None if parsing fails
     """
-    date_str = str(date_str).strip()
-    
-    # Try common formats
-    formats = [
-        '%Y-%m-%d',      # 2000-01-15
-        '%d/%m/%Y',      # 15/01/2000
-        '%d-%m-%Y',      # 15-01-2000
-        '%m/%d/%Y',      # 01/15/2000
-        '%Y/%m/%d',      # 2000/01/15
-        '%d.%m.%Y',      # 15.01.2000
-    ]
-    
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_str, fmt).date()
-        except ValueError:
-            continue
-    
-    logger.debug(f"Could not parse date: {date_str}")
-    return None
+    return dates.parse_date_string(date_str)
 
 
 def validate_parent_credentials(identifier: str, password: str) -> Optional[Dict[str, Any]]:
     """Validate parent login credentials.
     
-    TODO: Implement parent authentication logic.
-    For now, this is a placeholder.
+    The phone number or email is looked up in the parent index of the student
+    directory (parent contacts of the student sheet -> USNs of the children).
+    The password is the date of birth of any one of the linked children.
     
     Args:
         identifier: Parent email or phone
-        password: Parent password
+        password: Date of Birth of a linked child (same formats as student login)
         
     Returns:
-        Dict with parent information if valid, None otherwise
+        Dict with 'contact' (normalized identifier) and 'children' (USN and
+        name of every linked student) if valid, None otherwise
     """
-    # TODO: Implement parent authentication
-    logger.warning("Parent authentication not yet implemented")
-    return None
+    import pandas as pd
+    try:
+        children, dob_col = student_directory.find_children(identifier)
+        
+        if not children:
+            logger.warning(f"Parent contact not found: {identifier}")
+            return None
+        
+        if dob_col is None:
+            logger.error("DOB column not found in student data")
+            return None
+        
+        if not any(child.get(dob_col) is not None and not pd.isna(child.get(dob_col))
+                   and validate_dob_match(child.get(dob_col), password) for child in children):
+            logger.warning(f"DOB mismatch for parent: {identifier}")
+            return None
+        
+        return {
+            'contact': student_directory.normalize_contact(identifier),
+            'children': [student_summary(child) for child in children],
+        }
+        
+    except Exception as e:
+        logger.exception("Error validating parent credentials")
+        return None
+
+
+def student_summary(student: Dict[str, Any]) -> Dict[str, str]:
+    """USN and name of a student record (small enough for the session cookie)."""
+    name = student.get('Name', student.get('Student Name', student.get('Candidate Name', 'Student')))
+    return {'usn': student['USN'], 'name': str(name)}
@@ -0,0 +1,377 @@
+"""Dataset cache shared between worker processes.
+
+Each dataset (students, admissions, bills, ...) is stored once in a SQLite
+database in WAL mode inside DATA_CACHE_DIR, so every gunicorn worker reads the
+same copy instead of fetching it from Apps Script on its own. When an entry
+goes stale a single worker is elected (through a short lease row) to refresh
+it; the other workers keep serving the stale copy until the new version lands.
+Every process also keeps the last version it decoded in memory, so the
+shared store is only read again when the version changes. The store saves
+upstream calls and decoding work, not memory: each worker holds its own
+decoded copy (only the copies warmed before forking are shared
+copy-on-write, until their first refresh).
+
+invalidate() marks entries as outdated before their TTL (e.g. when a sheet is
+edited). Invalidations are logged in the shared store and every process picks
+them up within INVALIDATION_POLL seconds; outdated entries are refreshed on
+next use but may still be served as stale copies while that happens.
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from utils import metrics, resilience, storage
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = 'datasets.sqlite3'
+
+# How long a refresh lease is held before another worker may take over (seconds)
+LEASE_TTL = 30
+
+# Stale data older than this is never served, even if the upstream is down
+MAX_STALE = int(os.getenv('DATA_CACHE_MAX_STALE', '86400'))
+
+# How often a worker without a copy polls for the elected worker's result
+_POLL_INTERVAL = 0.2
+
+# How often a process checks the shared store for new invalidations (seconds)
+INVALIDATION_POLL = 1.0
+
+
+class _Entry(NamedTuple):
+    version: int
+    fetched_at: float
+    value: Any
+
+
+_memory: Dict[str, _Entry] = {}
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+# Invalidations seen by this process: exact names and name prefixes -> latest time
+_invalid_names: Dict[str, float] = {}
+_invalid_prefixes: Dict[str, float] = {}
+_invalidation_seq = 0
+_invalidation_checked = 0.0
+
+
+def _reset_after_fork() -> None:
+    """Drop locks that may have been held by other threads at fork time.
+
+    Decoded entries in _memory are kept: with a preloaded app they are
+    shared copy-on-write with the master process.
+    """
+    global _locks_guard, _invalidation_checked
+    _locks_guard = threading.Lock()
+    _locks.clear()
+    _invalidation_checked = 0.0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _name_lock(name: str) -> threading.Lock:
+    with _locks_guard:
+        lock = _locks.get(name)
+        if lock is None:
+            lock = _locks[name] = threading.Lock()
+        return lock
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS datasets ('
+    ' name TEXT PRIMARY KEY, version INTEGER NOT NULL,'
+    ' fetched_at REAL NOT NULL, payload BLOB NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS leases ('
+    ' name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS invalidations ('
+    ' seq INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,'
+    ' prefix INTEGER NOT NULL, at REAL NOT NULL)',
+)
+
+
+def _db() -> sqlite3.Connection:
+    return storage.connect(DB_FILE, _SCHEMA)
+
+
+def _owner() -> str:
+    return f"{os.getpid()}:{threading.get_ident()}"
+
+
+def _read_shared(name: str, current: Optional[_Entry]) -> Optional[_Entry]:
+    """Return the shared entry for name, decoding it only if the version changed."""
+    try:
+        conn = _db()
+        row = conn.execute('SELECT version, fetched_at FROM datasets WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            return current
+        version, fetched_at = row
+        if current is not None and current.version == version:
+            return current
+        blob = conn.execute('SELECT payload FROM datasets WHERE name = ? AND version = ?',
+                            (name, version)).fetchone()
+        if blob is None:
+            return current
+        entry = _Entry(version, fetched_at, pickle.loads(blob[0]))
+        _memory[name] = entry
+        return entry
+    except (sqlite3.Error, OSError, pickle.UnpicklingError):
+        logger.warning(f"Shared cache unavailable while reading '{name}'", exc_info=True)
+        return current
+
+
+def _write_shared(name: str, value: Any, fetched_at: float) -> int:
+    """Store a new version of name in the shared store and return its version."""
+    current = _memory.get(name)
+    version = (current.version if current else 0) + 1
+    try:
+        conn = _db()
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT version FROM datasets WHERE name = ?', (name,)).fetchone()
+            version = max(version, (row[0] if row else 0) + 1)
+            conn.execute('INSERT OR REPLACE INTO datasets (name, version, fetched_at, payload) VALUES (?, ?, ?, ?)',
+                         (name, version, fetched_at, payload))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    except (sqlite3.Error, OSError, pickle.PicklingError):
+        logger.warning(f"Shared cache unavailable while storing '{name}'", exc_info=True)
+    return version
+
+
+def _acquire_lease(name: str) -> bool:
+    """Try to become the worker that refreshes name. Returns True on success."""
+    now = time.time()
+    try:
+        conn = _db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT owner, expires FROM leases WHERE name = ?', (name,)).fetchone()
+            if row is not None and row[1] > now and row[0] != _owner():
+                conn.execute('COMMIT')
+                return False
+            conn.execute('INSERT OR REPLACE INTO leases (name, owner, expires) VALUES (?, ?, ?)',
+                         (name, _owner(), now + LEASE_TTL))
+            conn.execute('COMMIT')
+            return True
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    except (sqlite3.Error, OSError):
+        logger.warning(f"Shared cache unavailable, refreshing '{name}' locally", exc_info=True)
+        return True
+
+
+def _release_lease(name: str) -> None:
+    try:
+        _db().execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, _owner()))
+    except (sqlite3.Error, OSError):
+        logger.warning(f"Could not release refresh lease for '{name}'", exc_info=True)
+
+
+def _usable(entry: Optional[_Entry], max_age: float) -> bool:
+    return entry is not None and time.time() - entry.fetched_at < max_age
+
+
+def _sync_invalidations() -> None:
+    """Load invalidations logged by other processes (at most every INVALIDATION_POLL)."""
+    global _invalidation_seq, _invalidation_checked
+    now = time.time()
+    if now - _invalidation_checked < INVALIDATION_POLL:
+        return
+    _invalidation_checked = now
+    try:
+        rows = _db().execute('SELECT seq, name, prefix, at FROM invalidations WHERE seq > ? ORDER BY seq',
+                             (_invalidation_seq,)).fetchall()
+    except (sqlite3.Error, OSError):
+        logger.warning("Shared cache unavailable while reading invalidations", exc_info=True)
+        return
+    for seq, name, prefix, at in rows:
+        target = _invalid_prefixes if prefix else _invalid_names
+        target[name] = max(target.get(name, 0.0), at)
+        _invalidation_seq = seq
+
+
+def _fresh(name: str, entry: Optional[_Entry], ttl: float) -> bool:
+    """True if entry is younger than ttl and was fetched after any invalidation of name."""
+    if not _usable(entry, ttl):
+        return False
+    invalidated_at = _invalid_names.get(name, 0.0)
+    for prefix, at in _invalid_prefixes.items():
+        if name.startswith(prefix):
+            invalidated_at = max(invalidated_at, at)
+    return entry.fetched_at > invalidated_at
+
+
+def invalidate(name: str, prefix: bool = False) -> None:
+    """Mark a dataset (or every dataset whose key starts with name) as outdated.
+
+    The entry is refreshed on its next use in any process; until the new
+    version lands, the old one may still be served as a stale copy.
+
+    Args:
+        name: Dataset key, or key prefix (e.g. 'attendance:') with prefix=True
+        prefix: Match every key starting with name
+    """
+    now = time.time()
+    target = _invalid_prefixes if prefix else _invalid_names
+    target[name] = now
+    try:
+        conn = _db()
+        conn.execute('INSERT INTO invalidations (name, prefix, at) VALUES (?, ?, ?)', (name, int(prefix), now))
+        conn.execute('DELETE FROM invalidations WHERE at < ?', (now - MAX_STALE,))
+    except (sqlite3.Error, OSError):
+        logger.warning(f"Could not share invalidation of '{name}' with other workers", exc_info=True)
+    logger.info(f"Invalidated cached {'datasets ' + name + '*' if prefix else repr(name)}")
+
+
+def _wait_for_refresh(name: str, current: Optional[_Entry]) -> Optional[_Entry]:
+    """Poll the shared store until another worker publishes a new version.
+
+    Gives up after LEASE_TTL, or earlier when the request's latency budget runs out.
+    """
+    budget = resilience.remaining_budget()
+    deadline = time.time() + (min(LEASE_TTL, budget) if budget is not None else LEASE_TTL)
+    while time.time() < deadline:
+        time.sleep(_POLL_INTERVAL)
+        entry = _read_shared(name, current)
+        if entry is not None and entry is not current:
+            return entry
+    return None
+
+
+def peek(name: str) -> Any:
+    """Return the latest stored value of name without refreshing it.
+
+    Lets a loader build on the previous version (e.g. to fetch only new
+    rows). Values older than MAX_STALE are not returned.
+
+    Args:
+        name: Dataset key
+
+    Returns:
+        The stored value, or None if there is none
+    """
+    entry = _read_shared(name, _memory.get(name))
+    return entry.value if _usable(entry, MAX_STALE) else None
+
+
+def snapshot(name: str) -> Tuple[int, Any]:
+    """Return (version, value) of name as last seen by this process.
+
+    Nothing is read or refreshed; versions are shared by all processes, so
+    they can be compared across workers.
+
+    Args:
+        name: Dataset key
+
+    Returns:
+        (version, value), or (0, None) if this process holds no copy
+    """
+    entry = _memory.get(name)
+    return (entry.version, entry.value) if entry is not None else (0, None)
+
+
+def current(name: str, max_age: float) -> Optional[Tuple[int, Any]]:
+    """Return (version, value) of this process's copy of name if it is younger than max_age.
+
+    Nothing is fetched or read from the shared store: callers use this as a
+    fast path and fall back to get_dataset when it returns None (no copy,
+    too old, or invalidated).
+
+    Args:
+        name: Dataset key
+        max_age: Maximum age in seconds of the copy
+
+    Returns:
+        (version, value), or None
+    """
+    _sync_invalidations()
+    entry = _memory.get(name)
+    return (entry.version, entry.value) if _fresh(name, entry, max_age) else None
+
+
+def get_dataset(name: str, loader: Callable[[], Any], ttl: float) -> Any:
+    """Return a cached dataset, refreshing it through loader when stale.
+
+    Only one worker across all processes runs the loader for a given stale
+    dataset; the others serve the stale copy meanwhile (or wait for the new
+    version if they have none). A loader returning None is treated as an
+    upstream failure: nothing is stored and the stale copy is served if it
+    is younger than MAX_STALE.
+
+    Args:
+        name: Dataset key (e.g. 'students', 'attendance:24-27:3:A:DBMS')
+        loader: Callable fetching a fresh value, returning None on failure
+        ttl: Maximum age in seconds before the dataset is refreshed
+
+    Returns:
+        The cached value, or None if no usable value is available
+    """
+    label = name.split(':', 1)[0]
+    _sync_invalidations()
+    entry = _memory.get(name)
+    if _fresh(name, entry, ttl):
+        metrics.inc('bca_cache_requests_total', dataset=label, result='hit')
+        return entry.value
+
+    entry = _read_shared(name, entry)
+    if _fresh(name, entry, ttl):
+        metrics.inc('bca_cache_requests_total', dataset=label, result='shared_hit')
+        return entry.value
+
+    stale = entry if _usable(entry, MAX_STALE) else None
+    lock = _name_lock(name)
+    if stale is not None:
+        # Another thread of this process is already refreshing: serve stale
+        if not lock.acquire(blocking=False):
+            metrics.inc('bca_cache_requests_total', dataset=label, result='stale')
+            return stale.value
+    else:
+        lock.acquire()
+
+    try:
+        # Another thread may have refreshed while we waited for the lock
+        entry = _read_shared(name, _memory.get(name))
+        if _fresh(name, entry, ttl):
+            metrics.inc('bca_cache_requests_total', dataset=label, result='shared_hit')
+            return entry.value
+
+        if not _acquire_lease(name):
+            if stale is not None:
+                metrics.inc('bca_cache_requests_total', dataset=label, result='stale')
+                return stale.value
+            refreshed = _wait_for_refresh(name, entry)
+            if refreshed is not None:
+                metrics.inc('bca_cache_requests_total', dataset=label, result='shared_hit')
+                return refreshed.value
+            logger.warning(f"Timed out waiting for another worker to refresh '{name}'")
+
+        metrics.inc('bca_cache_requests_total', dataset=label, result='refresh')
+        try:
+            fetched_at = time.time()
+            value = loader()
+        finally:
+            _release_lease(name)
+
+        if value is None:
+            if stale is not None:
+                logger.warning(f"Refresh of '{name}' failed, serving stale copy")
+                metrics.inc('bca_cache_requests_total', dataset=label, result='stale')
+                return stale.value
+            return None
+
+        version = _write_shared(name, value, fetched_at)
+        _memory[name] = _Entry(version, fetched_at, value)
+        return value
+    finally:
+        lock.release()
@@ -0,0 +1,83 @@
+"""Shrink cached DataFrames after they are built from JSON.
+
+Apps Script payloads become one Python string per cell, although columns
+such as Seat Category, Joining, Class/Section, Subject and Faculty only hold
+a handful of distinct values. Every worker keeps the cached datasets in
+memory, so loaders compact them once: repetitive string columns become
+categoricals and numeric columns get the smallest dtype that holds their
+values exactly.
+"""
+
+import logging
+from typing import TYPE_CHECKING
+
+from utils import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A string column becomes categorical when distinct values are at most this share of its rows
+MAX_CATEGORY_RATIO = 0.5
+
+# Frames smaller than this are left alone (nothing to gain)
+MIN_ROWS = 32
+
+
+def _is_string_column(series: 'pd.Series') -> bool:
+    import pandas as pd
+    if series.dtype == object:
+        return bool(series.dropna().map(type).eq(str).all())
+    return isinstance(series.dtype, pd.StringDtype)
+
+
+def _downcast(series: 'pd.Series') -> 'pd.Series':
+    """Smallest numeric dtype holding every value of series exactly."""
+    import pandas as pd
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series.dtype) and series.dtype != 'float32':
+        smaller = series.astype('float32')
+        # Fees and hours must not lose precision: only keep float32 if lossless
+        if ((smaller.astype(series.dtype) == series) | series.isna()).all():
+            return smaller
+    return series
+
+
+def compact(df: 'pd.DataFrame', dataset: str) -> 'pd.DataFrame':
+    """Convert df's columns to compact dtypes in place and return it.
+
+    Values, column names and df.attrs are unchanged. Categorical columns
+    with missing values also get an '' category, so ``fillna('')`` keeps
+    working on them.
+
+    Args:
+        df: Freshly loaded dataset
+        dataset: Dataset name (for logging and the memory gauge)
+
+    Returns:
+        The same DataFrame
+    """
+    import pandas as pd
+
+    before = int(df.memory_usage(deep=True).sum())
+    if len(df) >= MIN_ROWS:
+        # By position: sheets often repeat a header (several blank trailing columns)
+        for i in range(df.shape[1]):
+            series = df.iloc[:, i]
+            if pd.api.types.is_numeric_dtype(series.dtype):
+                df.isetitem(i, _downcast(series))
+            elif _is_string_column(series) and series.nunique() <= MAX_CATEGORY_RATIO * len(series):
+                cat = series.astype('category')
+                if cat.isna().any() and '' not in cat.cat.categories:
+                    cat = cat.cat.add_categories([''])
+                df.isetitem(i, cat)
+    after = int(df.memory_usage(deep=True).sum())
+
+    metrics.set_gauge('bca_dataset_memory_bytes', after, dataset=dataset)
+    logger.info(f"Compacted {dataset}: {before / 1024:.0f} KiB -> {after / 1024:.0f} KiB "
+                f"({len(df)} rows x {len(df.columns)} columns)")
+    return df
@@ -2,86 +2,329 @@
 
 import os
 import logging
-from typing import Optional, List, Dict, Any
-from functools import lru_cache
-import requests
-import pandas as pd
+import time
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import TYPE_CHECKING, Iterator, Optional, List, Dict, Any, Tuple
+from utils import academics, cache, compaction, metrics, resilience, schema, streaming, upstream_fixtures
+from utils.cache import get_dataset, peek
+
+# pandas and requests are imported lazily: importing them costs hundreds of
+# milliseconds at worker start-up, and many workers never touch a sheet.
+if TYPE_CHECKING:
+    import pandas as pd
+    import requests
 
 logger = logging.getLogger(__name__)
 
 # Cache timeout in seconds (5 minutes)
-CACHE_TTL = 300
+CACHE_TTL = int(os.getenv('DATA_CACHE_TTL', '300'))
+
+# Background refresh interval in seconds (0 disables the refresher)
+REFRESH_INTERVAL = int(os.getenv('DATA_REFRESH_INTERVAL', '0'))
+
+# Fetch only new bills rows (the Apps Script must support ?since_row=N, see DOCUMENTATION.md)
+BILLS_DELTA = os.getenv('FACULTY_BILLS_DELTA', 'false').lower() in ('1', 'true', 'yes')
+
+# With delta sync, still reload the whole bills sheet this often (picks up edited rows)
+BILLS_FULL_RESYNC = int(os.getenv('FACULTY_BILLS_FULL_RESYNC', '21600'))
+
+# Upstreams whose GET requests are hedged, comma-separated (e.g. 'students,attendance'; empty disables)
+HEDGE_UPSTREAMS = {u.strip() for u in os.getenv('UPSTREAM_HEDGE', '').split(',') if u.strip()}
+
+# A hedge is sent once the first call is slower than this percentile of recent calls
+HEDGE_PERCENTILE = float(os.getenv('UPSTREAM_HEDGE_PERCENTILE', '95'))
+
+# Never hedge earlier than this (seconds)
+HEDGE_MIN_DELAY = float(os.getenv('UPSTREAM_HEDGE_MIN_DELAY', '1'))
+
+# Hedges allowed per second per worker (bounds the extra Apps Script quota used)
+HEDGE_RATE = float(os.getenv('UPSTREAM_HEDGE_RATE', '0.2'))
+
+# Calls observed before the percentile is trusted
+_HEDGE_MIN_SAMPLES = 20
+
+_http_session: Optional['requests.Session'] = None
+_refresher: Optional[threading.Thread] = None
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_hedge_bucket = resilience.TokenBucket(HEDGE_RATE, capacity=3)
+_hedge_latency: Dict[str, resilience.LatencyWindow] = {}
 
 
-def fetch_json_from_url(url: str, timeout: int = 6) -> Optional[List[Dict[str, Any]]]:
+def http_session() -> 'requests.Session':
+    """Return the process-wide HTTP session (pooled keep-alive connections)."""
+    global _http_session
+    if _http_session is None:
+        import requests
+        _http_session = requests.Session()
+    return _http_session
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's HTTP pool, refresher and hedging threads in a forked worker."""
+    global _http_session, _refresher, _hedge_pool, _pool_lock, _hedge_bucket, _invalidation_pool
+    _http_session = None
+    _refresher = None
+    _hedge_pool = None
+    _invalidation_pool = None
+    _pool_lock = threading.Lock()
+    _hedge_bucket = resilience.TokenBucket(HEDGE_RATE, capacity=3)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def upstream_request(upstream: str, method: str, url: str, **kwargs) -> 'requests.Response':
+    """Send an HTTP request to an upstream service and record its metrics.
+    
+    Latency, response bytes and failures (network errors and HTTP >= 400)
+    are recorded per upstream so slow sheets show up on /metrics. In record
+    or replay mode (UPSTREAM_MODE) responses are saved to or served from
+    local fixtures, see utils.upstream_fixtures.
+    
+    Calls go through the upstream's circuit breaker and the timeout is
+    capped by the current request's latency budget (see utils.resilience).
+    
+    Args:
+        upstream: Short upstream name used as metric label (e.g. 'admissions', 'telegram')
+        method: HTTP method
+        url: The URL to call
+        kwargs: Passed through to requests (params, json, timeout, ...)
+        
+    Returns:
+        requests.Response (status is not checked)
+        
+    Raises:
+        resilience.UpstreamUnavailable: if the circuit is open or the budget is spent
+    """
+    try:
+        kwargs['timeout'] = resilience.call_timeout(upstream, kwargs.get('timeout'))
+    except resilience.UpstreamUnavailable:
+        metrics.inc('bca_upstream_short_circuits_total', upstream=upstream)
+        raise
+    
+    cb = resilience.breaker(upstream)
+    start = time.perf_counter()
+    try:
+        if upstream_fixtures.MODE == 'replay':
+            response = upstream_fixtures.replay(upstream, method, url, kwargs.get('params'))
+        else:
+            response = http_session().request(method, url, **kwargs)
+            if upstream_fixtures.MODE == 'record':
+                upstream_fixtures.record(upstream, method, url, kwargs.get('params'), response,
+                                         time.perf_counter() - start)
+    except Exception as e:
+        cb.record(False, time.perf_counter() - start)
+        metrics.inc('bca_upstream_errors_total', upstream=upstream, reason=type(e).__name__)
+        raise
+    finally:
+        metrics.observe('bca_upstream_request_duration_seconds', time.perf_counter() - start, upstream=upstream)
+    
+    # 4xx means the request itself was wrong, not that the upstream is unhealthy
+    cb.record(response.status_code < 500, time.perf_counter() - start)
+    if response.status_code >= 400:
+        metrics.inc('bca_upstream_errors_total', upstream=upstream, reason=f"http_{response.status_code}")
+    if not kwargs.get('stream'):
+        # Streamed bodies are counted while they are read (see iter_response_chunks)
+        metrics.inc('bca_upstream_response_bytes_total', len(response.content), upstream=upstream)
+    return response
+
+
+def iter_response_chunks(response: 'requests.Response', upstream: str,
+                         chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield the body of a streamed response, counting its bytes for /metrics."""
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        metrics.inc('bca_upstream_response_bytes_total', len(chunk), upstream=upstream)
+        yield chunk
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='upstream-hedge')
+        return _hedge_pool
+
+
+def hedged_request(upstream: str, method: str, url: str, **kwargs) -> 'requests.Response':
+    """Like upstream_request, but races a second request against a slow first one.
+    
+    Only GET requests to upstreams listed in UPSTREAM_HEDGE are hedged. If
+    the first request has not answered after the HEDGE_PERCENTILE latency of
+    recent calls, an identical request is sent and whichever answers first
+    wins. Hedges are rate limited per worker (UPSTREAM_HEDGE_RATE) so a slow
+    upstream does not get its quota doubled.
+    
+    Args:
+        upstream: Short upstream name (metric label and hedging switch)
+        method: HTTP method
+        url: The URL to call
+        kwargs: Passed through to upstream_request
+        
+    Returns:
+        requests.Response of the first request to answer
+    """
+    if upstream not in HEDGE_UPSTREAMS or method.upper() != 'GET' or upstream_fixtures.MODE == 'replay':
+        return upstream_request(upstream, method, url, **kwargs)
+    
+    window = _hedge_latency.setdefault(upstream, resilience.LatencyWindow())
+    
+    def attempt() -> 'requests.Response':
+        start = time.perf_counter()
+        response = upstream_request(upstream, method, url, **kwargs)
+        window.add(time.perf_counter() - start)
+        return response
+    
+    if len(window) < _HEDGE_MIN_SAMPLES:
+        return attempt()
+    
+    delay = max(HEDGE_MIN_DELAY, window.percentile(HEDGE_PERCENTILE))
+    pool = _hedge_executor()
+    # Each attempt runs in a copy of this context so it keeps the request's latency budget
+    primary = pool.submit(contextvars.copy_context().run, attempt)
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    
+    if not _hedge_bucket.try_acquire():
+        metrics.inc('bca_upstream_hedges_total', upstream=upstream, result='throttled')
+        return primary.result()
+    
+    metrics.inc('bca_upstream_hedges_total', upstream=upstream, result='sent')
+    hedge = pool.submit(contextvars.copy_context().run, attempt)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    metrics.inc('bca_upstream_hedges_total', upstream=upstream, result='won')
+                return future.result()
+    # Both failed: surface the first request's error
+    return primary.result()
+
+
+def fetch_json_from_url(url: str, timeout: int = 6, upstream: str = 'apps_script') -> Optional[List[Dict[str, Any]]]:
     """Fetch JSON data from a URL with error handling.
     
     Args:
         url: The URL to fetch from
         timeout: Request timeout in seconds
+        upstream: Upstream name used for metrics
         
     Returns:
         List of dictionaries on success, None on failure
     """
+    import requests
     try:
         if not url:
             logger.warning("fetch_json_from_url called with empty URL")
             return None
         
-        response = requests.get(url, timeout=timeout)
+        response = hedged_request(upstream, 'GET', url, timeout=timeout)
         response.raise_for_status()
         data = response.json()
         
         if not isinstance(data, list):
             logger.warning(f"Expected list from {url}, got {type(data)}")
+            metrics.inc('bca_upstream_errors_total', upstream=upstream, reason='unexpected_payload')
             return None
             
         return data
+    except resilience.UpstreamUnavailable as e:
+        logger.warning(f"Skipped fetching {upstream}: {e}")
+        return None
     except requests.RequestException as e:
         logger.exception(f"Failed to fetch data from {url}")
         return None
     except ValueError as e:
         logger.exception(f"Failed to parse JSON from {url}")
+        metrics.inc('bca_upstream_errors_total', upstream=upstream, reason='invalid_json')
         return None
 
 
-def get_student_data() -> Optional[pd.DataFrame]:
-    """Fetch student login data from Google Sheets.
+def _cached_frame(name: str, loader) -> Optional['pd.DataFrame']:
+    """Return a private copy of a cached DataFrame (callers may mutate it)."""
+    df = get_dataset(name, loader, CACHE_TTL)
+    return df.copy() if df is not None else None
+
+
+def get_student_data() -> Optional['pd.DataFrame']:
+    """Fetch student login data from Google Sheets (cached).
     
     Returns:
         DataFrame with student data or None on failure
     """
+    return _cached_frame('students', _load_student_data)
+
+
+def _frame_snapshot(name: str, loader) -> Tuple[int, Optional['pd.DataFrame']]:
+    df = get_dataset(name, loader, CACHE_TTL)
+    if df is None:
+        return 0, None
+    return cache.snapshot(name)[0], df
+
+
+def get_student_snapshot() -> Tuple[int, Optional['pd.DataFrame']]:
+    """Return (version, DataFrame) of the cached student sheet without copying it.
+
+    The frame is shared by every thread of the process and must not be
+    modified; the version changes whenever a new copy of the sheet is stored.
+
+    Returns:
+        (version, DataFrame), or (0, None) if no student data is available
+    """
+    return _frame_snapshot('students', _load_student_data)
+
+
+def _load_student_data() -> Optional['pd.DataFrame']:
     url = os.getenv('STUDENT_DATA_for_login')
-    data = fetch_json_from_url(url)
+    data = fetch_json_from_url(url, upstream='students')
     
     if data is None:
         return None
     
+    import pandas as pd
     try:
-        df = pd.DataFrame(data)
-        # Normalize column names (strip whitespace)
-        df.columns = [str(col).strip() for col in df.columns]
+        with metrics.timed('bca_dataframe_build_seconds', dataset='students'):
+            df = pd.DataFrame(data)
+            # Normalize column names (strip whitespace)
+            df.columns = [str(col).strip() for col in df.columns]
+        schema.apply(df, 'students')
+        compaction.compact(df, 'students')
         return df
     except Exception as e:
         logger.exception("Failed to create DataFrame from student data")
         return None
 
 
-def get_admission_data() -> Optional[pd.DataFrame]:
-    """Fetch admission application data from Google Sheets.
+def get_admission_data() -> Optional['pd.DataFrame']:
+    """Fetch admission application data from Google Sheets (cached).
     
     Returns:
         DataFrame with admission data or None on failure
     """
+    return _cached_frame('admissions', _load_admission_data)
+
+
+def _load_admission_data() -> Optional['pd.DataFrame']:
     url = os.getenv('ADMISSION_SCRIPT_URL')
-    data = fetch_json_from_url(url)
+    data = fetch_json_from_url(url, upstream='admissions')
     
     if data is None:
         return None
     
+    import pandas as pd
     try:
-        df = pd.DataFrame(data)
-        df.columns = [str(col).strip() for col in df.columns]
+        with metrics.timed('bca_dataframe_build_seconds', dataset='admissions'):
+            df = pd.DataFrame(data)
+            df.columns = [str(col).strip() for col in df.columns]
+        schema.apply(df, 'admissions')
+        compaction.compact(df, 'admissions')
         return df
     except Exception as e:
         logger.exception("Failed to create DataFrame from admission data")
@@ -89,27 +332,38 @@ def get_admission_data() -> Optional[pd.DataFrame]:
 
 
 def get_gf_applications() -> Optional[List[Dict[str, Any]]]:
-    """Fetch guest faculty applications from Google Sheets.
+    """Fetch guest faculty applications from Google Sheets (cached).
     
     Returns:
         List of application records or None on failure
     """
+    return get_dataset('gf_applications', _load_gf_applications, CACHE_TTL)
+
+
+def _load_gf_applications() -> Optional[List[Dict[str, Any]]]:
     url = os.getenv('GOOGLE_SCRIPT_URL')
-    return fetch_json_from_url(url)
+    return fetch_json_from_url(url, upstream='gf_applications')
 
 
 def get_updates() -> tuple[List[Dict[str, Any]], Optional[str]]:
-    """Fetch live updates/notices from GitHub JSON.
+    """Fetch live updates/notices from GitHub JSON (cached).
     
     Returns:
         Tuple of (updates_list, last_updated_timestamp)
     """
+    result = get_dataset('updates', _load_updates, CACHE_TTL)
+    if result is None:
+        return [], None
+    return result
+
+
+def _load_updates() -> Optional[tuple[List[Dict[str, Any]], Optional[str]]]:
     url = os.getenv('UPDATES_JSON_URL')
     try:
         if not url:
-            return [], None
+            return None
             
-        response = requests.get(url, timeout=5)
+        response = upstream_request('github_updates', 'GET', url, timeout=5)
         response.raise_for_status()
         payload = response.json()
         
@@ -119,11 +373,16 @@ def get_updates() -> tuple[List[Dict[str, Any]], Optional[str]]:
         return updates, last_updated
     except Exception as e:
         logger.warning(f"Could not fetch live updates: {e}")
-        return [], None
+        return None
+
+
+# Cache key of the department-wide summary built from every attendance sheet
+# (see utils.attendance_analytics); the 'attendance:' prefix ties it to their invalidation
+ATTENDANCE_SUMMARY_KEY = 'attendance:analytics'
 
 
 def get_attendance_data(batch: str, semester: str, section: str, subject: str) -> Optional[List[List[Any]]]:
-    """Fetch attendance data for specific batch/semester/section/subject.
+    """Fetch attendance data for specific batch/semester/section/subject (cached).
     
     Args:
         batch: Student batch (e.g., '24-27')
@@ -132,8 +391,19 @@ def get_attendance_data(batch: str, semester: str, section: str, subject: str) -
         subject: Subject code
         
     Returns:
-        2D list (rows) with attendance data or None on failure
+        2D list (rows) with attendance data or None on failure (or for a
+        combination academics does not list)
     """
+    # Values come from Telegram callbacks: only known sheets get a cache entry
+    if not academics.is_attendance_sheet(batch, semester, section, subject):
+        logger.warning(f"Ignoring attendance request for unknown sheet "
+                       f"{batch!r}/{semester!r}/{section!r}/{subject!r}")
+        return None
+    key = f"attendance:{batch}:{semester}:{section}:{subject}"
+    return get_dataset(key, lambda: _load_attendance_data(batch, semester, section, subject), CACHE_TTL)
+
+
+def _load_attendance_data(batch: str, semester: str, section: str, subject: str) -> Optional[List[List[Any]]]:
     url = os.getenv('ATTENDANCE_Script')
     if not url:
         logger.error("ATTENDANCE_Script URL not configured")
@@ -147,7 +417,7 @@ def get_attendance_data(batch: str, semester: str, section: str, subject: str) -
     }
     
     try:
-        response = requests.get(url, params=params, timeout=6)
+        response = hedged_request('attendance', 'GET', url, params=params, timeout=6)
         response.raise_for_status()
         data = response.json()
         
@@ -161,41 +431,90 @@ def get_attendance_data(batch: str, semester: str, section: str, subject: str) -
         return None
 
 
-def get_documents_tracking_data() -> Optional[pd.DataFrame]:
-    """Fetch documents tracking data for batch 2025-26.
+def get_documents_tracking_data() -> Optional['pd.DataFrame']:
+    """Fetch documents tracking data for batch 2025-26 (cached).
     
     Returns:
         DataFrame with documents tracking data or None on failure
     """
+    return _cached_frame('documents_tracking', _load_documents_tracking_data)
+
+
+def _load_documents_tracking_data() -> Optional['pd.DataFrame']:
     url = os.getenv('STUDENTS_DOCUMENT_SCripts')
     if not url:
         logger.error("STUDENTS_DOCUMENT_SCripts URL not configured")
         return None
     
     try:
-        data = fetch_json_from_url(url)
+        data = fetch_json_from_url(url, upstream='documents_tracking')
         if data is None:
             return None
             
-        df = pd.DataFrame(data)
-        
-        # Ensure required columns exist
-        required_cols = ['SL No.', 'USN No', 'Student Name']
-        for col in required_cols:
-            if col not in df.columns:
-                logger.warning(f"Required column '{col}' missing from documents tracking data")
-                df[col] = ''
+        import pandas as pd
+        with metrics.timed('bca_dataframe_build_seconds', dataset='documents_tracking'):
+            df = pd.DataFrame(data)
         
+        # Ensure required columns exist (missing ones are added empty)
+        schema.apply(df, 'documents_tracking')
+        compaction.compact(df, 'documents_tracking')
         return df
     except Exception as e:
         logger.exception("Failed to fetch documents tracking data")
         return None
 
 
-def get_faculty_bills_data(timeout: int = 15) -> Optional[pd.DataFrame]:
-    """Fetch faculty bills/teaching records data from Google Sheets.
+def get_marks_data() -> Optional['pd.DataFrame']:
+    """Fetch internal assessment marks from Google Sheets (cached).
+    
+    One row per student and subject, with a column per IA component (see
+    utils.marks for the per-USN store built from it).
+    
+    Returns:
+        DataFrame with marks data or None on failure
+    """
+    return _cached_frame('marks', _load_marks_data)
+
+
+def get_marks_snapshot() -> Tuple[int, Optional['pd.DataFrame']]:
+    """Return (version, DataFrame) of the cached marks sheet without copying it (do not modify it).
     
-    Supports list-of-lists (first row header) or list-of-dicts format.
+    Returns:
+        (version, DataFrame), or (0, None) if no marks data is available
+    """
+    return _frame_snapshot('marks', _load_marks_data)
+
+
+def _load_marks_data() -> Optional['pd.DataFrame']:
+    url = os.getenv('MARKS_SCRIPT_URL')
+    if not url:
+        logger.warning("MARKS_SCRIPT_URL not configured")
+        return None
+    
+    try:
+        data = fetch_json_from_url(url, upstream='marks')
+        if data is None:
+            return None
+        
+        import pandas as pd
+        with metrics.timed('bca_dataframe_build_seconds', dataset='marks'):
+            df = pd.DataFrame(data)
+            df.columns = [str(col).strip() for col in df.columns]
+        schema.apply(df, 'marks')
+        compaction.compact(df, 'marks')
+        return df
+    except Exception as e:
+        logger.exception("Failed to fetch marks data")
+        return None
+
+
+def get_faculty_bills_data(timeout: int = 15) -> Optional['pd.DataFrame']:
+    """Fetch faculty bills/teaching records data from Google Sheets (cached).
+    
+    Supports list-of-lists (first row header) or list-of-dicts format. With
+    FACULTY_BILLS_DELTA enabled only rows added since the cached copy are
+    fetched. df.attrs['bills_sync'] records the row count and the time of
+    the last full load.
     
     Args:
         timeout: Request timeout in seconds
@@ -203,33 +522,159 @@ def get_faculty_bills_data(timeout: int = 15) -> Optional[pd.DataFrame]:
     Returns:
         DataFrame with faculty bills data or None on failure
     """
+    return _cached_frame('faculty_bills', lambda: _load_faculty_bills_data(timeout))
+
+
+def _fetch_bills_frame(url: str, timeout: int, params: Optional[Dict[str, Any]] = None) -> 'pd.DataFrame':
+    # The body is decoded incrementally straight into columns (see utils.streaming)
+    # instead of response.json(), which holds the payload and every row at once
+    response = upstream_request('faculty_bills', 'GET', url, params=params, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        with metrics.timed('bca_dataframe_build_seconds', dataset='faculty_bills'):
+            df = streaming.frame_from_json_rows(iter_response_chunks(response, 'faculty_bills'))
+            df.columns = [str(c).strip() for c in df.columns]
+    finally:
+        response.close()
+    return df
+
+
+def _append_bills_rows(previous: 'pd.DataFrame', url: str, timeout: int) -> Optional['pd.DataFrame']:
+    """Return previous plus the rows added upstream since, or None if a full load is needed."""
+    import pandas as pd
+
+    sync = previous.attrs['bills_sync']
+    delta = _fetch_bills_frame(url, timeout, params={'since_row': sync['rows']})
+    if delta.empty:
+        return previous
+    if list(delta.columns) != list(previous.columns):
+        logger.info("Bills sheet header changed, reloading it completely")
+        return None
+    if not previous.empty and delta.iloc[0].astype(str).equals(previous.iloc[0].astype(str)):
+        # The script ignored since_row and sent every row again
+        logger.warning("Bills endpoint does not support since_row, reloading it completely")
+        return None
+
+    df = pd.concat([previous, delta], ignore_index=True)
+    df.attrs = dict(previous.attrs)
+    df.attrs['bills_sync'] = {'rows': len(df), 'full_at': sync['full_at']}
+    schema.apply(df, 'faculty_bills')
+    compaction.compact(df, 'faculty_bills')
+    logger.info(f"Appended {len(delta)} new bills rows ({len(df)} total)")
+    return df
+
+
+def _load_faculty_bills_data(timeout: int) -> Optional['pd.DataFrame']:
     url = os.getenv('FACULTY_BILLS_SCRIPT')
     if not url:
         logger.error("FACULTY_BILLS_SCRIPT URL not configured")
         return None
     
     try:
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
-
-        if isinstance(data, list) and len(data) > 0 and isinstance(data[0], list):
-            # list-of-lists format: first row is header
-            header = [str(h).strip() for h in data[0]]
-            rows = data[1:]
-            try:
-                df = pd.DataFrame(rows, columns=header)
-            except Exception:
-                df = pd.DataFrame(rows)
-                df.columns = [str(c).strip() for c in df.columns]
-        elif isinstance(data, list) and len(data) > 0 and isinstance(data[0], dict):
-            # list-of-dicts format
-            df = pd.DataFrame(data)
-        else:
-            df = pd.DataFrame(data)
-
-        df.columns = [str(c).strip() for c in df.columns]
+        if BILLS_DELTA:
+            previous = peek('faculty_bills')
+            sync = previous.attrs.get('bills_sync') if previous is not None else None
+            if sync and time.time() - sync['full_at'] < BILLS_FULL_RESYNC:
+                df = _append_bills_rows(previous, url, timeout)
+                if df is not None:
+                    return df
+        
+        full_at = time.time()
+        df = _fetch_bills_frame(url, timeout)
+        df.attrs['bills_sync'] = {'rows': len(df), 'full_at': full_at}
+        schema.apply(df, 'faculty_bills')
+        compaction.compact(df, 'faculty_bills')
         return df
     except Exception as e:
         logger.exception("Failed to fetch faculty bills data")
         return None
+
+
+# Shared datasets by cache name, with the getter that (re)loads each one
+DATASETS = {
+    'students': get_student_data,
+    'admissions': get_admission_data,
+    'gf_applications': get_gf_applications,
+    'updates': get_updates,
+    'documents_tracking': get_documents_tracking_data,
+    'faculty_bills': get_faculty_bills_data,
+    'marks': get_marks_data,
+}
+
+_invalidation_pool: Optional[ThreadPoolExecutor] = None
+
+
+def warm_caches() -> None:
+    """Load every shared dataset into the cache (used before forking workers)."""
+    for loader in DATASETS.values():
+        try:
+            loader()
+        except Exception:
+            logger.exception(f"Failed to warm cache with {loader.__name__}")
+
+
+def _refresh_now(label: str, getter) -> None:
+    try:
+        getter()
+    except Exception:
+        logger.exception(f"Refresh of '{label}' after invalidation failed")
+
+
+def invalidate_dataset(name: str, attendance_key: Optional[Dict[str, str]] = None) -> bool:
+    """Drop a dataset from the cache and reload it in the background.
+
+    Args:
+        name: Key of DATASETS, or 'attendance'
+        attendance_key: For 'attendance', the batch/semester/section/subject to
+            refresh; without it every cached attendance sheet is invalidated
+            and reloaded lazily on next use
+
+    Returns:
+        False if name is not a known dataset
+    """
+    global _invalidation_pool
+    if name == 'attendance':
+        if attendance_key:
+            args = [str(attendance_key.get(k, '')) for k in ('batch', 'semester', 'section', 'subject')]
+            cache.invalidate('attendance:' + ':'.join(args))
+            cache.invalidate(ATTENDANCE_SUMMARY_KEY)
+            getter = lambda: get_attendance_data(*args)  # noqa: E731
+        else:
+            cache.invalidate('attendance:', prefix=True)
+            return True
+    elif name in DATASETS:
+        cache.invalidate(name)
+        getter = DATASETS[name]
+    else:
+        return False
+
+    with _pool_lock:
+        if _invalidation_pool is None:
+            _invalidation_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-invalidation')
+        pool = _invalidation_pool
+    pool.submit(_refresh_now, name, getter)
+    return True
+
+
+def _refresh_loop(interval: int) -> None:
+    while True:
+        time.sleep(interval)
+        warm_caches()
+
+
+def start_background_refresh(interval: int = REFRESH_INTERVAL) -> None:
+    """Start a daemon thread that keeps the shared datasets warm.
+
+    Safe to call in every worker: the cache elects a single refresher per
+    dataset, so the upstream is not hit once per worker.
+    
+    Args:
+        interval: Seconds between refresh rounds (0 disables refreshing)
+    """
+    global _refresher
+    if interval <= 0 or (_refresher is not None and _refresher.is_alive()):
+        return
+    _refresher = threading.Thread(target=_refresh_loop, args=(interval,),
+                                  name='dataset-refresher', daemon=True)
+    _refresher.start()
+    logger.info(f"Background dataset refresh every {interval}s")
@@ -0,0 +1,172 @@
+"""Date parsing shared by student login and the faculty bills.
+
+Sheet dates repeat heavily (every DOB is looked up again at each login, a
+bills sheet has one date per class but only a few hundred distinct days), so
+scalar parsing is memoized, and whole columns are parsed once per distinct
+value with the common ISO formats tried in bulk.
+
+Two flavours exist because the callers need different semantics:
+
+- ``parse_date_string``: user-typed or sheet DOBs in fixed formats
+  (day-first before month-first), no timezone handling
+- ``parse_date_value`` / ``parse_date_series``: Apps Script cell values,
+  where ISO timestamps are UTC and are converted to the Asia/Kolkata date
+  that Google Sheets displays
+"""
+
+import logging
+from datetime import datetime, date
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+LOCAL_TZ = "Asia/Kolkata"
+
+# Formats accepted for dates of birth, in order of preference
+DOB_FORMATS = (
+    '%Y-%m-%d',      # 2000-01-15
+    '%d/%m/%Y',      # 15/01/2000
+    '%d-%m-%Y',      # 15-01-2000
+    '%m/%d/%Y',      # 01/15/2000
+    '%Y/%m/%d',      # 2000/01/15
+    '%d.%m.%Y',      # 15.01.2000
+)
+
+# Naive formats tried for cell values pandas could not parse
+_FALLBACK_FORMATS = ("%Y-%m-%dT%H:%M:%S.%fZ",
+                     "%Y-%m-%dT%H:%M:%SZ",
+                     "%Y-%m-%dT%H:%M:%S",
+                     "%Y-%m-%d")
+
+# Bound on distinct strings remembered by each memo cache
+_MEMO_SIZE = 8192
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _parse_dob(date_str: str) -> Optional[date]:
+    for fmt in DOB_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    logger.debug(f"Could not parse date: {date_str}")
+    return None
+
+
+def parse_date_string(date_str: str) -> Optional[date]:
+    """Parse a date string in one of DOB_FORMATS (memoized).
+
+    Args:
+        date_str: Date string to parse
+
+    Returns:
+        datetime.date object or None if parsing fails
+    """
+    return _parse_dob(str(date_str).strip())
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _parse_cell_string(s: str) -> Optional[date]:
+    import pandas as pd
+
+    # 1) pandas flexible parser with utc=True (handles '...Z' correctly), shown in local time
+    dt = pd.to_datetime(s, utc=True, errors="coerce")
+    if not pd.isna(dt):
+        try:
+            return dt.tz_convert(LOCAL_TZ).date()
+        except Exception:
+            return dt.date()
+
+    # 2) explicit common formats (date-only or naive ISO), treated as local dates
+    for fmt in _FALLBACK_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            pass
+
+    # 3) as a last resort, if it looks like ISO 'YYYY-MM-DD...' take the date part
+    if "T" in s:
+        try:
+            return datetime.strptime(s.split("T", 1)[0], "%Y-%m-%d").date()
+        except ValueError:
+            pass
+    return None
+
+
+def parse_date_value(v: Any) -> Optional[date]:
+    """Tolerant parse of a sheet cell into datetime.date, None if invalid.
+
+    - ISO timestamps like '2025-07-17T18:30:00.000Z' are read as UTC and
+      converted to the Asia/Kolkata date.
+    - date/datetime values are returned as dates (tz-aware Timestamps are
+      converted to local time first).
+    - Strings are memoized, so repeated dates are parsed once.
+
+    Args:
+        v: Value to parse (string, datetime, date or pandas Timestamp)
+
+    Returns:
+        Parsed date or None if parsing fails
+    """
+    import pandas as pd
+    if pd.isna(v):
+        return None
+
+    if isinstance(v, (pd.Timestamp, datetime, date)):
+        if isinstance(v, pd.Timestamp) and v.tz is not None:
+            try:
+                return v.tz_convert(LOCAL_TZ).date()
+            except Exception:
+                return v.tz_convert(None).date()
+        return v.date() if isinstance(v, datetime) else v
+
+    s = str(v).strip()
+    if s == "":
+        return None
+    return _parse_cell_string(s)
+
+
+def _parse_unique(values: List[Any]) -> List[Optional[date]]:
+    """Parse distinct cell values, ISO strings in one vectorized pass."""
+    import pandas as pd
+
+    parsed: List[Optional[date]] = [None] * len(values)
+    iso_idx = [i for i, v in enumerate(values) if isinstance(v, str) and v[:4].isdigit() and v[4:5] == '-']
+    if iso_idx:
+        stamps = pd.to_datetime(pd.Series([values[i].strip() for i in iso_idx]), format='ISO8601',
+                                utc=True, errors='coerce')
+        local = stamps.dt.tz_convert(LOCAL_TZ).dt.date
+        for i, ok, d in zip(iso_idx, stamps.notna(), local):
+            if ok:
+                parsed[i] = d
+    done = set(i for i in iso_idx if parsed[i] is not None)
+    for i, v in enumerate(values):
+        if i not in done:
+            parsed[i] = parse_date_value(v)
+    return parsed
+
+
+def parse_date_series(values: 'pd.Series') -> 'pd.Series':
+    """Vectorized parse_date_value over a column.
+
+    Each distinct value is parsed once; the result has the same index and
+    holds datetime.date objects or None.
+
+    Args:
+        values: Column of sheet cell values
+
+    Returns:
+        Object Series of dates (None where parsing failed)
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    lookup = np.empty(len(uniques) + 1, dtype=object)
+    lookup[:-1] = _parse_unique(list(uniques))
+    lookup[-1] = None  # code -1 (missing value)
+    return pd.Series(lookup[codes], index=values.index, dtype=object)
@@ -0,0 +1,279 @@
+"""CSV and XLSX exports of the bills, admissions and documents tracking data.
+
+Exports read the same cached DataFrames as the HTML pages and apply the same
+rules as the page filters (filter_admissions / filter_documents mirror the
+JavaScript in admissionApp.html and documents_tracking.html). CSV is streamed
+EXPORT_CHUNK_ROWS rows at a time; XLSX is written by xlsxwriter in
+constant_memory mode (rows are flushed as they are written) to a temporary
+file that is then streamed, so no export is ever built whole in memory.
+"""
+
+import os
+import re
+import time
+import logging
+import tempfile
+from typing import IO, TYPE_CHECKING, Iterator, List, Sequence
+
+from datetime import datetime
+from flask import Response, request, send_file
+from utils import metrics, schema
+from utils.data_fetcher import get_documents_tracking_data
+from utils.faculty_bills_helpers import COMBINED_HEADER
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rows serialized per CSV chunk / per XLSX flush batch
+EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '500'))
+
+FORMATS = ('csv', 'xlsx')
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Columns of the bills export (entries of filter_and_assign_sl / query_bills_range weeks)
+BILLS_COLUMNS = ['Week', 'SL No', 'Dairy No.', 'Date', COMBINED_HEADER,
+                 'Actual hours', 'Claiming hours', 'Subject code', 'Faculty']
+
+# Documents every student must submit; government seats add one per category
+BASE_DOCUMENTS = ('10th', '12th', 'TC')
+_CATEGORY_DOCUMENTS = (('PWD', 'PWD'), ('KM', 'KM'), ('RL', 'RL'), ('HK', 'HK'), ('SC', 'IC'), ('ST', 'IC'))
+_INCOME_CERTIFICATE_CATEGORIES = ('3B', '2A', '2B', '3A', 'CAT-1')
+
+# Quota filter -> (admission type must contain, must not contain); OTHER = none of the known types
+_QUOTAS = {
+    'GM': (('GM',), ('HK', 'PWD')),
+    'SC': (('SC',), ()),
+    'ST': (('ST',), ()),
+    'HK': (('HK',), ()),
+    'PWD': (('PWD',), ()),
+    'CAT': (('CAT',), ()),
+    'KM': (('KM',), ()),
+    'RL': (('RL',), ()),
+    'PY': (('PY',), ()),
+}
+_KNOWN_TYPES = ('GM', 'SC', 'ST', 'HK', 'PWD', 'CAT', 'KM', 'RL', 'PY', 'CANCEL')
+
+# Text a spreadsheet would run as a formula when the file is opened (plain numbers excepted)
+_FORMULA_START = ('=', '+', '-', '@', '\t', '\r')
+_PLAIN_NUMBER = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)')
+
+
+def _text(df: 'pd.DataFrame', column: str) -> 'pd.Series':
+    """Column as stripped strings ('' where missing or absent)."""
+    import pandas as pd
+
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[column].fillna('').astype(str).str.strip()
+
+
+def _search_mask(df: 'pd.DataFrame', columns: Sequence[str], search: str) -> 'pd.Series':
+    import pandas as pd
+
+    mask = pd.Series(not search, index=df.index)
+    needle = search.strip().lower()
+    if needle:
+        for column in columns:
+            mask |= _text(df, column).str.lower().str.contains(needle, regex=False)
+    return mask
+
+
+def filter_admissions(df: 'pd.DataFrame', search: str = '', status: str = 'all') -> 'pd.DataFrame':
+    """Admission rows matching the admission applications page filters.
+
+    Args:
+        df: Admission data from get_admission_data
+        search: Text matched against name, application number and rank
+        status: 'joined', 'withdrawn', 'refund' or 'all'
+    """
+    columns = schema.apply(df, 'admissions')
+    mask = _search_mask(df, [columns['candidate_name'], columns['application'], columns['rank']], search)
+    if status in ('joined', 'withdrawn'):
+        mask &= _text(df, columns['joining']).str.upper() == ('Y' if status == 'joined' else 'N')
+    elif status == 'refund':
+        mask &= _text(df, 'PAYMENT REMARKS').str.lower().str.contains('refund', regex=False)
+    return df[mask]
+
+
+def required_documents(admission_type: str) -> tuple:
+    """Documents a student with this admission type must submit."""
+    admission_type = admission_type.upper()
+    if not admission_type or 'PY' in admission_type:
+        return BASE_DOCUMENTS
+    for category, document in _CATEGORY_DOCUMENTS:
+        if category in admission_type:
+            return BASE_DOCUMENTS + (document,)
+    if any(c in admission_type for c in _INCOME_CERTIFICATE_CATEGORIES):
+        return BASE_DOCUMENTS + ('IC',)
+    return BASE_DOCUMENTS
+
+
+def filter_documents(df: 'pd.DataFrame', search: str = '', status: str = 'all',
+                     section: str = 'all', quota: str = 'all') -> 'pd.DataFrame':
+    """Documents tracking rows matching the documents tracking page filters.
+
+    Args:
+        df: Documents tracking data from get_documents_tracking_data
+        search: Text matched against SL No., USN and name
+        status: 'completed', 'pending', 'cancel' or 'all'
+        section: Section letter or 'all'
+        quota: Key of the category filter ('GM', 'SC', ..., 'OTHER') or 'all'
+    """
+    columns = schema.apply(df, 'documents_tracking')
+    mask = _search_mask(df, [columns['sl_no'], columns['usn'], columns['name']], search)
+    types = _text(df, 'Admission_Type').str.upper()
+
+    if status == 'cancel':
+        mask &= types == 'CANCEL'
+    elif status in ('completed', 'pending'):
+        # Admission types have few distinct values: resolve the required documents once per type
+        required = {t: required_documents(t) for t in types.unique()}
+        complete = types != 'CANCEL'
+        for document in {d for docs in required.values() for d in docs}:
+            needed = types.map(lambda t: document in required[t])
+            complete &= ~needed | (_text(df, document).str.lower() == 'y')
+        mask &= complete if status == 'completed' else ~complete & (types != 'CANCEL')
+
+    if section != 'all':
+        mask &= _text(df, 'Section') == section
+
+    if quota == 'OTHER':
+        for known in _KNOWN_TYPES:
+            mask &= ~types.str.contains(known, regex=False)
+    elif quota in _QUOTAS:
+        include, exclude = _QUOTAS[quota]
+        for part in include:
+            mask &= types.str.contains(part, regex=False)
+        for part in exclude:
+            mask &= ~types.str.contains(part, regex=False)
+    return df[mask]
+
+
+def bills_frame(weeks: List[dict]) -> 'pd.DataFrame':
+    """Flatten numbered bills weeks into export rows (one per class)."""
+    import pandas as pd
+
+    rows = [[w['week_number']] + [e.get(c, '') for c in BILLS_COLUMNS[1:]]
+            for w in weeks for e in w['entries']]
+    return pd.DataFrame(rows, columns=BILLS_COLUMNS)
+
+
+def _formula_like(value) -> bool:
+    return isinstance(value, str) and value.startswith(_FORMULA_START) and not _PLAIN_NUMBER.fullmatch(value)
+
+
+def safe_cells(chunk: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Prefix text cells starting with =, +, -, @ (or a tab / CR) with an apostrophe.
+
+    Names and remarks typed by applicants end up in exports that staff open
+    in Excel; without the prefix such a cell runs as a formula. Returns
+    chunk itself when no cell needs it, otherwise a copy.
+    """
+    import pandas as pd
+
+    out = chunk
+    for i in range(chunk.shape[1]):
+        column = chunk.iloc[:, i]
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            continue
+        risky = column.map(_formula_like).astype(bool)
+        if risky.any():
+            if out is chunk:
+                out = chunk.copy()
+            text = column.astype(object)
+            out.isetitem(i, text.where(~risky, "'" + text.astype(str)))
+    return out
+
+
+def csv_chunks(df: 'pd.DataFrame') -> Iterator[str]:
+    """Yield df as CSV text, a header chunk then EXPORT_CHUNK_ROWS rows per chunk.
+
+    The first chunk starts with a UTF-8 BOM so Excel opens non-ASCII names
+    correctly. Formula-like text is neutralized (see safe_cells).
+    """
+    yield '\ufeff' + df.iloc[0:0].to_csv(index=False)
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        yield safe_cells(df.iloc[start:start + EXPORT_CHUNK_ROWS]).to_csv(index=False, header=False)
+
+
+def write_xlsx(df: 'pd.DataFrame', sheet_name: str) -> IO[bytes]:
+    """Write df to an XLSX temporary file in xlsxwriter's constant_memory mode.
+
+    xlsxwriter is imported here so it stays off the application start-up path.
+
+    Returns:
+        Temporary file positioned at the start of the workbook (deleted on close)
+    """
+    import xlsxwriter
+
+    out = tempfile.TemporaryFile(prefix='bca_export_', suffix='.xlsx')
+    workbook = xlsxwriter.Workbook(out, {'constant_memory': True, 'strings_to_numbers': False,
+                                         'strings_to_formulas': False, 'strings_to_urls': False})
+    sheet = workbook.add_worksheet(sheet_name[:31])
+    header = workbook.add_format({'bold': True, 'bg_color': '#DBEAFE', 'border': 1})
+
+    # constant_memory writes rows in order, so widths and the header come first
+    for col, name in enumerate(df.columns):
+        sheet.set_column(col, col, min(max(len(str(name)) + 2, 10), 50))
+    sheet.write_row(0, 0, [str(c) for c in df.columns], header)
+    sheet.freeze_panes(1, 0)
+
+    row = 1
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        # Cells are written as text (strings_to_formulas is off); the prefix also
+        # protects the values if the sheet is later saved as CSV
+        chunk = safe_cells(df.iloc[start:start + EXPORT_CHUNK_ROWS]).astype(object)
+        for values in chunk.where(chunk.notna(), '').itertuples(index=False, name=None):
+            sheet.write_row(row, 0, values)
+            row += 1
+
+    workbook.close()
+    out.seek(0)
+    return out
+
+
+def export_response(df: 'pd.DataFrame', fmt: str, basename: str, sheet_name: str = 'Export') -> Response:
+    """CSV (streamed) or XLSX download of df.
+
+    Args:
+        df: Rows to export, already filtered
+        fmt: 'csv' or 'xlsx'
+        basename: Download file name without extension
+        sheet_name: Worksheet name for XLSX
+    """
+    started = time.perf_counter()
+    metrics.inc('bca_exports_total', format=fmt)
+    metrics.inc('bca_export_rows_total', len(df), format=fmt)
+
+    if fmt == 'xlsx':
+        out = write_xlsx(df, sheet_name)
+        metrics.observe('bca_export_render_seconds', time.perf_counter() - started, format=fmt)
+        return send_file(out, as_attachment=True, download_name=f"{basename}.xlsx", mimetype=XLSX_MIMETYPE)
+
+    return Response(csv_chunks(df), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename="{basename}.csv"'})
+
+
+def documents_export() -> Response:
+    """Documents tracking export for the current request (shared by the admin and attender routes).
+
+    Query parameters are the page filters (search, status, section, quota) and format.
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return Response("Unsupported export format", 400)
+
+    try:
+        data_df = get_documents_tracking_data()
+        if data_df is None:
+            return Response("Documents tracking data currently unavailable", 503)
+
+        rows = filter_documents(data_df, request.args.get('search', ''), request.args.get('status', 'all'),
+                                request.args.get('section', 'all'), request.args.get('quota', 'all'))
+        return export_response(rows, fmt, f"documents_tracking_{datetime.now():%Y%m%d}", 'Documents')
+    except Exception:
+        logger.exception("Documents tracking export error")
+        return Response("Error generating export", 500)
@@ -1,15 +1,25 @@
 """Helper functions for faculty bills/teaching records processing."""
 
+import os
+import heapq
 import logging
+import threading
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta, date
-from typing import Optional, List, Dict, Any, Tuple
-import pandas as pd
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, NamedTuple, Tuple
+from utils import dates, schema
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 # Exact combined header name required in the UI and DOCX
 COMBINED_HEADER = "Particulars / chapter / lectures (as per Time Table) I / II / III / IV / V / VI Sem"
 
+# Academic year runs July-June: odd semester July-December, even semester January-June
+ACADEMIC_YEAR_START_MONTH = 7
+
 
 def find_col_by_variants(cols: List[str], *variants) -> Optional[str]:
     """Find a column name in cols matching any variant (case-insensitive).
@@ -34,9 +44,8 @@ def find_col_by_variants(cols: List[str], *variants) -> Optional[str]:
 def parse_date_val(v: Any) -> Optional[date]:
     """
     Tolerant parse into datetime.date, returning None if invalid.
-    - Parses ISO timestamps like '2025-07-17T18:30:00.000Z' as UTC then converts to local TZ (Asia/Kolkata).
-    - Falls back to flexible pandas parsing or explicit formats.
-    - If an ISO-like string without timezone is provided, tries to parse it directly.
+    ISO timestamps like '2025-07-17T18:30:00.000Z' are read as UTC and converted
+    to the local date (Asia/Kolkata). See utils.dates.parse_date_value.
     
     Args:
         v: Value to parse (can be string, datetime, date, or pandas Timestamp)
@@ -44,57 +53,7 @@ def parse_date_val(v: Any) -> Optional[date]:
     Returns:
         Parsed date or None if parsing fails
     """
-    if pd.isna(v):
-        return None
-
-    # If it's already a date/datetime/timestamp, return its date (no timezone adjustment).
-    if isinstance(v, (pd.Timestamp, datetime, date)):
-        # pandas Timestamp may be tz-aware; convert to local if tz-aware.
-        if isinstance(v, pd.Timestamp) and v.tz is not None:
-            try:
-                local = v.tz_convert("Asia/Kolkata")
-                return local.date()
-            except Exception:
-                # fallback: use UTC-normalized date
-                return v.tz_convert(None).date() if hasattr(v, 'tz_convert') else v.date()
-        return v.date() if not isinstance(v, date) else v
-
-    s = str(v).strip()
-    if s == "":
-        return None
-
-    # 1) Try pandas flexible parser with utc=True (handles '...Z' correctly)
-    dt = pd.to_datetime(s, utc=True, errors="coerce")
-    if not pd.isna(dt):
-        # dt is timezone-aware (UTC). Convert to local timezone to match Google Sheets display.
-        try:
-            local = dt.tz_convert("Asia/Kolkata")
-            return local.date()
-        except Exception:
-            # if tz_convert fails for any reason, fall back to the UTC date
-            return dt.date()
-
-    # 2) Try explicit common formats (date-only or naive ISO)
-    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ",
-                "%Y-%m-%dT%H:%M:%SZ",
-                "%Y-%m-%dT%H:%M:%S",
-                "%Y-%m-%d"):
-        try:
-            parsed = datetime.strptime(s, fmt)
-            # parsed is naive — treat as local date (no tz shift)
-            return parsed.date()
-        except Exception:
-            pass
-
-    # 3) As a last resort, if it looks like ISO 'YYYY-MM-DD...' take the date part
-    if "T" in s:
-        try:
-            date_part = s.split("T", 1)[0]
-            return datetime.strptime(date_part, "%Y-%m-%d").date()
-        except Exception:
-            pass
-
-    return None
+    return dates.parse_date_value(v)
 
 
 def contains_lab(*texts: Any) -> bool:
@@ -114,7 +73,7 @@ def contains_lab(*texts: Any) -> bool:
     return False
 
 
-def build_months_structure(df: pd.DataFrame) -> Tuple[Dict[str, List[Dict]], List[str]]:
+def build_months_structure(df: 'pd.DataFrame') -> Tuple[Dict[str, List[Dict]], List[str]]:
     """
     Build months structure from faculty bills dataframe (no SL assignment here).
 
@@ -141,15 +100,18 @@ def build_months_structure(df: pd.DataFrame) -> Tuple[Dict[str, List[Dict]], Lis
       "Dairy No.", "Date_iso", "Date" (dd-mm-yyyy), COMBINED_HEADER, 
       "Actual hours", "Claiming hours", "Subject code", "Faculty"
     """
-    # detect source column names (variants added to match your sheet)
-    col_date = find_col_by_variants(df.columns, "Date", "date")
-    col_diary = find_col_by_variants(df.columns, "Diary Number", "Diary No", "Diary", "DiaryNumber")
-    col_class = find_col_by_variants(df.columns, "Select Class and Section", "Select Class", "Class")
-    col_subject_raw = find_col_by_variants(df.columns, "Choose Subject", "Subject")
-    col_topics = find_col_by_variants(df.columns, "Topics Covered", "Topics", "Particulars")
-    col_duration = find_col_by_variants(df.columns, "Duration", "Actual hours")
-    col_claiming = find_col_by_variants(df.columns, "CLAMING HOURS", "Claiming Hours", "Claiming")
-    col_faculty_raw = find_col_by_variants(df.columns, "Faculty Name - Email", "Faculty Name", "Faculty")
+    import pandas as pd
+
+    # source column names (variants in utils.schema, resolved once per sheet header)
+    columns = schema.apply(df, 'faculty_bills')
+    col_date = columns['date']
+    col_diary = columns['diary']
+    col_class = columns['class']
+    col_subject_raw = columns['subject']
+    col_topics = columns['topics']
+    col_duration = columns['duration']
+    col_claiming = columns['claiming']
+    col_faculty_raw = columns['faculty']
 
     if col_date is None:
         return {}, []  # return empty months and empty faculty list
@@ -163,7 +125,7 @@ def build_months_structure(df: pd.DataFrame) -> Tuple[Dict[str, List[Dict]], Lis
     df[col_duration] = pd.to_numeric(df[col_duration], errors="coerce").fillna(0.0)
 
     # parse dates and keep only rows with parsed date
-    df["_parsed_date"] = df[col_date].apply(parse_date_val)
+    df["_parsed_date"] = dates.parse_date_series(df[col_date])
     df = df[~df["_parsed_date"].isna()].copy()
     if df.empty:
         return {}, []
@@ -295,10 +257,148 @@ def build_months_structure(df: pd.DataFrame) -> Tuple[Dict[str, List[Dict]], Lis
     return months, faculty_list
 
 
+def merge_months_structure(months: Dict[str, List[Dict]], faculty_list: List[str],
+                           new_months: Dict[str, List[Dict]], new_faculty: List[str]
+                           ) -> Tuple[Dict[str, List[Dict]], List[str]]:
+    """
+    Fold the months structure of newly added rows into an existing one.
+
+    Neither input is modified: touched months and weeks are copied, so the
+    existing structure can keep being read by other threads.
+
+    Args:
+        months, faculty_list: Result of build_months_structure for the earlier rows
+        new_months, new_faculty: Result of build_months_structure for the new rows
+
+    Returns:
+        Tuple of (months_dict, faculty_list) as build_months_structure would return for all rows
+    """
+    merged = dict(months)
+    for mlabel, new_weeks in new_months.items():
+        weeks = {w["week_start"]: w for w in merged.get(mlabel, [])}
+        for nw in new_weeks:
+            w = weeks.get(nw["week_start"])
+            if w is None:
+                weeks[nw["week_start"]] = nw
+                continue
+            entries = w["entries"] + nw["entries"]
+            entries.sort(key=lambda e: (e["Date_iso"], str(e.get("Dairy No.", ""))))
+            weeks[nw["week_start"]] = {
+                **w,
+                "entries": entries,
+                "week_total_actual": round(w["week_total_actual"] + nw["week_total_actual"], 2),
+                "week_total_claiming": round(w["week_total_claiming"] + nw["week_total_claiming"], 2),
+            }
+        merged[mlabel] = sorted(weeks.values(), key=lambda w: w["week_start"])
+    return merged, sorted(set(faculty_list) | set(new_faculty))
+
+
+class BillsIndex(NamedTuple):
+    """All bill entries sorted by (date, diary number), for date-range queries.
+
+    keys holds each entry's Date_iso ('YYYY-MM-DD' sorts chronologically),
+    so a range is two bisections; days holds the same dates as date objects.
+    """
+    keys: List[str]
+    days: List[date]
+    entries: List[Dict]
+
+
+def _entry_sort_key(e: Dict) -> Tuple[str, str]:
+    return e["Date_iso"], str(e.get("Dairy No.", ""))
+
+
+def build_bills_index(months: Dict[str, List[Dict]]) -> BillsIndex:
+    """Flatten a months structure into a BillsIndex (entries are shared, not copied)."""
+    entries = sorted((e for weeks in months.values() for w in weeks for e in w["entries"]), key=_entry_sort_key)
+    return _index_of(entries)
+
+
+def _index_of(entries: List[Dict]) -> BillsIndex:
+    keys = [e["Date_iso"] for e in entries]
+    parsed: Dict[str, date] = {}
+    days = [parsed.get(k) or parsed.setdefault(k, date.fromisoformat(k)) for k in keys]
+    return BillsIndex(keys, days, entries)
+
+
+def merge_bills_index(index: BillsIndex, new_months: Dict[str, List[Dict]]) -> BillsIndex:
+    """Index including the entries of new_months (linear merge of two sorted runs)."""
+    new = build_bills_index(new_months)
+    return _index_of(list(heapq.merge(index.entries, new.entries, key=_entry_sort_key)))
+
+
+# Months structure of the cached bills frame, per process: (full_at, rows, months, faculty_list, index)
+_months_memo: Optional[Tuple[float, int, Dict[str, List[Dict]], List[str], BillsIndex]] = None
+_months_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _months_lock
+    _months_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_months_structure(df: 'pd.DataFrame') -> Tuple[Dict[str, List[Dict]], List[str]]:
+    """
+    build_months_structure for the cached bills frame, computed once per data version.
+
+    Frames from get_faculty_bills_data carry attrs['bills_sync']. While the
+    frame comes from the same full load, only rows added since the last call
+    are processed and folded in. The result is shared: treat it as read-only
+    (filter_and_assign_sl does).
+
+    Args:
+        df: DataFrame from get_faculty_bills_data
+
+    Returns:
+        Tuple of (months_dict, faculty_list)
+    """
+    _, _, months, faculty_list, _ = _memoized(df)
+    return months, faculty_list
+
+
+def get_bills_index(df: 'pd.DataFrame') -> BillsIndex:
+    """BillsIndex of the cached bills frame, maintained with get_months_structure.
+
+    Args:
+        df: DataFrame from get_faculty_bills_data
+
+    Returns:
+        BillsIndex (shared: treat entries as read-only)
+    """
+    return _memoized(df)[4]
+
+
+def _memoized(df: 'pd.DataFrame') -> Tuple[float, int, Dict[str, List[Dict]], List[str], BillsIndex]:
+    global _months_memo
+    sync = df.attrs.get('bills_sync')
+    if not sync:
+        months, faculty_list = build_months_structure(df.copy())
+        return 0.0, len(df), months, faculty_list, build_bills_index(months)
+
+    with _months_lock:
+        memo = _months_memo
+        if memo is not None and memo[0] == sync['full_at'] and memo[1] == len(df):
+            return memo
+        if memo is not None and memo[0] == sync['full_at'] and memo[1] < len(df):
+            new_months, new_faculty = build_months_structure(df.iloc[memo[1]:].copy())
+            months, faculty_list = merge_months_structure(memo[2], memo[3], new_months, new_faculty)
+            index = merge_bills_index(memo[4], new_months)
+        else:
+            months, faculty_list = build_months_structure(df.copy())
+            index = build_bills_index(months)
+        _months_memo = (sync['full_at'], len(df), months, faculty_list, index)
+        return _months_memo
+
+
 def filter_and_assign_sl(months: Dict[str, List[Dict]], selected_month: str, 
                           selected_faculty: str) -> List[Dict]:
     """
     Filter weeks by month and faculty, then assign sequential SL numbers.
+    Entries are copied, so months itself is left untouched.
     
     Args:
         months: Months structure from build_months_structure
@@ -315,20 +415,20 @@ def filter_and_assign_sl(months: Dict[str, List[Dict]], selected_month: str,
     first_day = datetime.strptime(selected_month, "%B %Y").date().replace(day=1)
     next_month = (first_day.replace(day=28) + timedelta(days=4)).replace(day=1)
     last_day = next_month - timedelta(days=1)
+    month_prefix = first_day.strftime("%Y-%m-")
 
     rendered_weeks = []
     for w in months[selected_month]:
-        # filter entries inside this month
+        # filter entries inside this month (ISO dates: a prefix match, no parsing)
         entries_in_month = []
         for e in w["entries"]:
-            e_date = datetime.strptime(e["Date_iso"], "%Y-%m-%d").date()
-            if not (first_day <= e_date <= last_day):
+            if not e["Date_iso"].startswith(month_prefix):
                 continue
             # filter by faculty if set
             if selected_faculty != "All":
                 if e.get("Faculty", "") != selected_faculty:
                     continue
-            entries_in_month.append(e)
+            entries_in_month.append(dict(e))
 
         if not entries_in_month:
             continue
@@ -361,3 +461,142 @@ def filter_and_assign_sl(months: Dict[str, List[Dict]], selected_month: str,
         e["SL No"] = idx
 
     return rendered_weeks
+
+
+def _academic_year_start(d: date) -> int:
+    return d.year if d.month >= ACADEMIC_YEAR_START_MONTH else d.year - 1
+
+
+def semester_of(d: date) -> Tuple[str, date, date]:
+    """Semester containing d, as (label, first day, last day), e.g. 'Odd Semester 2025-26'."""
+    year = _academic_year_start(d)
+    year_label = f"{year}-{(year + 1) % 100:02d}"
+    odd_start = date(year, ACADEMIC_YEAR_START_MONTH, 1)
+    even_month = ACADEMIC_YEAR_START_MONTH + 6
+    even_start = date(year + (even_month - 1) // 12, (even_month - 1) % 12 + 1, 1)
+    next_year = date(year + 1, ACADEMIC_YEAR_START_MONTH, 1)
+    if d < even_start:
+        return f"Odd Semester {year_label}", odd_start, even_start - timedelta(days=1)
+    return f"Even Semester {year_label}", even_start, next_year - timedelta(days=1)
+
+
+def period_presets(index: BillsIndex) -> List[Dict[str, Any]]:
+    """Academic years and their semesters covered by the bills, newest first.
+
+    Returns:
+        List of {"label", "start", "end"}
+    """
+    if not index.days:
+        return []
+    first, last = index.days[0], index.days[-1]
+    presets = []
+    for year in range(_academic_year_start(last), _academic_year_start(first) - 1, -1):
+        year_start = date(year, ACADEMIC_YEAR_START_MONTH, 1)
+        year_end = date(year + 1, ACADEMIC_YEAR_START_MONTH, 1) - timedelta(days=1)
+        presets.append({"label": f"Academic Year {year}-{(year + 1) % 100:02d}", "start": year_start, "end": year_end})
+        for day in (year_end, year_start):  # even semester, then odd
+            label, start, end = semester_of(day)
+            if start <= last and end >= first:
+                presets.append({"label": label, "start": start, "end": end})
+    return presets
+
+
+def query_bills_range(index: BillsIndex, start: date, end: date, selected_faculty: str = "All") -> Dict[str, Any]:
+    """Bills between start and end (inclusive): numbered weeks plus monthly, semester and faculty totals.
+
+    The range is found by bisecting the sorted index, so the cost depends on
+    the entries returned, not on the size of the sheet. Weeks have the same
+    shape as filter_and_assign_sl's (so the page and DOCX code accept them),
+    clipped to the range and numbered from 1; SL numbers run across the
+    whole range.
+
+    Args:
+        index: BillsIndex from get_bills_index
+        start: First day of the range
+        end: Last day of the range
+        selected_faculty: Faculty name to filter (or "All")
+
+    Returns:
+        Dict with "weeks", "months", "semesters" and "faculty" (lists of
+        {"label"/"faculty", "actual", "claiming", "classes"}; faculty rows
+        also carry per-month claiming hours in "by_month"), and the overall
+        "total_actual", "total_claiming" and "classes"
+    """
+    lo = bisect_left(index.keys, start.isoformat())
+    hi = bisect_right(index.keys, end.isoformat())
+
+    weeks: Dict[date, Dict[str, Any]] = {}
+    months: Dict[str, Dict[str, Any]] = {}
+    semesters: Dict[str, Dict[str, Any]] = {}
+    faculty: Dict[str, Dict[str, Any]] = {}
+    month_labels: Dict[str, str] = {}
+    semester_labels: Dict[str, str] = {}
+    sl = 0
+
+    for i in range(lo, hi):
+        src = index.entries[i]
+        if selected_faculty != "All" and src.get("Faculty", "") != selected_faculty:
+            continue
+        d = index.days[i]
+        sl += 1
+        e = dict(src)
+        e["SL No"] = sl
+        actual, claiming = e["Actual hours"], e["Claiming hours"]
+
+        week_start = d - timedelta(days=d.weekday())
+        w = weeks.get(week_start)
+        if w is None:
+            week_end = week_start + timedelta(days=5)
+            w = weeks[week_start] = {
+                "week_start": week_start,
+                "week_end": week_end,
+                "display_start": max(week_start, start),
+                "display_end": min(week_end, end),
+                "entries": [],
+                "week_total_actual": 0.0,
+                "week_total_claiming": 0.0,
+            }
+        w["entries"].append(e)
+        w["week_total_actual"] += actual
+        w["week_total_claiming"] += claiming
+
+        month_key = e["Date_iso"][:7]
+        month = month_labels.get(month_key) or month_labels.setdefault(month_key, d.strftime("%B %Y"))
+        semester = semester_labels.get(month_key) or semester_labels.setdefault(month_key, semester_of(d)[0])
+        name = e.get("Faculty", "") or "Unknown"
+        for totals, key in ((months, month), (semesters, semester)):
+            t = totals.setdefault(key, {"label": key, "actual": 0.0, "claiming": 0.0, "classes": 0})
+            t["actual"] += actual
+            t["claiming"] += claiming
+            t["classes"] += 1
+        f = faculty.setdefault(name, {"faculty": name, "actual": 0.0, "claiming": 0.0, "classes": 0, "by_month": {}})
+        f["actual"] += actual
+        f["claiming"] += claiming
+        f["classes"] += 1
+        f["by_month"][month] = f["by_month"].get(month, 0.0) + claiming
+
+    rendered_weeks = list(weeks.values())  # built in date order
+    for idx, w in enumerate(rendered_weeks, start=1):
+        w["week_number"] = idx
+        w["week_total_actual"] = round(w["week_total_actual"], 2)
+        w["week_total_claiming"] = round(w["week_total_claiming"], 2)
+
+    def rounded(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for r in rows:
+            r["actual"] = round(r["actual"], 2)
+            r["claiming"] = round(r["claiming"], 2)
+            if "by_month" in r:
+                r["by_month"] = {m: round(h, 2) for m, h in r["by_month"].items()}
+        return rows
+
+    return {
+        "start": start,
+        "end": end,
+        "weeks": rendered_weeks,
+        "months": rounded(list(months.values())),
+        "semesters": rounded(list(semesters.values())),
+        "faculty": rounded(sorted(faculty.values(), key=lambda f: f["faculty"])),
+        "total_actual": round(sum(m["actual"] for m in months.values()), 2),
+        "total_claiming": round(sum(m["claiming"] for m in months.values()), 2),
+        "classes": sl,
+    }
@@ -0,0 +1,281 @@
+"""Background jobs for long-running reports.
+
+Rendering a report in the request thread holds a gunicorn thread for the
+whole Apps Script fetch plus rendering, and can outlast the proxy timeout.
+Instead a page submits a job: it is recorded in a SQLite table shared by all
+workers and run on a small thread pool of the worker that accepted it. The
+job writes its progress back to the table, so whichever worker answers the
+page's status polls sees it, and the finished file is stored under
+DATA_DIR/job_artifacts and streamed from disk on download. Finished jobs and
+their files are removed after JOB_RETENTION seconds.
+
+Jobs live in the process that accepted them: if that worker exits (max
+requests, crash) its unfinished jobs are reported as failed.
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Callable, Dict, NamedTuple, Optional
+from utils import metrics, resilience, storage
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = 'jobs.sqlite3'
+
+# Where finished report files are kept (shared by all workers)
+ARTIFACT_DIR = os.path.join(storage.DATA_DIR, 'job_artifacts')
+
+# Report threads per worker process
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+
+# Jobs waiting or running per worker process before new ones are refused
+JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '20'))
+
+# Seconds a finished job (and its file) is kept for download
+JOB_RETENTION = int(os.getenv('JOB_RETENTION', '3600'))
+
+# Total seconds a job may spend waiting on upstreams (0 disables)
+JOB_UPSTREAM_BUDGET = float(os.getenv('JOB_UPSTREAM_BUDGET', '120'))
+
+# Minimum seconds between two progress writes of one job
+_PROGRESS_INTERVAL = 0.5
+
+# How often expired jobs are purged (seconds)
+_CLEANUP_INTERVAL = 60
+
+ACTIVE = ('queued', 'running')
+
+
+class Artifact(NamedTuple):
+    """File produced by a job handler."""
+    filename: str
+    mimetype: str
+    data: IO[bytes]  # positioned at the start
+
+
+class JobError(Exception):
+    """Expected failure of a job (no data, bad parameters); the message is shown to the user."""
+
+
+class JobRejected(Exception):
+    """Raised by submit() when this worker already has JOB_MAX_PENDING jobs."""
+
+
+# handler(params, progress) -> Artifact; progress(fraction, message) reports status
+Handler = Callable[[Dict[str, Any], Callable[[float, str], None]], Artifact]
+
+_handlers: Dict[str, Handler] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+_pending = 0
+_cleaned_at = 0.0
+
+
+def _reset_after_fork() -> None:
+    """Jobs and pool threads of the parent do not exist in a forked child."""
+    global _executor, _lock, _pending
+    _executor = None
+    _lock = threading.Lock()
+    _pending = 0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of the given kind."""
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS jobs ('
+    ' id TEXT PRIMARY KEY, kind TEXT NOT NULL, owner TEXT NOT NULL, params TEXT NOT NULL,'
+    ' status TEXT NOT NULL, progress REAL NOT NULL, message TEXT NOT NULL,'
+    ' pid INTEGER NOT NULL, created REAL NOT NULL, updated REAL NOT NULL,'
+    ' filename TEXT, mimetype TEXT, error TEXT)',
+)
+
+
+def _db() -> sqlite3.Connection:
+    return storage.connect(DB_FILE, _SCHEMA)
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, JOB_WORKERS), thread_name_prefix='report-job')
+        return _executor
+
+
+def _update(job_id: str, **fields) -> None:
+    fields['updated'] = time.time()
+    assignments = ', '.join(f"{name} = ?" for name in fields)
+    try:
+        _db().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+    except sqlite3.Error:
+        logger.warning(f"Could not update job {job_id}", exc_info=True)
+
+
+def submit(kind: str, params: Dict[str, Any], owner: str) -> str:
+    """Queue a job and return its id.
+
+    An identical job (same kind, parameters and owner) still queued or running
+    in this worker is reused instead of starting a second one.
+
+    Args:
+        kind: Registered handler name
+        params: JSON-serializable handler parameters
+        owner: Who may see the job and download its file (e.g. 'Faculty:karan')
+
+    Raises:
+        ValueError: unknown kind
+        JobRejected: this worker's queue is full
+    """
+    global _pending
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    _cleanup()
+
+    encoded = json.dumps(params, sort_keys=True)
+    conn = _db()
+    row = conn.execute(
+        "SELECT id FROM jobs WHERE kind = ? AND owner = ? AND params = ? AND pid = ?"
+        " AND status IN ('queued', 'running')", (kind, owner, encoded, os.getpid())).fetchone()
+    if row is not None:
+        return row[0]
+
+    with _lock:
+        if _pending >= JOB_MAX_PENDING:
+            metrics.inc('bca_jobs_total', kind=kind, result='rejected')
+            raise JobRejected(f"{_pending} reports are already being prepared")
+        _pending += 1
+
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    try:
+        conn.execute(
+            'INSERT INTO jobs (id, kind, owner, params, status, progress, message, pid, created, updated)'
+            " VALUES (?, ?, ?, ?, 'queued', 0, 'Waiting to start', ?, ?, ?)",
+            (job_id, kind, owner, encoded, os.getpid(), now, now))
+        _pool().submit(_run, job_id, kind, params, now)
+    except Exception:
+        with _lock:
+            _pending -= 1
+        raise
+    metrics.inc('bca_jobs_total', kind=kind, result='submitted')
+    return job_id
+
+
+def _run(job_id: str, kind: str, params: Dict[str, Any], submitted: float) -> None:
+    global _pending
+    started = time.perf_counter()
+    metrics.observe('bca_job_queue_seconds', time.time() - submitted, kind=kind)
+    _update(job_id, status='running', message='Starting')
+    last_write = [0.0]
+
+    def progress(fraction: float, message: str) -> None:
+        now = time.monotonic()
+        if now - last_write[0] >= _PROGRESS_INTERVAL:
+            last_write[0] = now
+            _update(job_id, progress=round(min(max(fraction, 0.0), 0.99), 3), message=message)
+
+    resilience.start_budget(JOB_UPSTREAM_BUDGET or None)
+    result = 'failed'
+    try:
+        artifact = _handlers[kind](params, progress)
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        with open(os.path.join(ARTIFACT_DIR, job_id), 'wb') as out:
+            shutil.copyfileobj(artifact.data, out)
+        _update(job_id, status='done', progress=1.0, message='Ready',
+                filename=artifact.filename, mimetype=artifact.mimetype)
+        result = 'done'
+    except JobError as e:
+        _update(job_id, status='failed', message='Failed', error=str(e))
+    except Exception:
+        logger.exception(f"Report job {job_id} ({kind}) failed")
+        _update(job_id, status='failed', message='Failed', error='Report generation failed')
+    finally:
+        resilience.start_budget(None)
+        with _lock:
+            _pending -= 1
+        metrics.inc('bca_jobs_total', kind=kind, result=result)
+        metrics.observe('bca_job_run_seconds', time.perf_counter() - started, kind=kind)
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get(job_id: str, owner: str) -> Optional[Dict[str, Any]]:
+    """Return the job's status, or None if it does not exist or belongs to someone else.
+
+    Returns:
+        Dict with id, kind, status ('queued', 'running', 'done', 'failed'),
+        progress (0-1), message, error, filename and mimetype
+    """
+    try:
+        row = _db().execute(
+            'SELECT id, kind, owner, status, progress, message, pid, filename, mimetype, error'
+            ' FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    except sqlite3.Error:
+        logger.warning(f"Could not read job {job_id}", exc_info=True)
+        return None
+    if row is None or row[2] != owner:
+        return None
+
+    job = dict(zip(('id', 'kind', 'owner', 'status', 'progress', 'message', 'pid', 'filename', 'mimetype', 'error'), row))
+    if job['status'] in ACTIVE and not _alive(job['pid']):
+        job.update(status='failed', message='Failed', error='Interrupted by a server restart, please try again')
+        _update(job_id, status='failed', message=job['message'], error=job['error'])
+    del job['pid'], job['owner']
+    return job
+
+
+def artifact_path(job: Dict[str, Any]) -> Optional[str]:
+    """Path of a finished job's file, or None if it is not (or no longer) available."""
+    if job.get('status') != 'done':
+        return None
+    path = os.path.join(ARTIFACT_DIR, job['id'])
+    return path if os.path.exists(path) else None
+
+
+def _cleanup() -> None:
+    """Delete jobs (and files) last updated more than JOB_RETENTION seconds ago."""
+    global _cleaned_at
+    now = time.time()
+    if now - _cleaned_at < _CLEANUP_INTERVAL:
+        return
+    _cleaned_at = now
+    try:
+        conn = _db()
+        expired = [r[0] for r in conn.execute('SELECT id FROM jobs WHERE updated < ?', (now - JOB_RETENTION,))]
+        for job_id in expired:
+            try:
+                os.remove(os.path.join(ARTIFACT_DIR, job_id))
+            except FileNotFoundError:
+                pass
+            conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+        if expired:
+            logger.info(f"Removed {len(expired)} expired report jobs")
+    except (sqlite3.Error, OSError):
+        logger.warning("Could not clean up expired report jobs", exc_info=True)
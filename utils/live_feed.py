@@ -0,0 +1,373 @@
+"""Live updates of the admissions and documents-tracking dashboards.
+
+Instead of every open dashboard reloading the whole page, each worker polls
+the shared dataset cache, diffs successive versions (new applicants, changed
+fields, removed rows) and pushes only the deltas to its open Server-Sent
+Events streams. Deltas are labelled with the cache versions they span, which
+are shared by all workers, so a browser reconnecting to another worker
+resumes where it left off. Polling goes through the cache, so one upstream
+refresh serves every viewer.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils import cache, schema
+from utils.admission_helpers import compute_admission_stats
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from flask import Response
+
+logger = logging.getLogger(__name__)
+
+# How often each worker checks the cache for a new version (seconds)
+LIVE_POLL = float(os.getenv('LIVE_POLL_INTERVAL', '5'))
+
+# Streams are closed after this long; browsers reconnect and resume (seconds)
+LIVE_STREAM_SECONDS = int(os.getenv('LIVE_STREAM_SECONDS', '300'))
+
+# Open streams per worker. Each one holds a gthread thread, so keep some free for pages
+LIVE_MAX_STREAMS = int(os.getenv('LIVE_MAX_STREAMS', str(max(1, int(os.getenv('GUNICORN_THREADS', '4')) // 2))))
+
+# Comment line sent when nothing happened, so proxies keep the connection open
+_HEARTBEAT = 15
+
+# Seconds a browser waits before retrying when the worker has no free stream slot
+_BUSY_RETRY = 30
+
+# Seconds between a browser's short polls on workers without spare threads
+_POLL_RETRY = max(LIVE_POLL, 10)
+
+# Deltas kept per dataset for reconnecting clients
+_HISTORY = 50
+
+# Documents are ticked as 'Y' in the tracking sheet
+_SUBMITTED = 'y'
+
+
+def diff_frames(old: 'pd.DataFrame', new: 'pd.DataFrame', key: str) -> Dict[str, Any]:
+    """Compare two versions of a dataset row by row.
+
+    Rows are matched on the key column (blank keys are ignored, the last of
+    duplicate keys wins) and cells are compared as stripped strings, so
+    dtype changes between versions are not reported as edits.
+
+    Args:
+        old: Previous version
+        new: Current version
+        key: Column identifying a row (e.g. 'Application', 'USN No')
+
+    Returns:
+        Dict with 'added' (records of new rows), 'changed' (key, record and
+        {column: [old, new]} per edited row) and 'removed' (keys)
+    """
+    import numpy as np
+
+    old_t, _ = _as_text(old, key)
+    new_t, new_pos = _as_text(new, key)
+
+    added = new_t.index.difference(old_t.index, sort=False)
+    removed = old_t.index.difference(new_t.index, sort=False)
+    common = new_t.index.intersection(old_t.index, sort=False)
+
+    columns = list(dict.fromkeys(list(new_t.columns) + list(old_t.columns)))
+    before = old_t.reindex(index=common, columns=columns, fill_value='').to_numpy()
+    after = new_t.reindex(index=common, columns=columns, fill_value='').to_numpy()
+    edited = before != after
+    rows = np.flatnonzero(edited.any(axis=1))
+
+    changed_keys = [common[i] for i in rows]
+    records = _records(new, new_pos, list(added) + changed_keys)
+    changed = []
+    for i, k in zip(rows, changed_keys):
+        cols = np.flatnonzero(edited[i])
+        changed.append({
+            'key': k,
+            'record': records[k],
+            'changes': {columns[c]: [before[i, c], after[i, c]] for c in cols},
+        })
+
+    return {
+        'added': [records[k] for k in added],
+        'changed': changed,
+        'removed': list(removed),
+    }
+
+
+def _as_text(df: 'pd.DataFrame', key: str) -> Tuple['pd.DataFrame', 'pd.Series']:
+    """df as stripped strings indexed by key, and the row position of each key."""
+    import pandas as pd
+
+    text = df.apply(_cell_text)
+    keys = text[key] if key in text.columns else pd.Series('', index=text.index)
+    pos = pd.Series(range(len(df)), index=keys.to_numpy())
+    keep = (keys != '').to_numpy() & ~keys.duplicated(keep='last').to_numpy()
+    return text[keep].set_axis(keys[keep].to_numpy(), axis=0), pos[keep]
+
+
+def _cell_text(series: 'pd.Series') -> 'pd.Series':
+    """Cells as stripped strings ('' for missing); whole floats print like ints."""
+    import pandas as pd
+
+    if pd.api.types.is_float_dtype(series.dtype):
+        return series.map(lambda v: '' if pd.isna(v) else (str(int(v)) if float(v).is_integer() else str(v)))
+    return series.astype(object).where(series.notna(), '').astype(str).str.strip()
+
+
+def _records(df: 'pd.DataFrame', pos: 'pd.Series', keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Records of the rows with the given keys, as rendered in the page (NaN -> '')."""
+    if not keys:
+        return {}
+    rows = df.iloc[pos.loc[keys].to_numpy()].fillna('').to_dict('records')
+    return dict(zip(keys, rows))
+
+
+def _admissions_summary(old: 'pd.DataFrame', new: 'pd.DataFrame', delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Seat category changes and the recomputed seat statistics."""
+    seat_col = schema.resolve('admissions', new.columns)['seat_category']
+    seat_changes = [{'key': c['key'], 'from': c['changes'][seat_col][0], 'to': c['changes'][seat_col][1]}
+                    for c in delta['changed'] if seat_col in c['changes']]
+    return {'seat_changes': seat_changes, 'stats': compute_admission_stats(new.copy())}
+
+
+def _documents_summary(old: 'pd.DataFrame', new: 'pd.DataFrame', delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Documents ticked as submitted since the previous version."""
+    submitted = []
+    for c in delta['changed']:
+        for col, (was, now) in c['changes'].items():
+            if now.lower() == _SUBMITTED and was.lower() != _SUBMITTED:
+                submitted.append({'key': c['key'], 'document': col})
+    return {'submitted': submitted}
+
+
+class _FeedSpec(NamedTuple):
+    getter: Callable[[], Any]
+    dataset: str            # schema of the dataset
+    key_field: str          # logical field identifying a row
+    summarize: Callable[['pd.DataFrame', 'pd.DataFrame', Dict[str, Any]], Dict[str, Any]]
+
+
+def _specs() -> Dict[str, _FeedSpec]:
+    from utils.data_fetcher import get_admission_data, get_documents_tracking_data
+    return {
+        'admissions': _FeedSpec(get_admission_data, 'admissions', 'application', _admissions_summary),
+        'documents_tracking': _FeedSpec(get_documents_tracking_data, 'documents_tracking', 'usn',
+                                        _documents_summary),
+    }
+
+
+FEEDS = ('admissions', 'documents_tracking')
+
+
+class _Delta(NamedTuple):
+    since: int      # cache version the delta starts from
+    version: int    # cache version it leads to
+    data: str       # JSON payload ('' when the refresh changed nothing)
+
+
+class _Feed:
+    """Deltas of one dataset observed by this process."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cond = threading.Condition()
+        self.deltas: Deque[_Delta] = deque(maxlen=_HISTORY)
+        self.version = 0
+        self.frame = None
+        self.wanted_until = 0.0
+
+    def update(self, spec: _FeedSpec) -> None:
+        """Diff the dataset against the last version seen and publish the delta."""
+        spec.getter()  # refreshes the shared copy when its TTL has passed
+        version, frame = cache.snapshot(self.name)
+        if frame is None or version == self.version:
+            return
+        if self.frame is not None:
+            key = schema.resolve(spec.dataset, frame.columns)[spec.key_field]
+            delta = diff_frames(self.frame, frame, key)
+            if delta['added'] or delta['changed'] or delta['removed']:
+                delta.update(spec.summarize(self.frame, frame, delta))
+                delta.update({'dataset': self.name, 'since': self.version, 'version': version})
+                with self.cond:
+                    self.deltas.append(_Delta(self.version, version, json.dumps(delta, default=str)))
+                logger.info(f"Live {self.name} v{self.version}->v{version}: {len(delta['added'])} added, "
+                            f"{len(delta['changed'])} changed, {len(delta['removed'])} removed")
+            else:
+                # Every TTL refresh is a new version: record that nothing changed so
+                # clients at an older version are not told to reload
+                with self.cond:
+                    last = self.deltas[-1] if self.deltas else None
+                    if last is not None and not last.data and last.version == self.version:
+                        self.deltas[-1] = _Delta(last.since, version, '')
+                    else:
+                        self.deltas.append(_Delta(self.version, version, ''))
+        with self.cond:
+            self.version, self.frame = version, frame
+            self.cond.notify_all()
+
+    def after(self, since: int) -> Optional[List[_Delta]]:
+        """Deltas bringing a client at version since up to date (None if it must reload)."""
+        if since >= self.version:
+            return []
+        pending = [d for d in self.deltas if d.version > since]
+        if not pending or pending[0].since > since:
+            # The client's version predates what this worker has seen: no delta covers it
+            return None if self.frame is not None else []
+        return pending
+
+
+_feeds: Dict[str, _Feed] = {name: _Feed(name) for name in FEEDS}
+_poller: Optional[threading.Thread] = None
+_poller_lock = threading.Lock()
+_streams = threading.BoundedSemaphore(LIVE_MAX_STREAMS)
+_short_polls = False
+
+
+def use_short_polls(enabled: bool = True) -> None:
+    """Answer streams with the pending deltas and close them at once.
+
+    For single-threaded (sync) gunicorn workers: a held stream would block
+    every other request of the worker and outlast its timeout, so browsers
+    poll instead (EventSource reconnects every _POLL_RETRY seconds and
+    resumes from Last-Event-ID).
+    """
+    global _short_polls
+    _short_polls = enabled
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's poller, feeds and stream slots in a forked worker."""
+    global _poller, _poller_lock, _streams
+    _feeds.clear()
+    _feeds.update({name: _Feed(name) for name in FEEDS})
+    _poller = None
+    _poller_lock = threading.Lock()
+    _streams = threading.BoundedSemaphore(LIVE_MAX_STREAMS)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _poll_loop() -> None:
+    specs = _specs()
+    while True:
+        now = time.time()
+        for feed in list(_feeds.values()):
+            if feed.wanted_until < now:
+                continue
+            try:
+                feed.update(specs[feed.name])
+            except Exception:
+                logger.exception(f"Live feed update failed for {feed.name}")
+        time.sleep(LIVE_POLL)
+
+
+def _ensure_poller() -> None:
+    global _poller
+    with _poller_lock:
+        if _poller is None or not _poller.is_alive():
+            _poller = threading.Thread(target=_poll_loop, name='live-feed', daemon=True)
+            _poller.start()
+
+
+def current_version(name: str) -> int:
+    """Cache version a page rendered now should announce to its live stream.
+
+    Read before fetching the page data: if a refresh lands in between, the
+    client merely receives a delta it already shows (deltas are idempotent).
+    """
+    return cache.snapshot(name)[0]
+
+
+def _event(event: str, data: str, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ''
+    return f"{head}event: {event}\ndata: {data}\n\n"
+
+
+def event_stream(name: str, since: int) -> Iterator[str]:
+    """Server-Sent Events stream of the deltas of dataset name after version since.
+
+    Sends a 'delta' event per new version (its id is the version, so
+    EventSource reconnects resume through Last-Event-ID), a 'reload' event
+    when the client is too far behind to catch up, and heartbeats
+    meanwhile. The stream ends after LIVE_STREAM_SECONDS and the browser
+    reconnects. When all LIVE_MAX_STREAMS slots of this worker are taken, a
+    'busy' event asks the browser to retry later. With use_short_polls the
+    pending deltas are sent and the stream ends at once.
+
+    Args:
+        name: One of FEEDS
+        since: Cache version the client currently shows
+
+    Returns:
+        Iterator of SSE messages
+    """
+    feed = _feeds[name]
+
+    if _short_polls:
+        feed.wanted_until = max(feed.wanted_until, time.time() + _POLL_RETRY + LIVE_POLL * 2)
+        _ensure_poller()
+        yield f"retry: {int(_POLL_RETRY * 1000)}\n\n"
+        with feed.cond:
+            pending = feed.after(since)
+        if pending is None:
+            yield _event('reload', json.dumps({'dataset': name, 'version': feed.version}))
+            return
+        for delta in pending:
+            if delta.data:
+                yield _event('delta', delta.data, delta.version)
+        return
+
+    if not _streams.acquire(blocking=False):
+        yield f"retry: {_BUSY_RETRY * 1000}\n\n"
+        yield _event('busy', json.dumps({'dataset': name}))
+        return
+
+    try:
+        _ensure_poller()
+        yield f"retry: {int(LIVE_POLL * 1000)}\n\n"
+        deadline = time.monotonic() + LIVE_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            # Keep the poller on this dataset while someone listens
+            feed.wanted_until = max(feed.wanted_until, time.time() + _HEARTBEAT + LIVE_POLL * 2)
+            with feed.cond:
+                pending = feed.after(since)
+                if pending == []:
+                    feed.cond.wait(timeout=min(_HEARTBEAT, max(0.0, deadline - time.monotonic())))
+                    pending = feed.after(since)
+            if pending is None:
+                yield _event('reload', json.dumps({'dataset': name, 'version': feed.version}))
+                return
+            if not pending:
+                yield ': keepalive\n\n'
+                continue
+            for delta in pending:
+                if delta.data:
+                    yield _event('delta', delta.data, delta.version)
+                since = delta.version
+    finally:
+        _streams.release()
+
+
+def sse_response(name: str) -> 'Response':
+    """Flask response streaming event_stream(name) to the current request.
+
+    The starting version is the Last-Event-ID header of a reconnecting
+    EventSource, else the ?since= version the page was rendered with.
+    """
+    from flask import Response, request
+
+    raw = request.headers.get('Last-Event-ID') or request.args.get('since', '0')
+    try:
+        since = int(raw)
+    except ValueError:
+        since = 0
+    return Response(event_stream(name, since), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,131 @@
+"""Rate limits for the login forms.
+
+Every login POST takes a token from its client IP's bucket and from the
+bucket of the account it names (username, USN or parent phone/email), so
+neither a script hammering a form nor repeated guesses at one account turn
+into unbounded work. IP buckets are kept per worker process, like the
+hedging rate limit; account buckets are kept in the shared storage, so an
+account gets LOGIN_RATE_PER_ACCOUNT attempts per minute whichever workers
+answer them.
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import logging
+from flask import request
+from utils import metrics, resilience, storage
+
+logger = logging.getLogger(__name__)
+
+# Login attempts per minute (and burst) allowed from one client IP
+IP_RATE = float(os.getenv('LOGIN_RATE_PER_IP', '60'))
+IP_BURST = float(os.getenv('LOGIN_BURST_PER_IP', '30'))
+
+# Login attempts per minute (and burst) allowed for one account
+ACCOUNT_RATE = float(os.getenv('LOGIN_RATE_PER_ACCOUNT', '5'))
+ACCOUNT_BURST = float(os.getenv('LOGIN_BURST_PER_ACCOUNT', '5'))
+
+# Header carrying the client address when behind a reverse proxy (e.g. X-Real-IP)
+CLIENT_IP_HEADER = os.getenv('LOGIN_CLIENT_IP_HEADER', '')
+
+# Trusted proxies appending to that header: the client address is the entry
+# this many places from the end (entries before it are whatever the client sent)
+PROXY_HOPS = max(1, int(os.getenv('LOGIN_PROXY_HOPS', '1')))
+
+DB_FILE = 'login_throttle.sqlite3'
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS account_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)',
+)
+
+# How often buckets that have refilled completely are purged (seconds)
+_CLEANUP_INTERVAL = 60
+
+THROTTLED_MESSAGE = 'Too many login attempts. Please wait a minute and try again.'
+
+_by_ip = resilience.KeyedTokenBuckets(IP_RATE / 60, IP_BURST)
+# Used only while the shared storage is unavailable
+_by_account = resilience.KeyedTokenBuckets(ACCOUNT_RATE / 60, ACCOUNT_BURST)
+_cleaned_at = 0.0
+
+
+def _reset_after_fork() -> None:
+    global _by_ip, _by_account
+    _by_ip = resilience.KeyedTokenBuckets(IP_RATE / 60, IP_BURST)
+    _by_account = resilience.KeyedTokenBuckets(ACCOUNT_RATE / 60, ACCOUNT_BURST)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def client_ip() -> str:
+    """Address of the client of the current request."""
+    if CLIENT_IP_HEADER:
+        entries = [e.strip() for e in request.headers.get(CLIENT_IP_HEADER, '').split(',')]
+        if len(entries) >= PROXY_HOPS and entries[-PROXY_HOPS]:
+            return entries[-PROXY_HOPS]
+    return request.remote_addr or 'unknown'
+
+
+def _take_account_token(account: str) -> bool:
+    """Take a token from the account's bucket in the shared storage."""
+    key = hashlib.blake2b(account.encode(), digest_size=16).hexdigest()
+    rate = ACCOUNT_RATE / 60
+    now = time.time()
+    try:
+        conn = storage.connect(DB_FILE, _SCHEMA)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM account_buckets WHERE key = ?', (key,)).fetchone()
+            tokens = ACCOUNT_BURST if row is None else min(ACCOUNT_BURST, row[0] + (now - row[1]) * rate)
+            allowed = tokens >= 1
+            conn.execute('INSERT OR REPLACE INTO account_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens - 1 if allowed else tokens, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    except (sqlite3.Error, OSError):
+        logger.warning("Shared login limits unavailable, limiting accounts per worker", exc_info=True)
+        return _by_account.try_acquire(account)
+    _cleanup(conn, now, rate)
+    return allowed
+
+
+def _cleanup(conn: sqlite3.Connection, now: float, rate: float) -> None:
+    """Drop buckets idle long enough to be full again (the same as no row)."""
+    global _cleaned_at
+    if now - _cleaned_at < _CLEANUP_INTERVAL or rate <= 0:
+        return
+    _cleaned_at = now
+    try:
+        conn.execute('DELETE FROM account_buckets WHERE updated < ?', (now - ACCOUNT_BURST / rate,))
+    except sqlite3.Error:
+        logger.warning("Could not purge login rate limit buckets", exc_info=True)
+
+
+def allow(role: str, account: str) -> bool:
+    """Take a login attempt from the current client's and the account's budgets.
+
+    Args:
+        role: Login form ('student', 'admin', ...)
+        account: Identifier typed into the form (case-insensitive)
+
+    Returns:
+        False if the attempt must be refused without checking the credentials
+    """
+    ip = client_ip()
+    if not _by_ip.try_acquire(ip):
+        metrics.inc('bca_login_throttled_total', role=role, scope='ip')
+        logger.warning(f"Throttled {role} login attempts from {ip}")
+        return False
+
+    account = account.strip().upper()
+    if account and not _take_account_token(f"{role}:{account}"):
+        metrics.inc('bca_login_throttled_total', role=role, scope='account')
+        logger.warning(f"Throttled {role} login attempts for {account} (from {ip})")
+        return False
+    return True
@@ -0,0 +1,186 @@
+"""Internal assessment marks, indexed by USN.
+
+The marks sheet has one row per student and subject and one column per
+assessment component ('IA 1', 'IA 2', 'Assignment (10)', ...; the maximum
+is read from the header, MARKS_COMPONENT_MAX otherwise). Once per version of
+the cached sheet, totals, percentages and grades of the whole class are
+computed with column operations and the rows are grouped into a USN ->
+marks dict. On results day every student's marks page is then a dict
+lookup, and the sheet is fetched once per refresh interval however many
+students (and parents) are checking.
+"""
+
+import os
+import re
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+from utils import academics, schema
+from utils.data_fetcher import get_marks_snapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Maximum marks of a component whose header does not state it (e.g. 'IA 1' vs 'Assignment (10)')
+COMPONENT_MAX = float(os.getenv('MARKS_COMPONENT_MAX', '20'))
+
+# Lowest percentage of each grade, best first (the same bands as the marks page used)
+GRADES = (('A+', 90), ('A', 80), ('B+', 70), ('B', 60), ('C', 50), ('D', 0))
+
+# Assessment component columns: 'IA 1', 'IA-2', 'CIA3', 'Test 1', 'Assignment (10)', 'Quiz [5]'
+_COMPONENT = re.compile(r'^\s*(ia|cia|internal|test|assignment|quiz|seminar)(?![a-z])', re.IGNORECASE)
+_NOT_COMPONENT = re.compile(r'total|%|percent|grade|average', re.IGNORECASE)
+_MAX_IN_HEADER = re.compile(r'[(\[]\s*(?:max\.?\s*)?(\d+(?:\.\d+)?)\s*[)\]]', re.IGNORECASE)
+
+
+class Component(NamedTuple):
+    column: str
+    label: str  # header without the maximum, e.g. 'Assignment'
+    max: float
+
+
+class MarksStore(NamedTuple):
+    version: int
+    components: List[Component]
+    students: Dict[str, Dict[str, Any]]  # normalized USN -> marks (see student_marks)
+
+
+_store: Optional[MarksStore] = None
+_build_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _build_lock
+    _build_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def components(columns) -> List[Component]:
+    """Assessment component columns of a marks sheet header, in sheet order."""
+    found = []
+    for col in columns:
+        name = str(col)
+        if not _COMPONENT.match(name) or _NOT_COMPONENT.search(name):
+            continue
+        stated = _MAX_IN_HEADER.search(name)
+        label = _MAX_IN_HEADER.sub('', name).strip() if stated else name.strip()
+        found.append(Component(col, label, float(stated.group(1)) if stated else COMPONENT_MAX))
+    return found
+
+
+def _number(value: float) -> Any:
+    """18.0 -> 18, 17.5 -> 17.5 (for display)."""
+    return int(value) if float(value).is_integer() else round(float(value), 2)
+
+
+def _grades(pct: 'pd.Series') -> 'pd.Series':
+    import numpy as np
+    import pandas as pd
+
+    labels = np.select([pct >= low for _, low in GRADES], [g for g, _ in GRADES], default='')
+    return pd.Series(labels, index=pct.index).where(pct.notna(), '')
+
+
+def _build(version: int, df: 'pd.DataFrame') -> MarksStore:
+    import numpy as np
+    import pandas as pd
+
+    columns = schema.apply(df, 'marks')
+    usn_col, subject_col, sem_col = columns['usn'], columns['subject'], columns['semester']
+    parts = components(df.columns)
+    if usn_col is None or subject_col is None:
+        logger.error("USN or subject column not found in marks data")
+        return MarksStore(version, parts, {})
+    if not parts:
+        logger.warning("No assessment component columns (IA 1, IA 2, ...) found in marks data")
+
+    rows = pd.DataFrame({
+        'usn': df[usn_col].astype(str).str.strip().str.upper(),
+        'subject': df[subject_col].astype(str).str.strip(),
+        'semester': df[sem_col].astype(str).str.strip() if sem_col else '',
+    }, index=df.index)
+    rows = rows[(rows['usn'] != '') & (rows['usn'] != 'NAN')]
+    raw = df.loc[rows.index, [p.column for p in parts]].astype(object)
+    scores = raw.apply(pd.to_numeric, errors='coerce')
+
+    # A component counts once it is entered for anyone taking the subject; a
+    # blank or 'AB' for one student is then 0, while a component no one has
+    # taken yet does not count towards the maximum
+    conducted = scores.notna().groupby([rows['semester'], rows['subject']]).transform('any')
+    maxima = np.array([p.max for p in parts], dtype=float)
+    rows['max'] = conducted.to_numpy(dtype=float) @ maxima if parts else 0.0
+    rows['total'] = scores.fillna(0).to_numpy(dtype=float).sum(axis=1) if parts else 0.0
+    rows['percentage'] = (100.0 * rows['total'] / rows['max']).where(rows['max'] > 0).round(2)
+    rows['grade'] = _grades(rows['percentage'])
+
+    overall = rows.groupby('usn', sort=False)[['total', 'max']].sum()
+    overall['percentage'] = (100.0 * overall['total'] / overall['max']).where(overall['max'] > 0).round(2)
+    overall['grade'] = _grades(overall['percentage'])
+
+    students: Dict[str, Dict[str, Any]] = {
+        usn: {'total_marks': _number(r.total), 'max_marks': _number(r.max),
+              'percentage': None if r.percentage != r.percentage else float(r.percentage),
+              'grade': r.grade, 'subjects': []}
+        for usn, r in zip(overall.index, overall.itertuples(index=False))
+    }
+
+    shown = raw.where(raw.notna(), '').astype(str).apply(lambda col: col.str.strip())
+    order = rows.sort_values(['usn', 'semester', 'subject'], kind='stable').index
+    for r, cells, values in zip(rows.loc[order].itertuples(index=False),
+                                shown.loc[order].itertuples(index=False, name=None),
+                                scores.loc[order].itertuples(index=False, name=None)):
+        students[r.usn]['subjects'].append({
+            'subject': r.subject,
+            'semester': r.semester,
+            'name': academics.subject_name(r.semester, r.subject),
+            # Numbers as numbers, other entries (AB, blank) as typed
+            'marks': [cell if value != value else _number(value) for cell, value in zip(cells, values)],
+            'total': _number(r.total),
+            'max': _number(r.max),
+            'percentage': None if r.percentage != r.percentage else float(r.percentage),
+            'grade': r.grade,
+        })
+
+    logger.info(f"Marks store v{version}: {len(students)} students, {len(rows)} subject rows, "
+                f"components {', '.join(p.label for p in parts) or 'none'}")
+    return MarksStore(version, parts, students)
+
+
+def get_store() -> Optional[MarksStore]:
+    """Return the store of the current marks sheet (built once per cached version)."""
+    global _store
+    version, df = get_marks_snapshot()
+    if df is None:
+        return None
+    store = _store
+    if store is not None and store.version == version:
+        return store
+    with _build_lock:
+        if _store is None or _store.version != version:
+            _store = _build(version, df)
+        return _store
+
+
+def student_marks(usn: str) -> Tuple[Optional[Dict[str, Any]], List[Component]]:
+    """Marks of one student.
+
+    Args:
+        usn: University Seat Number (case and surrounding spaces ignored)
+
+    Returns:
+        (marks, components of the sheet); marks is a dict with 'total_marks',
+        'max_marks', 'percentage' (None until a component is conducted),
+        'grade' and 'subjects' (each with 'subject', 'semester', 'name',
+        'marks' in component order, 'total', 'max', 'percentage' and
+        'grade'), or None if the student has no marks or marks are
+        unavailable. Shared by all requests: do not modify.
+    """
+    store = get_store()
+    if store is None:
+        return None, []
+    return store.students.get(usn.strip().upper()), store.components
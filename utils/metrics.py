@@ -0,0 +1,342 @@
+"""In-process metrics (counters, gauges and latency histograms) exposed in Prometheus format.
+
+Each worker process records into its own registry and periodically publishes a
+snapshot to the shared storage directory; the /metrics endpoint sums the
+snapshots of all live workers so a scrape sees the whole deployment, whichever
+worker answers it. Gauges describe per-worker state (e.g. the size of a cached
+dataset), so the largest value across workers is reported instead of the sum.
+
+Workers are recycled (max_requests), so the counters and histograms of a
+worker that stopped publishing are folded into a "retired" total before its
+snapshot is dropped: exported counters never go down, and Prometheus does not
+see a reset.
+"""
+
+import os
+import hmac
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+from utils import storage
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = 'metrics.sqlite3'
+
+# Latency buckets in seconds (Apps Script calls range from ~100 ms to 15 s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+# How often a worker publishes its snapshot, and when a silent worker is dropped
+PUBLISH_INTERVAL = 5
+SNAPSHOT_MAX_AGE = 900
+
+METRICS = {
+    'bca_http_request_duration_seconds': ('histogram', 'Request latency by endpoint'),
+    'bca_upstream_request_duration_seconds': ('histogram', 'Upstream (Apps Script, GitHub, Telegram) call latency'),
+    'bca_upstream_response_bytes_total': ('counter', 'Bytes received from upstreams'),
+    'bca_upstream_errors_total': ('counter', 'Failed upstream calls'),
+    'bca_upstream_short_circuits_total': ('counter', 'Upstream calls skipped (circuit open or latency budget spent)'),
+    'bca_upstream_hedges_total': ('counter', 'Hedged upstream requests by result (sent, won, throttled)'),
+    'bca_cache_requests_total': ('counter', 'Dataset cache lookups by result (hit, shared_hit, stale) and refreshes (refresh)'),
+    'bca_dataframe_build_seconds': ('histogram', 'Time to build a DataFrame from an upstream payload'),
+    'bca_dataset_memory_bytes': ('gauge', 'In-memory size of a cached dataset after compaction (largest worker)'),
+    'bca_exports_total': ('counter', 'CSV/XLSX exports by format'),
+    'bca_export_rows_total': ('counter', 'Rows written to exports by format'),
+    'bca_export_render_seconds': ('histogram', 'Time to write an XLSX export'),
+    'bca_jobs_total': ('counter', 'Report jobs by kind and result (submitted, rejected, done, failed)'),
+    'bca_job_queue_seconds': ('histogram', 'Time report jobs wait for a worker thread'),
+    'bca_job_run_seconds': ('histogram', 'Report job run time'),
+    'bca_student_lookups_total': ('counter', 'Login lookups in the student directory by key (usn, parent) and result (found, unknown, negative_cached, unavailable)'),
+    'bca_login_throttled_total': ('counter', 'Login attempts refused by the rate limits, by form and scope (ip, account)'),
+    'bca_telegram_updates_total': ('counter', 'Telegram webhook updates by result (accepted, duplicate, inline)'),
+    'bca_telegram_queue_seconds': ('histogram', 'Time Telegram updates wait for their chat lane'),
+    'bca_notice_messages_total': ('counter', 'Notice broadcast messages by result (sent, throttled, blocked, failed)'),
+    'bca_notice_broadcast_seconds': ('histogram', 'Duration of a notice broadcast round'),
+    'bca_notice_subscribers': ('gauge', 'Chats subscribed to notice broadcasts'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Labels], float] = {}
+_gauges: Dict[Tuple[str, Labels], float] = {}
+_histograms: Dict[Tuple[str, Labels], List] = {}
+_last_publish = 0.0
+_published = None  # snapshot last written to the shared store
+
+# Identifies this process's snapshot (a recycled worker's pid may be reused)
+_worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _reset_after_fork() -> None:
+    """Start a forked worker with an empty registry and a fresh lock."""
+    global _lock, _last_publish, _worker_id, _published
+    _published = None
+    _worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    _lock = threading.Lock()
+    _counters.clear()
+    _gauges.clear()
+    _histograms.clear()
+    _last_publish = 0.0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    """Increment a counter.
+
+    Args:
+        name: Metric name (see METRICS)
+        amount: Value to add
+        labels: Label values
+    """
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Set a gauge to value.
+
+    Args:
+        name: Metric name (see METRICS)
+        value: Current value
+        labels: Label values
+    """
+    with _lock:
+        _gauges[(name, _labels(labels))] = value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record one observation in a histogram.
+
+    Args:
+        name: Metric name (see METRICS)
+        value: Observed value (seconds for latencies)
+        labels: Label values
+    """
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [[0] * len(DEFAULT_BUCKETS), 0.0, 0]
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if value <= bound:
+                hist[0][i] += 1
+        hist[1] += value
+        hist[2] += 1
+
+
+@contextmanager
+def timed(name: str, **labels) -> Iterator[None]:
+    """Context manager observing the duration of its block in a histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def _snapshot() -> Dict:
+    with _lock:
+        return {
+            'counters': [[name, list(labels), value] for (name, labels), value in _counters.items()],
+            'gauges': [[name, list(labels), value] for (name, labels), value in _gauges.items()],
+            'histograms': [[name, list(labels), list(h[0]), h[1], h[2]] for (name, labels), h in _histograms.items()],
+        }
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS worker_snapshots (worker TEXT PRIMARY KEY, updated REAL NOT NULL, payload TEXT NOT NULL)',
+    # Counters and histograms of workers that are gone (a single row)
+    'CREATE TABLE IF NOT EXISTS retired (id INTEGER PRIMARY KEY CHECK (id = 1), payload TEXT NOT NULL)',
+)
+
+
+def _db() -> sqlite3.Connection:
+    return storage.connect(DB_FILE, _SCHEMA)
+
+
+def publish(force: bool = False) -> None:
+    """Publish this process's snapshot to the shared store (rate limited)."""
+    global _last_publish, _published
+    now = time.time()
+    if not force and now - _last_publish < PUBLISH_INTERVAL:
+        return
+    _last_publish = now
+    try:
+        conn = _db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if _published is not None and conn.execute('SELECT 1 FROM worker_snapshots WHERE worker = ?',
+                                                        (_worker_id,)).fetchone() is None:
+                # Idle for SNAPSHOT_MAX_AGE: what we published was retired, only publish what came since
+                _forget(_published)
+            snap = _snapshot()
+            conn.execute('INSERT OR REPLACE INTO worker_snapshots (worker, updated, payload) VALUES (?, ?, ?)',
+                         (_worker_id, now, json.dumps(snap)))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        _published = snap
+    except (sqlite3.Error, OSError):
+        logger.warning("Could not publish metrics snapshot", exc_info=True)
+
+
+def _forget(snap: Dict) -> None:
+    """Subtract a published snapshot's counters and histograms from the registry."""
+    with _lock:
+        for name, labels, value in snap['counters']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            _counters[key] = _counters.get(key, 0) - value
+        for name, labels, buckets, total, count in snap['histograms']:
+            hist = _histograms.get((name, tuple(tuple(pair) for pair in labels)))
+            if hist is not None:
+                hist[0] = [a - b for a, b in zip(hist[0], buckets)]
+                hist[1] -= total
+                hist[2] -= count
+
+
+def _merge(snapshots: List[Dict]) -> Tuple[Dict, Dict, Dict]:
+    """Sum counters and histograms of snapshots (gauges: largest value)."""
+    counters: Dict[Tuple[str, Labels], float] = {}
+    gauges: Dict[Tuple[str, Labels], float] = {}
+    histograms: Dict[Tuple[str, Labels], List] = {}
+    for snap in snapshots:
+        for name, labels, value in snap['counters']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, value in snap.get('gauges', []):
+            key = (name, tuple(tuple(pair) for pair in labels))
+            gauges[key] = max(gauges.get(key, value), value)
+        for name, labels, buckets, total, count in snap['histograms']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            agg = histograms.setdefault(key, [[0] * len(DEFAULT_BUCKETS), 0.0, 0])
+            agg[0] = [a + b for a, b in zip(agg[0], buckets)]
+            agg[1] += total
+            agg[2] += count
+    return counters, gauges, histograms
+
+
+def _retire_stale(conn: sqlite3.Connection) -> None:
+    """Fold the snapshots of workers silent for SNAPSHOT_MAX_AGE into the retired row."""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        stale = conn.execute('SELECT worker, payload FROM worker_snapshots WHERE updated < ?',
+                             (time.time() - SNAPSHOT_MAX_AGE,)).fetchall()
+        if stale:
+            row = conn.execute('SELECT payload FROM retired WHERE id = 1').fetchone()
+            folded = [json.loads(payload) for _, payload in stale]
+            if row is not None:
+                folded.append(json.loads(row[0]))
+            counters, _, histograms = _merge(folded)
+            retired = {
+                'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+                'histograms': [[name, list(labels), h[0], h[1], h[2]] for (name, labels), h in histograms.items()],
+            }
+            conn.execute('INSERT OR REPLACE INTO retired (id, payload) VALUES (1, ?)', (json.dumps(retired),))
+            conn.executemany('DELETE FROM worker_snapshots WHERE worker = ?', [(w,) for w, _ in stale])
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def _collect() -> Tuple[Dict, Dict, Dict]:
+    """Sum the snapshots of all live workers and of retired ones (falls back to this process only)."""
+    publish(force=True)
+    snapshots = []
+    try:
+        conn = _db()
+        _retire_stale(conn)
+        snapshots = [json.loads(row[0]) for row in conn.execute('SELECT payload FROM worker_snapshots')]
+        row = conn.execute('SELECT payload FROM retired WHERE id = 1').fetchone()
+        if row is not None:
+            snapshots.append(json.loads(row[0]))
+    except (sqlite3.Error, OSError, ValueError):
+        logger.warning("Could not read metrics snapshots", exc_info=True)
+        snapshots = []
+    if not snapshots:
+        snapshots = [_snapshot()]
+    return _merge(snapshots)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def render() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    counters, gauges, histograms = _collect()
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind in ('counter', 'gauge'):
+            values = counters if kind == 'counter' else gauges
+            for (n, labels), value in sorted(values.items()):
+                if n == name:
+                    lines.append(f'{name}{_format_labels(labels)} {value:g}')
+        else:
+            for (n, labels), (buckets, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, bucket_count in zip(DEFAULT_BUCKETS, buckets):
+                    lines.append(f'{name}_bucket{_format_labels(labels, (("le", f"{bound:g}"),))} {bucket_count}')
+                lines.append(f'{name}_bucket{_format_labels(labels, (("le", "+Inf"),))} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total:.6f}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app) -> None:
+    """Time every request and expose /metrics on a Flask app.
+
+    /metrics is served to a logged-in admin, or to a scraper sending
+    ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+    from flask import Response, g, request, session
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = getattr(g, '_metrics_start', None)
+        if start is not None:
+            observe('bca_http_request_duration_seconds', time.perf_counter() - start,
+                    endpoint=request.endpoint or 'unmatched', method=request.method,
+                    status=response.status_code)
+            publish()
+        return response
+
+    def metrics_endpoint():
+        token = os.getenv('METRICS_TOKEN')
+        auth = request.headers.get('Authorization', '')
+        authorized = session.get('role') == 'Admin' or (
+            bool(token) and hmac.compare_digest(auth, f'Bearer {token}'))
+        if not authorized:
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
@@ -0,0 +1,371 @@
+"""Broadcast of department notices to subscribed Telegram chats.
+
+Chats opt in with /subscribe (and out with /unsubscribe); subscribers are
+kept in the bot's shared SQLite storage. Every worker runs a checker thread,
+but only the holder of the broadcast lease compares the updates feed
+(get_updates, so the cached copy) with the notices it has seen and sends new
+ones, so each notice goes out once per deployment:
+
+- the new notices of a round are sent as one message per chat by parallel
+  senders; a token bucket keeps the whole deployment under Telegram's
+  global limit (NOTICE_BROADCAST_RATE messages per second, ~30 allowed) and
+  a bucket per chat under the per-chat limit;
+- a 429 answer pauses every sender for the retry_after Telegram asks for,
+  then the chat is retried, so a burst does not turn into a 429 storm;
+- chats that blocked the bot or no longer exist are unsubscribed;
+- every delivery is recorded as soon as it is made, so a round
+  interrupted by a restart or by failed sends is resumed without messaging
+  anyone twice;
+- the lease is renewed by a timer while a round runs; if it cannot be
+  renewed (another worker took over) the round stops at once.
+
+Notices already in the feed when broadcasting first runs are recorded as
+sent, so subscribers do not receive the whole history.
+"""
+
+import os
+import time
+import uuid
+import hashlib
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from utils import metrics, resilience, storage
+from utils.data_fetcher import get_updates, upstream_request
+from utils.telegram_updates import DB_FILE
+
+logger = logging.getLogger(__name__)
+
+TOKEN = os.getenv('TELEGRAM_token')
+API_BASE = os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org')
+
+# Seconds between checks of the updates feed (0 disables broadcasting)
+CHECK_INTERVAL = int(os.getenv('NOTICE_BROADCAST_INTERVAL', '60'))
+
+# Messages per second across the deployment (Telegram allows about 30)
+RATE = float(os.getenv('NOTICE_BROADCAST_RATE', '25'))
+
+# Parallel sendMessage calls of the broadcasting worker
+WORKERS = int(os.getenv('NOTICE_BROADCAST_WORKERS', '8'))
+
+# Telegram allows about one message per second in a chat
+_CHAT_RATE = 1.0
+
+# A chat is retried this many times after a 429 within one round
+_MAX_RETRIES = 5
+
+# Rounds after which a notice is given up on for chats that keep failing
+_MAX_ROUNDS = 5
+
+# Notices listed in one message (Telegram messages are limited to 4096 characters)
+_MAX_PER_MESSAGE = 10
+
+# Seconds the broadcasting worker holds the lease without renewing it
+LEASE_TTL = max(120, 2 * CHECK_INTERVAL)
+
+_checker: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_paused_until = 0.0
+
+# Lease owner: this process (the round's renewal timer runs in another thread)
+_owner_id = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _reset_after_fork() -> None:
+    global _checker, _lock, _paused_until, _owner_id
+    _checker = None
+    _owner_id = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    _lock = threading.Lock()
+    _paused_until = 0.0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS subscribers (chat_id INTEGER PRIMARY KEY, since REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS notices (key TEXT PRIMARY KEY, title TEXT NOT NULL, date TEXT, '
+    'link TEXT, seen REAL NOT NULL, sent REAL, rounds INTEGER NOT NULL DEFAULT 0)',
+    'CREATE TABLE IF NOT EXISTS notice_deliveries (key TEXT NOT NULL, chat_id INTEGER NOT NULL, '
+    'PRIMARY KEY (key, chat_id))',
+    'CREATE TABLE IF NOT EXISTS broadcast_lease (id INTEGER PRIMARY KEY CHECK (id = 1), '
+    'owner TEXT NOT NULL, expires REAL NOT NULL)',
+)
+
+
+def _db() -> sqlite3.Connection:
+    return storage.connect(DB_FILE, _SCHEMA)
+
+
+def subscribe(chat_id: Any) -> bool:
+    """Add a chat to the broadcast list. Returns False if it was already subscribed."""
+    return _db().execute('INSERT OR IGNORE INTO subscribers (chat_id, since) VALUES (?, ?)',
+                         (chat_id, time.time())).rowcount == 1
+
+
+def unsubscribe(chat_id: Any) -> bool:
+    """Remove a chat from the broadcast list. Returns False if it was not subscribed."""
+    return _db().execute('DELETE FROM subscribers WHERE chat_id = ?', (chat_id,)).rowcount == 1
+
+
+def notice_key(notice: Dict[str, Any]) -> str:
+    """Stable id of a notice of the updates feed (its title, date and link)."""
+    text = '\x1f'.join(str(notice.get(k) or '').strip() for k in ('title', 'date', 'link'))
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+def _hold_lease() -> bool:
+    """Become, or stay, the worker that broadcasts. Returns True on success."""
+    now = time.time()
+    try:
+        conn = _db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT owner, expires FROM broadcast_lease WHERE id = 1').fetchone()
+            if row is not None and row[1] > now and row[0] != _owner_id:
+                conn.execute('COMMIT')
+                return False
+            conn.execute('INSERT OR REPLACE INTO broadcast_lease (id, owner, expires) VALUES (1, ?, ?)',
+                         (_owner_id, now + LEASE_TTL))
+            conn.execute('COMMIT')
+            return True
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    except (sqlite3.Error, OSError):
+        # Unlike a cache refresh, broadcasting without the lease could message chats twice
+        logger.warning("Could not take the notice broadcast lease", exc_info=True)
+        return False
+
+
+def record_notices(updates: List[Dict[str, Any]]) -> int:
+    """Record the notices of the feed not seen before.
+
+    On the first run (no notices recorded yet) they are all marked as sent.
+
+    Returns:
+        Number of new notices to broadcast
+    """
+    now = time.time()
+    conn = _db()
+    first_run = conn.execute('SELECT 1 FROM notices LIMIT 1').fetchone() is None
+    new = 0
+    for notice in updates:
+        if not isinstance(notice, dict) or not str(notice.get('title') or '').strip():
+            continue
+        new += conn.execute(
+            'INSERT OR IGNORE INTO notices (key, title, date, link, seen, sent) VALUES (?, ?, ?, ?, ?, ?)',
+            (notice_key(notice), str(notice['title']).strip(), str(notice.get('date') or ''),
+             str(notice.get('link') or ''), now, now if first_run else None)).rowcount
+    if first_run and new:
+        logger.info(f"Recorded {new} existing notices as sent; only later notices are broadcast")
+        return 0
+    return new
+
+
+def _format(notices: List[Tuple]) -> str:
+    lines = ['📢 New notice from the BCA department' if len(notices) == 1
+             else f'📢 {len(notices)} new notices from the BCA department']
+    for _, title, date, link, _ in notices[:_MAX_PER_MESSAGE]:
+        lines.append('')
+        lines.append(f"• {title}" + (f" ({date})" if date else ''))
+        if link:
+            lines.append(link)
+    if len(notices) > _MAX_PER_MESSAGE:
+        lines.append('')
+        lines.append(f"...and {len(notices) - _MAX_PER_MESSAGE} more on the department website.")
+    return '\n'.join(lines)[:4096]
+
+
+def _pause(seconds: float) -> bool:
+    """Hold every sender for seconds. Returns False if they were already held that long."""
+    global _paused_until
+    with _lock:
+        until = time.monotonic() + seconds
+        if until <= _paused_until:
+            return False
+        _paused_until = until
+        return True
+
+
+class _Round(NamedTuple):
+    overall: resilience.TokenBucket
+    per_chat: resilience.KeyedTokenBuckets
+    stopped: threading.Event  # set when the lease is lost
+
+
+def _wait_turn(chat_id: Any, rnd: _Round) -> bool:
+    """Block until a message may be sent to chat_id. False if the round was stopped meanwhile."""
+    while not rnd.per_chat.try_acquire(str(chat_id)):
+        if rnd.stopped.wait(1 / _CHAT_RATE / 4):
+            return False
+    while not rnd.stopped.is_set():
+        wait = _paused_until - time.monotonic()
+        if wait > 0:
+            rnd.stopped.wait(wait)
+        elif rnd.overall.try_acquire():
+            return True
+        else:
+            rnd.stopped.wait(1 / max(RATE, 1))
+    return False
+
+
+def _send(chat_id: Any, text: str, rnd: _Round) -> str:
+    """Send one message, honouring 429 retry_after. Returns sent, blocked, failed or stopped."""
+    for _ in range(_MAX_RETRIES + 1):
+        if not _wait_turn(chat_id, rnd):
+            return 'stopped'
+        try:
+            response = upstream_request('telegram', 'POST', f'{API_BASE}/bot{TOKEN}/sendMessage',
+                                        json={'chat_id': chat_id, 'text': text,
+                                              'disable_web_page_preview': True}, timeout=10)
+        except Exception as e:
+            logger.warning(f"Notice to chat {chat_id} failed: {e}")
+            return 'failed'
+        if response.status_code == 200:
+            return 'sent'
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.status_code == 429:
+            retry_after = float((body.get('parameters') or {}).get('retry_after') or 1)
+            metrics.inc('bca_notice_messages_total', result='throttled')
+            if _pause(retry_after):
+                logger.warning(f"Telegram asked to slow down, pausing notices for {retry_after:g}s")
+            continue
+        description = str(body.get('description', '')).lower()
+        if response.status_code == 403 or (response.status_code == 400 and 'chat not found' in description):
+            return 'blocked'
+        logger.warning(f"Notice to chat {chat_id} rejected: HTTP {response.status_code} {description}")
+        return 'failed'
+    return 'failed'
+
+
+def _deliver(chat_id: Any, notices: List[Tuple], rnd: _Round) -> str:
+    """Send notices to a chat and record the outcome right away."""
+    result = _send(chat_id, _format(notices), rnd)
+    if result == 'sent':
+        _db().executemany('INSERT OR IGNORE INTO notice_deliveries (key, chat_id) VALUES (?, ?)',
+                          [(n[0], chat_id) for n in notices])
+    elif result == 'blocked':
+        unsubscribe(chat_id)
+    return result
+
+
+def _renew_lease(rnd: _Round, done: threading.Event) -> None:
+    """Keep the lease while a round runs; stop the round if it cannot be kept."""
+    while not done.wait(LEASE_TTL / 4):
+        if not _hold_lease():
+            logger.warning("Lost the notice broadcast lease, stopping the round")
+            rnd.stopped.set()
+            return
+
+
+def broadcast_pending() -> int:
+    """Send the notices not yet delivered to every subscriber (caller holds the lease).
+
+    Returns:
+        Number of messages sent
+    """
+    conn = _db()
+    pending = conn.execute('SELECT key, title, date, link, seen FROM notices WHERE sent IS NULL '
+                           'ORDER BY seen, rowid').fetchall()
+    if not pending:
+        return 0
+    keys = [n[0] for n in pending]
+    marks = ','.join('?' * len(keys))
+    delivered = set(conn.execute(f'SELECT key, chat_id FROM notice_deliveries WHERE key IN ({marks})', keys))
+    subscribers = conn.execute('SELECT chat_id, since FROM subscribers').fetchall()
+    metrics.set_gauge('bca_notice_subscribers', len(subscribers))
+
+    # Each chat gets, in one message, the notices published after it subscribed and not yet delivered
+    jobs = []
+    for chat_id, since in subscribers:
+        notices = [n for n in pending if n[4] >= since and (n[0], chat_id) not in delivered]
+        if notices:
+            jobs.append((chat_id, notices))
+
+    start = time.perf_counter()
+    # No burst: Telegram counts messages per second, so they are spread evenly
+    rnd = _Round(resilience.TokenBucket(RATE, 1),
+                 resilience.KeyedTokenBuckets(_CHAT_RATE, 1, max_keys=max(10000, len(jobs))),
+                 threading.Event())
+    counts = {'sent': 0, 'blocked': 0, 'failed': 0, 'stopped': 0}
+    finished = threading.Event()
+    renewer = threading.Thread(target=_renew_lease, args=(rnd, finished), name='notice-lease', daemon=True)
+    renewer.start()
+    pool = ThreadPoolExecutor(max_workers=max(1, WORKERS), thread_name_prefix='notice-sender')
+    try:
+        futures = [pool.submit(_deliver, chat_id, notices, rnd) for chat_id, notices in jobs]
+        for future in futures:
+            if rnd.stopped.is_set():
+                # Another worker owns the broadcast now: drop queued sends, keep what was delivered
+                pool.shutdown(wait=True, cancel_futures=True)
+            if future.cancelled():
+                counts['stopped'] += 1
+                continue
+            result = future.result()
+            counts[result] += 1
+            if result != 'stopped':
+                metrics.inc('bca_notice_messages_total', result=result)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        finished.set()
+        renewer.join()
+
+    if rnd.stopped.is_set():
+        logger.warning(f"Notice broadcast stopped after {counts['sent']} of {len(jobs)} chats; "
+                       f"the worker holding the lease resumes it")
+        return counts['sent']
+
+    # A notice is done once no chat is left to retry (or after _MAX_ROUNDS)
+    conn.execute(f'UPDATE notices SET rounds = rounds + 1 WHERE key IN ({marks})', keys)
+    done = keys if not counts['failed'] else [
+        key for (key,) in conn.execute(f'SELECT key FROM notices WHERE key IN ({marks}) AND rounds >= ?',
+                                       keys + [_MAX_ROUNDS])]
+    if done:
+        done_marks = ','.join('?' * len(done))
+        conn.execute(f'UPDATE notices SET sent = ? WHERE key IN ({done_marks})', [time.time()] + done)
+        conn.execute(f'DELETE FROM notice_deliveries WHERE key IN ({done_marks})', done)
+
+    elapsed = time.perf_counter() - start
+    metrics.observe('bca_notice_broadcast_seconds', elapsed)
+    logger.info(f"Broadcast {len(pending)} notices to {len(jobs)} chats in {elapsed:.1f}s: "
+                f"{counts['sent']} sent, {counts['blocked']} unsubscribed, {counts['failed']} failed")
+    return counts['sent']
+
+
+def check_now() -> None:
+    """Record new notices of the feed and broadcast them, if this worker holds the lease."""
+    if not _hold_lease():
+        return
+    updates, _ = get_updates()
+    record_notices(updates)
+    broadcast_pending()
+
+
+def _check_loop(interval: int) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            check_now()
+        except Exception:
+            logger.exception("Notice broadcast check failed")
+
+
+def start_broadcaster(interval: int = CHECK_INTERVAL) -> None:
+    """Start the daemon thread that broadcasts new notices (one worker sends at a time).
+
+    Args:
+        interval: Seconds between checks of the updates feed (0 disables broadcasting)
+    """
+    global _checker
+    if interval <= 0 or not TOKEN or (_checker is not None and _checker.is_alive()):
+        return
+    _checker = threading.Thread(target=_check_loop, args=(interval,), name='notice-broadcaster', daemon=True)
+    _checker.start()
+    logger.info(f"Checking for new notices to broadcast every {interval}s")
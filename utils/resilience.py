@@ -0,0 +1,236 @@
+"""Protection against slow or failing upstreams: circuit breakers and latency budgets.
+
+A circuit breaker per upstream opens after repeated failures (or calls slower
+than UPSTREAM_SLOW_CALL_SECONDS), so further calls fail immediately and the
+cache serves its stale copy instead of every request waiting for the full
+timeout. After UPSTREAM_BREAKER_OPEN_SECONDS a single trial call is let
+through (half-open); its outcome closes or re-opens the circuit.
+
+Every web request also gets a total latency budget (REQUEST_LATENCY_BUDGET):
+upstream timeouts are shortened to what is left of it, and calls are refused
+once it is spent, so an upstream outage cannot tie up the worker pool.
+
+TokenBucket, KeyedTokenBuckets and LatencyWindow are small building blocks
+for rate limits and for latency-based decisions such as request hedging.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.getenv('UPSTREAM_BREAKER_FAILURES', '5'))
+OPEN_SECONDS = float(os.getenv('UPSTREAM_BREAKER_OPEN_SECONDS', '30'))
+SLOW_CALL_SECONDS = float(os.getenv('UPSTREAM_SLOW_CALL_SECONDS', '5'))
+REQUEST_BUDGET = float(os.getenv('REQUEST_LATENCY_BUDGET', '10'))
+
+# Below this much remaining budget an upstream call is not worth starting
+_MIN_USEFUL_BUDGET = 0.2
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream whose circuit is open or whose budget is spent."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker for one upstream."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 open_seconds: float = OPEN_SECONDS, slow_call_seconds: float = SLOW_CALL_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now (claims the trial slot when half-open)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record(self, success: bool, duration: float) -> None:
+        """Record the outcome of a call; slow successes count as failures."""
+        failed = not success or duration >= self.slow_call_seconds
+        with self._lock:
+            self._trial_in_flight = False
+            if not failed:
+                if self.state != self.CLOSED:
+                    logger.info(f"Circuit for upstream '{self.name}' closed")
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit for upstream '{self.name}' opened after {self.failures} "
+                                   f"failed or slow calls")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, at most capacity banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available; never blocks."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+
+class KeyedTokenBuckets:
+    """One TokenBucket per key (client IP, account, ...).
+
+    Only the max_keys most recently used keys are tracked; an evicted key
+    starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str, tokens: float = 1) -> bool:
+        """Take tokens from key's bucket if available; never blocks."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+        return bucket.try_acquire(tokens)
+
+
+class LatencyWindow:
+    """Rolling window of the most recent call durations."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None while it is empty."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        rank = max(1, int(round(pct / 100 * len(ordered))))
+        return ordered[min(rank, len(ordered)) - 1]
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_deadline: ContextVar[Optional[float]] = ContextVar('upstream_deadline', default=None)
+
+
+def _reset_after_fork() -> None:
+    global _breakers_lock
+    _breakers_lock = threading.Lock()
+    _breakers.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def breaker(upstream: str) -> CircuitBreaker:
+    """Return the (process-wide) circuit breaker of an upstream."""
+    with _breakers_lock:
+        cb = _breakers.get(upstream)
+        if cb is None:
+            cb = _breakers[upstream] = CircuitBreaker(upstream)
+        return cb
+
+
+def start_budget(seconds: Optional[float]) -> None:
+    """Start a latency budget for the current request (None disables it)."""
+    _deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current request's budget, or None if unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout(upstream: str, timeout: Optional[float]) -> Optional[float]:
+    """Check an upstream call may start and return the timeout it should use.
+
+    Args:
+        upstream: Upstream name
+        timeout: The caller's own timeout in seconds
+
+    Returns:
+        Timeout shortened to the remaining request budget
+
+    Raises:
+        UpstreamUnavailable: if the circuit is open or the budget is spent
+    """
+    left = remaining_budget()
+    if left is not None and left < _MIN_USEFUL_BUDGET:
+        raise UpstreamUnavailable(f"Latency budget exhausted before calling '{upstream}'")
+    if not breaker(upstream).allow():
+        raise UpstreamUnavailable(f"Circuit open for upstream '{upstream}'")
+    if left is None:
+        return timeout
+    return min(timeout, left) if timeout else left
+
+
+def init_app(app) -> None:
+    """Give every request of a Flask app a total upstream latency budget."""
+    @app.before_request
+    def _start_request_budget():
+        start_budget(REQUEST_BUDGET)
+
+    @app.teardown_request
+    def _clear_request_budget(exc=None):
+        start_budget(None)
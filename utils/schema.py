@@ -0,0 +1,161 @@
+"""Column schemas of the Google Sheets datasets.
+
+Sheet headers drift (``Diary Number`` vs ``Diary No``, extra spaces, renamed
+columns), so code refers to logical fields ('date', 'usn', ...) and this
+module maps them to the physical column names of a given header. A mapping
+is computed once per distinct header (keyed by a hash of the column names)
+and stored in ``df.attrs`` when a dataset is loaded, so it travels with the
+cached DataFrame and hot paths index columns directly.
+"""
+
+import hashlib
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Key of the resolved mapping in DataFrame.attrs
+ATTR = 'schema'
+
+
+class Field(NamedTuple):
+    """How to find one logical field in a header.
+
+    variants are exact (case-insensitive) names in order of preference;
+    keywords match the first column whose name contains any of them.
+    """
+    variants: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+    required: bool = False
+
+
+class Schema(NamedTuple):
+    fields: Dict[str, Field]
+    # Add missing required fields as empty columns (named after their first variant)
+    fill_missing: bool = False
+
+
+SCHEMAS: Dict[str, Schema] = {
+    'students': Schema({
+        'usn': Field(keywords=('usn', 'seat', 'id'), required=True),
+        'dob': Field(keywords=('dob', 'birth', 'date of birth'), required=True),
+        'name': Field(('Name', 'Student Name', 'Candidate Name')),
+        'parent_phone': Field(('Parent Phone', 'Parent Mobile', 'Parent Contact', 'Father Mobile', 'Guardian Phone'),
+                              ('parent phone', 'parent mobile', 'parent contact', 'father mobile', 'guardian phone')),
+        'parent_email': Field(('Parent Email', 'Parent Email ID', 'Father Email', 'Guardian Email'),
+                              ('parent email', 'parent mail', 'father email', 'guardian email')),
+    }),
+    'admissions': Schema({
+        'application': Field(('Application',), required=True),
+        'candidate_name': Field(('Candidate Name',), required=True),
+        'rank': Field(('Rank',), required=True),
+        'seat_category': Field(('Seat Category',), required=True),
+        'joining': Field(('Joining',), required=True),
+    }, fill_missing=True),
+    'documents_tracking': Schema({
+        'sl_no': Field(('SL No.',), required=True),
+        'usn': Field(('USN No',), required=True),
+        'name': Field(('Student Name',), required=True),
+    }, fill_missing=True),
+    'marks': Schema({
+        'usn': Field(('USN', 'USN No'), ('usn', 'seat'), required=True),
+        'subject': Field(('Subject Code', 'Subject', 'Course Code', 'Course'), required=True),
+        'semester': Field(('Semester', 'Sem')),
+        'name': Field(('Name', 'Student Name')),
+    }),
+    'faculty_bills': Schema({
+        'date': Field(('Date', 'date'), required=True),
+        'diary': Field(('Diary Number', 'Diary No', 'Diary', 'DiaryNumber')),
+        'class': Field(('Select Class and Section', 'Select Class', 'Class')),
+        'subject': Field(('Choose Subject', 'Subject')),
+        'topics': Field(('Topics Covered', 'Topics', 'Particulars')),
+        'duration': Field(('Duration', 'Actual hours')),
+        'claiming': Field(('CLAMING HOURS', 'Claiming Hours', 'Claiming')),
+        'faculty': Field(('Faculty Name - Email', 'Faculty Name', 'Faculty')),
+    }),
+}
+
+
+def fingerprint(columns: Iterable) -> str:
+    """Stable hash of a header (identical in every worker process)."""
+    return hashlib.blake2b('\x1f'.join(str(c) for c in columns).encode(), digest_size=12).hexdigest()
+
+
+def _match(field: Field, columns: Tuple[str, ...]) -> Optional[str]:
+    if field.variants:
+        lower_map = {str(c).lower(): c for c in columns}
+        for v in field.variants:
+            if v.lower() in lower_map:
+                return lower_map[v.lower()]
+    for col in columns:
+        col_lower = str(col).lower()
+        if any(k in col_lower for k in field.keywords):
+            return col
+    return None
+
+
+@lru_cache(maxsize=64)
+def _resolve(dataset: str, columns: Tuple[str, ...], fp: str) -> Dict[str, Optional[str]]:
+    mapping = {name: _match(field, columns) for name, field in SCHEMAS[dataset].fields.items()}
+    missing = [name for name, field in SCHEMAS[dataset].fields.items() if field.required and mapping[name] is None]
+    if missing:
+        logger.warning(f"{dataset} header {fp} is missing required fields: {', '.join(missing)}")
+    return mapping
+
+
+def resolve(dataset: str, columns: Iterable) -> Dict[str, Optional[str]]:
+    """Map the logical fields of dataset to physical column names (None if absent).
+
+    Args:
+        dataset: Key of SCHEMAS
+        columns: Header of the sheet
+
+    Returns:
+        Dict of logical field -> column name (a shared dict, do not mutate)
+    """
+    columns = tuple(columns)
+    return _resolve(dataset, columns, fingerprint(columns))
+
+
+def missing_required(dataset: str, mapping: Dict[str, Optional[str]]) -> List[str]:
+    """Return the required logical fields that mapping could not resolve."""
+    return [name for name, field in SCHEMAS[dataset].fields.items() if field.required and mapping.get(name) is None]
+
+
+def apply(df: 'pd.DataFrame', dataset: str) -> Dict[str, Optional[str]]:
+    """Return the column mapping of df, resolving and storing it in df.attrs if needed.
+
+    Reuses the mapping stored at load time while the header is unchanged.
+    For schemas with fill_missing, absent required fields are added to df as
+    empty columns.
+
+    Args:
+        df: DataFrame of the dataset
+        dataset: Key of SCHEMAS
+
+    Returns:
+        Dict of logical field -> column name
+    """
+    fp = fingerprint(df.columns)
+    stored = df.attrs.get(ATTR)
+    if stored and stored['dataset'] == dataset and stored['fingerprint'] == fp:
+        return stored['columns']
+
+    schema = SCHEMAS[dataset]
+    mapping = resolve(dataset, df.columns)
+    if schema.fill_missing:
+        missing = missing_required(dataset, mapping)
+        if missing:
+            mapping = dict(mapping)
+            for name in missing:
+                col = schema.fields[name].variants[0]
+                df[col] = ''
+                mapping[name] = col
+            fp = fingerprint(df.columns)
+
+    df.attrs[ATTR] = {'dataset': dataset, 'fingerprint': fp, 'columns': mapping}
+    return mapping
@@ -0,0 +1,80 @@
+"""Local SQLite storage shared by all worker processes of the portal.
+
+The databases hold pickled datasets (see utils.cache), so whoever can write
+them can run code in the portal: DATA_DIR is created private to the user
+running the portal, and a directory owned by another user, or writable by
+group or others, is refused.
+"""
+
+import os
+import logging
+import sqlite3
+import tempfile
+import threading
+from typing import Sequence
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the shared SQLite databases (must be the same for all workers)
+DATA_DIR = os.getenv('DATA_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'bca_portal_cache')
+
+_local = threading.local()
+
+
+def _check_dir() -> None:
+    """Create DATA_DIR (mode 0700) or make sure only this user can write to it.
+
+    Raises:
+        sqlite3.OperationalError: if another user owns DATA_DIR or it is group/world writable
+    """
+    os.makedirs(DATA_DIR, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    st = os.stat(DATA_DIR)
+    if st.st_uid != os.getuid() or st.st_mode & 0o022:
+        logger.error(f"Refusing shared storage in {DATA_DIR}: it must be owned by uid {os.getuid()} "
+                     f"and not writable by group or others (set DATA_CACHE_DIR to a private directory)")
+        raise sqlite3.OperationalError(f"unsafe storage directory {DATA_DIR}")
+
+
+def connect(filename: str, schema: Sequence[str] = ()) -> sqlite3.Connection:
+    """Return this thread's connection to a database in DATA_DIR.
+
+    Connections are opened in WAL mode so readers never block the single
+    writer, and are cached per thread and per process (a connection must
+    never be reused across a fork).
+
+    Args:
+        filename: Database file name inside DATA_DIR
+        schema: CREATE ... IF NOT EXISTS statements of the caller's tables,
+            run once per connection (several modules may share a file)
+
+    Returns:
+        sqlite3.Connection in autocommit mode
+
+    Raises:
+        sqlite3.OperationalError: if DATA_DIR is unsafe or the database cannot be opened
+    """
+    conns = getattr(_local, 'conns', None)
+    if conns is None or getattr(_local, 'pid', None) != os.getpid():
+        conns = {}
+        _local.conns = conns
+        _local.schemas = set()
+        _local.pid = os.getpid()
+
+    conn = conns.get(filename)
+    if conn is None:
+        _check_dir()
+        path = os.path.join(DATA_DIR, filename)
+        conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conns[filename] = conn
+        logger.debug(f"Opened shared database {path}")
+
+    schema = tuple(schema)
+    if schema and (filename, schema) not in _local.schemas:
+        for ddl in schema:
+            conn.execute(ddl)
+        _local.schemas.add((filename, schema))
+    return conn
@@ -0,0 +1,161 @@
+"""Incremental decoding of large JSON array payloads into DataFrames.
+
+``response.json()`` holds the whole body, then the complete list of rows,
+then the DataFrame built from it. For the bills sheet (a year of diary
+entries) that peaks at several times the final data. Here the body is
+decoded chunk by chunk, one array element at a time, and every row is
+appended straight into per-column lists. Repeated cell values (faculty,
+class, subject, dates) share a single string object per column.
+"""
+
+import json
+import codecs
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+# Distinct strings shared per column; beyond this a column is treated as free text
+_MAX_INTERNED = 4096
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array from a stream of byte chunks.
+
+    Only one element (plus the undecoded tail of the current chunk) is held
+    at a time.
+
+    Args:
+        chunks: UTF-8 encoded body, in pieces of any size
+
+    Raises:
+        ValueError: if the body is not a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf, pos, started, eof = '', 0, False, False
+
+    def more() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buf, pos = buf[pos:] + utf8.decode(b'', final=True), 0
+            return False
+        buf, pos = buf[pos:] + utf8.decode(chunk), 0
+        return True
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= len(buf):
+            if not more():
+                raise ValueError('Unexpected end of JSON array')
+            continue
+
+        ch = buf[pos]
+        if not started:
+            if ch == '\ufeff':  # byte order mark
+                pos += 1
+                continue
+            if ch != '[':
+                raise ValueError('Expected a JSON array')
+            started = True
+            pos += 1
+            continue
+        if ch == ']':
+            return
+        if ch == ',':
+            pos += 1
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except ValueError:
+            # Element continues in the next chunk
+            if not more():
+                raise
+            continue
+        if not eof and (end >= len(buf) or (isinstance(item, (int, float)) and buf[end] not in _DELIMITERS)):
+            # A number cut at a chunk boundary ('2' of '2.5') is only complete once a delimiter follows
+            more()
+            continue
+        pos = end
+        yield item
+
+
+def _interned(values: Dict[Any, Any], value: Any) -> Any:
+    if isinstance(value, str):
+        if len(values) < _MAX_INTERNED:
+            return values.setdefault(value, value)
+        return values.get(value, value)
+    return value
+
+
+def frame_from_json_rows(chunks: Iterable[bytes]) -> 'pd.DataFrame':
+    """Build a DataFrame from a streamed JSON array of rows.
+
+    Accepts list-of-lists (first row is the header; short rows are padded,
+    extra cells dropped) or list-of-dicts (keys first seen later get None
+    for earlier rows).
+
+    Args:
+        chunks: UTF-8 encoded body, in pieces of any size
+
+    Returns:
+        DataFrame with one column per header field
+    """
+    import pandas as pd
+
+    header: List[str] = []
+    columns: List[List[Any]] = []
+    memos: List[Dict[Any, Any]] = []
+    by_name: Dict[str, List[Any]] = {}
+    memo_by_name: Dict[str, Dict[Any, Any]] = {}
+    n = 0
+    layout = None
+
+    for item in iter_json_array(chunks):
+        if layout is None:
+            if isinstance(item, list):
+                layout = 'lists'
+                header = [str(h).strip() for h in item]
+                columns = [[] for _ in header]
+                memos = [{} for _ in header]
+                continue
+            layout = 'dicts'
+
+        if layout == 'lists':
+            cells = item if isinstance(item, list) else []
+            for i, column in enumerate(columns):
+                column.append(_interned(memos[i], cells[i]) if i < len(cells) else None)
+        else:
+            if not isinstance(item, dict):
+                raise ValueError(f"Expected an object row, got {type(item).__name__}")
+            for key, value in item.items():
+                column = by_name.get(key)
+                if column is None:
+                    column = by_name[key] = [None] * n
+                    memo_by_name[key] = {}
+                    header.append(key)
+                column.append(_interned(memo_by_name[key], value))
+            for column in by_name.values():
+                if len(column) == n:
+                    column.append(None)
+        n += 1
+
+    if layout == 'dicts':
+        return pd.DataFrame({key: by_name[key] for key in header})
+    if not header:
+        return pd.DataFrame()
+    # Positional keys so duplicate header names survive
+    return pd.DataFrame(dict(enumerate(columns))).set_axis(header, axis=1)
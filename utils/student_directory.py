@@ -0,0 +1,213 @@
+"""USN -> student record directory used by the login forms.
+
+A login used to copy the whole cached student sheet and scan it for the USN.
+The directory maps normalized USNs to their records, and parent phone
+numbers / emails to the USNs of their children, and is built once per
+version of the cached sheet, so a lookup is a dict access.
+
+While this process holds a copy of the sheet younger than
+LOGIN_DIRECTORY_MAX_AGE (and not invalidated), lookups never touch the
+shared cache or Apps Script. Past that, USNs that were not found are
+remembered for LOGIN_NEGATIVE_TTL seconds against the version they were
+looked up in, so repeated attempts with an unknown USN (or parent contact)
+are rejected without
+triggering a refresh of the sheet; a new version (e.g. after the sheet was
+edited and the cache invalidated) clears them.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
+from utils import cache, metrics, schema
+from utils.data_fetcher import CACHE_TTL, get_student_snapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Age (seconds) up to which the process's copy of the sheet is used without any refresh check
+DIRECTORY_MAX_AGE = float(os.getenv('LOGIN_DIRECTORY_MAX_AGE', str(CACHE_TTL)))
+
+# How long an unknown USN is rejected without looking at a refreshed sheet
+NEGATIVE_TTL = float(os.getenv('LOGIN_NEGATIVE_TTL', '300'))
+
+# Unknown USNs remembered per process
+_NEGATIVE_MAX = 10000
+
+# Separators between several numbers / emails in one parent contact cell
+_CONTACT_SEPARATORS = re.compile(r'[,;/\s]+')
+
+
+class Directory(NamedTuple):
+    version: int
+    records: Dict[str, Dict[str, Any]]  # normalized USN -> row of the student sheet
+    dob_column: Optional[str]
+    parents: Dict[str, Tuple[str, ...]]  # normalized parent phone/email -> USNs of the children
+
+
+_directory: Optional[Directory] = None
+_build_lock = threading.Lock()
+_unknown: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()  # USN / 'parent:<contact>' -> (version, monotonic time)
+_unknown_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _build_lock, _unknown_lock
+    _build_lock = threading.Lock()
+    _unknown_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def normalize_usn(usn: Any) -> str:
+    return str(usn).strip().upper()
+
+
+def normalize_contact(contact: Any) -> str:
+    """Lower-cased email, or the last 10 digits of a phone number ('' if neither)."""
+    contact = str(contact).strip()
+    if '@' in contact:
+        return contact.lower()
+    digits = ''.join(c for c in contact if c.isdigit())
+    return digits[-10:] if len(digits) >= 10 else ''
+
+
+def _parent_index(usns: 'pd.Series', df: 'pd.DataFrame', contact_columns: List[str]) -> Dict[str, Tuple[str, ...]]:
+    children: Dict[str, List[str]] = {}
+    for col in contact_columns:
+        for usn, cell in zip(usns, df[col]):
+            if cell is None or cell != cell:  # None / NaN
+                continue
+            for part in _CONTACT_SEPARATORS.split(str(cell)):
+                contact = normalize_contact(part)
+                if contact:
+                    linked = children.setdefault(contact, [])
+                    if usn not in linked:
+                        linked.append(usn)
+    return {contact: tuple(linked) for contact, linked in children.items()}
+
+
+def _build(version: int, df: 'pd.DataFrame') -> Directory:
+    columns = schema.apply(df, 'students')
+    usn_col, dob_col = columns['usn'], columns['dob']
+    if usn_col is None:
+        logger.error("USN column not found in student data")
+        return Directory(version, {}, dob_col, {})
+
+    usns = df[usn_col].astype(str).str.strip().str.upper()
+    first = ~usns.duplicated()  # the first row of a repeated USN wins
+    rows = df[first]
+    records = dict(zip(usns[first], rows.to_dict('records')))
+    contact_columns = [c for c in (columns['parent_phone'], columns['parent_email']) if c is not None]
+    parents = _parent_index(usns[first], rows, contact_columns)
+    logger.info(f"Student directory v{version}: {len(records)} students, {len(parents)} parent contacts")
+    return Directory(version, records, dob_col, parents)
+
+
+def _directory_for(version: int, df: 'pd.DataFrame') -> Directory:
+    global _directory
+    directory = _directory
+    if directory is not None and directory.version == version:
+        return directory
+    with _build_lock:
+        if _directory is None or _directory.version != version:
+            _directory = _build(version, df)
+        return _directory
+
+
+def get_directory() -> Optional[Directory]:
+    """Return the directory of the current student sheet (fetching it only if needed)."""
+    held = cache.current('students', DIRECTORY_MAX_AGE)
+    version, df = held if held is not None else get_student_snapshot()
+    if df is None:
+        return None
+    return _directory_for(version, df)
+
+
+def _known_unknown(key: str) -> bool:
+    """True if key was not found in the sheet version this process still holds."""
+    miss = _unknown.get(key)
+    if miss is None or time.monotonic() - miss[1] >= NEGATIVE_TTL:
+        return False
+    held = cache.current('students', cache.MAX_STALE)
+    return held is not None and held[0] == miss[0]
+
+
+def _remember_unknown(key: str, version: int) -> None:
+    with _unknown_lock:
+        _unknown[key] = (version, time.monotonic())
+        _unknown.move_to_end(key)
+        while len(_unknown) > _NEGATIVE_MAX:
+            _unknown.popitem(last=False)
+
+
+def find_student(usn: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Look up a student by USN.
+
+    Args:
+        usn: University Seat Number (case and surrounding spaces ignored)
+
+    Returns:
+        (copy of the student's record, name of the DOB column); the record is
+        None if the USN is unknown or student data is unavailable
+    """
+    usn = normalize_usn(usn)
+    if cache.current('students', DIRECTORY_MAX_AGE) is None and _known_unknown(usn):
+        metrics.inc('bca_student_lookups_total', by='usn', result='negative_cached')
+        return None, None
+
+    directory = get_directory()
+    if directory is None:
+        logger.error("Student data not available for authentication")
+        metrics.inc('bca_student_lookups_total', by='usn', result='unavailable')
+        return None, None
+
+    record = directory.records.get(usn)
+    if record is None:
+        _remember_unknown(usn, directory.version)
+        metrics.inc('bca_student_lookups_total', by='usn', result='unknown')
+        return None, directory.dob_column
+
+    metrics.inc('bca_student_lookups_total', by='usn', result='found')
+    return dict(record), directory.dob_column
+
+
+def find_children(contact: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Look up the students linked to a parent phone number or email.
+
+    Args:
+        contact: Parent phone (any formatting, country code ignored) or email
+
+    Returns:
+        (copies of the children's records with the normalized USN under
+        'USN', name of the DOB column); the list is empty if the contact is unknown or student data is unavailable
+    """
+    contact = normalize_contact(contact)
+    if not contact:
+        return [], None
+    key = f"parent:{contact}"
+    if cache.current('students', DIRECTORY_MAX_AGE) is None and _known_unknown(key):
+        metrics.inc('bca_student_lookups_total', by='parent', result='negative_cached')
+        return [], None
+
+    directory = get_directory()
+    if directory is None:
+        logger.error("Student data not available for parent authentication")
+        metrics.inc('bca_student_lookups_total', by='parent', result='unavailable')
+        return [], None
+
+    usns = directory.parents.get(contact)
+    if not usns:
+        _remember_unknown(key, directory.version)
+        metrics.inc('bca_student_lookups_total', by='parent', result='unknown')
+        return [], directory.dob_column
+
+    metrics.inc('bca_student_lookups_total', by='parent', result='found')
+    return [dict(directory.records[usn], USN=usn) for usn in usns], directory.dob_column
@@ -0,0 +1,190 @@
+"""Delivery of Telegram webhook updates.
+
+Telegram re-sends an update when the webhook does not answer quickly, and
+the bot's flow waits on Apps Script and on sendMessage, so retries used to
+re-run the whole flow and reply twice. Now:
+
+- every update_id is claimed once: a bounded window of recent ids in this
+  process, backed by a table in the shared SQLite storage so a retry that
+  lands on another worker is recognized too;
+- the webhook acknowledges at once and the update is handled on a
+  background lane; updates of one chat always go to the same lane, so they
+  are handled one at a time and in order;
+- each chat's conversation (batch, semester, ... picked so far) is kept in
+  the shared storage rather than in the memory of whichever worker got the
+  previous message.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from utils import metrics, resilience, storage
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = 'telegram.sqlite3'
+
+# Update ids remembered in memory per process (retries usually follow within seconds)
+DEDUP_WINDOW = int(os.getenv('TELEGRAM_DEDUP_WINDOW', '2048'))
+
+# Background lanes per worker process (updates of one chat always share a lane)
+LANES = int(os.getenv('TELEGRAM_LANES', '4'))
+
+# Updates waiting per worker before new ones are handled inside the webhook request
+MAX_PENDING = int(os.getenv('TELEGRAM_MAX_PENDING', '200'))
+
+# Seconds a chat's unfinished conversation is kept
+SESSION_TTL = int(os.getenv('TELEGRAM_SESSION_TTL', '86400'))
+
+# Telegram stops retrying an update after 24 hours
+_SEEN_RETENTION = 86400
+
+# How often expired update ids and conversations are purged (seconds)
+_CLEANUP_INTERVAL = 600
+
+_recent: 'OrderedDict[int, None]' = OrderedDict()
+_lock = threading.Lock()
+_lanes: List[Optional[ThreadPoolExecutor]] = []
+_pending = 0
+_cleaned_at = 0.0
+
+
+def _reset_after_fork() -> None:
+    """Lane threads and pending updates of the parent do not exist in a forked child."""
+    global _lock, _lanes, _pending
+    _lock = threading.Lock()
+    _lanes = []
+    _pending = 0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS seen_updates (update_id INTEGER PRIMARY KEY, received REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS chat_sessions (chat_id INTEGER PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)',
+)
+
+
+def _db() -> sqlite3.Connection:
+    return storage.connect(DB_FILE, _SCHEMA)
+
+
+def first_delivery(update_id: int) -> bool:
+    """Claim update_id; False if it was already delivered (to this or another worker)."""
+    with _lock:
+        if update_id in _recent:
+            metrics.inc('bca_telegram_updates_total', result='duplicate')
+            return False
+        _recent[update_id] = None
+        while len(_recent) > DEDUP_WINDOW:
+            _recent.popitem(last=False)
+
+    _cleanup()
+    try:
+        claimed = _db().execute('INSERT OR IGNORE INTO seen_updates (update_id, received) VALUES (?, ?)',
+                                (update_id, time.time())).rowcount == 1
+    except sqlite3.Error:
+        logger.warning("Could not record Telegram update id, deduplicating in this worker only", exc_info=True)
+        claimed = True
+    metrics.inc('bca_telegram_updates_total', result='accepted' if claimed else 'duplicate')
+    return claimed
+
+
+def _lane(chat_id: Any) -> ThreadPoolExecutor:
+    global _lanes
+    with _lock:
+        if not _lanes:
+            _lanes = [None] * max(1, LANES)
+        index = hash(chat_id) % len(_lanes)
+        if _lanes[index] is None:
+            _lanes[index] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'telegram-lane{index}')
+        return _lanes[index]
+
+
+def _handle(handler: Callable[[Dict[str, Any]], Any], update: Dict[str, Any], queued: Optional[float]) -> None:
+    global _pending
+    if queued is not None:
+        metrics.observe('bca_telegram_queue_seconds', time.perf_counter() - queued)
+    resilience.start_budget(resilience.REQUEST_BUDGET or None)
+    try:
+        handler(update)
+    except Exception:
+        logger.exception(f"Telegram update {update.get('update_id')} failed")
+    finally:
+        resilience.start_budget(None)
+        if queued is not None:
+            with _lock:
+                _pending -= 1
+
+
+def submit(chat_id: Any, handler: Callable[[Dict[str, Any]], Any], update: Dict[str, Any]) -> None:
+    """Handle update in the background, after earlier updates of the same chat.
+
+    When MAX_PENDING updates are already waiting in this worker, the update
+    is handled before returning instead (the webhook answers late, but its
+    retries are deduplicated).
+    """
+    global _pending
+    with _lock:
+        queue = _pending < MAX_PENDING
+        if queue:
+            _pending += 1
+    if not queue:
+        metrics.inc('bca_telegram_updates_total', result='inline')
+        _handle(handler, update, None)
+        return
+    try:
+        _lane(chat_id).submit(_handle, handler, update, time.perf_counter())
+    except RuntimeError:
+        # Interpreter shutting down
+        with _lock:
+            _pending -= 1
+        _handle(handler, update, None)
+
+
+def load_session(chat_id: Any) -> Dict[str, Any]:
+    """Conversation state of a chat ({} if none or expired)."""
+    try:
+        row = _db().execute('SELECT state FROM chat_sessions WHERE chat_id = ? AND updated >= ?',
+                            (chat_id, time.time() - SESSION_TTL)).fetchone()
+    except sqlite3.Error:
+        logger.warning(f"Could not load Telegram session of chat {chat_id}", exc_info=True)
+        return {}
+    return json.loads(row[0]) if row else {}
+
+
+def save_session(chat_id: Any, state: Dict[str, Any]) -> None:
+    try:
+        _db().execute('INSERT OR REPLACE INTO chat_sessions (chat_id, state, updated) VALUES (?, ?, ?)',
+                      (chat_id, json.dumps(state), time.time()))
+    except sqlite3.Error:
+        logger.warning(f"Could not save Telegram session of chat {chat_id}", exc_info=True)
+
+
+def clear_session(chat_id: Any) -> None:
+    try:
+        _db().execute('DELETE FROM chat_sessions WHERE chat_id = ?', (chat_id,))
+    except sqlite3.Error:
+        logger.warning(f"Could not clear Telegram session of chat {chat_id}", exc_info=True)
+
+
+def _cleanup() -> None:
+    global _cleaned_at
+    now = time.time()
+    if now - _cleaned_at < _CLEANUP_INTERVAL:
+        return
+    _cleaned_at = now
+    try:
+        conn = _db()
+        conn.execute('DELETE FROM seen_updates WHERE received < ?', (now - _SEEN_RETENTION,))
+        conn.execute('DELETE FROM chat_sessions WHERE updated < ?', (now - SESSION_TTL,))
+    except sqlite3.Error:
+        logger.warning("Could not purge expired Telegram updates and sessions", exc_info=True)
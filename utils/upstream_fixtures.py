@@ -0,0 +1,103 @@
+"""Record and replay of upstream HTTP responses.
+
+UPSTREAM_MODE selects how data_fetcher.upstream_request talks to Apps Script,
+GitHub and Telegram:
+
+- ``live`` (default): normal network calls
+- ``record``: network calls, and every response is saved to UPSTREAM_FIXTURES_DIR
+- ``replay``: no network at all; responses are served from the saved fixtures
+
+Fixtures are keyed by method, URL and query parameters, so replaying gives the
+exact production data shapes for profiling, demos and exam-day rehearsals.
+They contain real student data: keep the directory out of version control.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+MODE = os.getenv('UPSTREAM_MODE', 'live').lower()
+
+FIXTURES_DIR = os.getenv('UPSTREAM_FIXTURES_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'upstream_fixtures')
+
+# Sleep for the recorded latency when replaying (realistic timing instead of instant)
+REPLAY_LATENCY = os.getenv('UPSTREAM_REPLAY_LATENCY', 'false').lower() in ('1', 'true', 'yes')
+
+_BOT_TOKEN = re.compile(r'/bot[^/]+/')
+
+if MODE not in ('live', 'record', 'replay'):
+    logger.warning(f"Unknown UPSTREAM_MODE '{MODE}', using live")
+    MODE = 'live'
+
+
+def fixture_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key of a request. POST bodies are not part of it (Telegram replies vary per message)."""
+    query = json.dumps(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return hashlib.sha1(f"{method.upper()} {url} {query}".encode()).hexdigest()
+
+
+def _path(upstream: str, key: str) -> str:
+    return os.path.join(FIXTURES_DIR, upstream, f"{key}.json")
+
+
+def record(upstream: str, method: str, url: str, params: Optional[Dict[str, Any]],
+           response: 'requests.Response', latency: float) -> None:
+    """Save a live response as a fixture (errors are logged, never raised)."""
+    fixture = {
+        'upstream': upstream,
+        'method': method.upper(),
+        'url': _BOT_TOKEN.sub('/bot<redacted>/', url),
+        'params': params or {},
+        'status': response.status_code,
+        'content_type': response.headers.get('Content-Type', 'application/json'),
+        'latency': round(latency, 4),
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'body': response.text,
+    }
+    path = _path(upstream, fixture_key(method, url, params))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        logger.exception(f"Failed to record fixture for {upstream}")
+
+
+def replay(upstream: str, method: str, url: str, params: Optional[Dict[str, Any]]) -> 'requests.Response':
+    """Build a response from the saved fixture.
+
+    Raises:
+        requests.ConnectionError: if no fixture was recorded for this request
+    """
+    import requests
+
+    path = _path(upstream, fixture_key(method, url, params))
+    try:
+        with open(path, encoding='utf-8') as f:
+            fixture = json.load(f)
+    except (OSError, ValueError):
+        raise requests.ConnectionError(f"No recorded {upstream} response for {method.upper()} (replay mode)")
+
+    if REPLAY_LATENCY:
+        time.sleep(fixture.get('latency', 0))
+
+    response = requests.Response()
+    response.status_code = fixture['status']
+    response._content = fixture['body'].encode('utf-8')
+    response._content_consumed = True  # lets iter_content() stream from _content
+    response.encoding = 'utf-8'
+    response.headers['Content-Type'] = fixture.get('content_type', 'application/json')
+    response.url = url
+    return response
@@ -0,0 +1,10 @@
+"""Production WSGI entry point.
+
+Serve with gunicorn, which picks up gunicorn.conf.py from the project root:
+
+    gunicorn wsgi:app
+"""
+
+from app import app
+
+__all__ = ['app']